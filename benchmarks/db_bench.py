@@ -0,0 +1,232 @@
+"""
+DatabaseManager microbenchmarks
+
+Seeds databases at several scales (guild count and treasury history rows),
+then times each benchmarked DatabaseManager method at a sweep of
+concurrency levels. Results (ops/sec and latency percentiles) are written
+as JSON. Given a baseline from an earlier run, the exit status fails when
+any cell regressed by more than the allowed fraction, so the suite can gate
+schema, index and pooling changes.
+
+    python -m benchmarks.db_bench --scales 1000,10000,100000 --history-rows 2000000 --json after.json
+    python -m benchmarks.db_bench --json after.json --baseline before.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+from benchmarks.stats import summarize
+from utils import clock
+
+# method name -> builds the call's arguments from (rng, guild_id)
+BENCHMARKS: Dict[str, Callable[[random.Random, int], Tuple]] = {
+    'get_guild_economy': lambda rng, guild_id: (guild_id,),
+    'update_treasury': lambda rng, guild_id: (guild_id, rng.randint(-100, 100)),
+    'deduct_treasury': lambda rng, guild_id: (guild_id, 10),
+    'get_treasury_history': lambda rng, guild_id: (guild_id, 24),
+    'get_recent_events': lambda rng, guild_id: (guild_id, 5),
+    'log_admin_action': lambda rng, guild_id: (
+        guild_id, rng.randint(1, 10 ** 6), 'benchmark', 0, "Benchmark action"
+    )
+}
+
+EVENTS_PER_GUILD = 5
+# Part of the cached database names; bump whenever seed() changes what it writes
+SEED_VERSION = 2
+
+async def create_schema(db_path: str):
+    """Create the current schema through DatabaseManager itself."""
+    db = DatabaseManager(db_path)
+    await db.initialize()
+    await db.close()
+
+def seed(db_path: str, guilds: int, history_rows: int, rng: random.Random):
+    """Bulk-load guilds, treasury history (spread over two days) and events."""
+    asyncio.run(create_schema(db_path))
+    
+    connection = sqlite3.connect(db_path)
+    # Same clock and layout the queries use, so time windows select the seeded rows
+    now = clock.now()
+    created = clock.db_timestamp(now)
+    with connection:
+        connection.executemany(
+            "INSERT INTO guild_economies (guild_id, treasury, last_update, created_at) VALUES (?, ?, ?, ?)",
+            ((guild_id, rng.randint(1000, 100000), created, created)
+             for guild_id in range(1, guilds + 1))
+        )
+        connection.executemany(
+            "INSERT INTO treasury_history (guild_id, treasury_amount, timestamp) VALUES (?, ?, ?)",
+            (
+                (rng.randint(1, guilds), rng.randint(1000, 100000),
+                 clock.db_timestamp(now - timedelta(seconds=rng.randint(0, 48 * 3600))))
+                for _ in range(history_rows)
+            )
+        )
+        connection.executemany(
+            """INSERT INTO economic_events
+               (guild_id, event_type, event_name, description, treasury_impact, economic_impact, timestamp)
+               VALUES (?, 'neutral', 'Benchmark Event', 'Seeded event', 0, 'none', ?)""",
+            (
+                (guild_id, clock.db_timestamp(now - timedelta(hours=hour)))
+                for guild_id in range(1, guilds + 1) for hour in range(EVENTS_PER_GUILD)
+            )
+        )
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+
+def seeded_database(data_dir: str, guilds: int, history_rows: int, seed_value: int) -> str:
+    """Path of a seeded database for a scale, creating it on first use."""
+    path = os.path.join(data_dir, f"seed_v{SEED_VERSION}_{guilds}g_{history_rows}h_{seed_value}.db")
+    if not os.path.exists(path):
+        print(f"Seeding {guilds:,} guilds and {history_rows:,} history rows...", flush=True)
+        start = time.perf_counter()
+        seed(f"{path}.tmp", guilds, history_rows, random.Random(seed_value))
+        os.replace(f"{path}.tmp", path)
+        print(f"  seeded in {time.perf_counter() - start:.1f} s", flush=True)
+    return path
+
+async def run_cell(db: DatabaseManager, method: str, concurrency: int, guilds: int,
+                   seconds: float, rng: random.Random) -> Dict:
+    """Call one method from `concurrency` callers for a fixed time."""
+    call = getattr(db, method)
+    build = BENCHMARKS[method]
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    
+    async def caller():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            args = build(rng, rng.randint(1, guilds))
+            start = time.perf_counter()
+            try:
+                await call(*args)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return dict(summarize(latencies, elapsed), errors=errors)
+
+async def run_scale(path: str, guilds: int, methods: List[str], concurrency_levels: List[int],
+                    seconds: float, rng: random.Random) -> List[Dict]:
+    db = DatabaseManager(path)
+    await db.initialize()
+    results = []
+    try:
+        for method in methods:
+            for concurrency in concurrency_levels:
+                stats = await run_cell(db, method, concurrency, guilds, seconds, rng)
+                results.append(dict(guilds=guilds, method=method, concurrency=concurrency, **stats))
+                print(f"{guilds:>8,} {method:<22}{concurrency:>5}{stats['ops_per_second']:>12,.1f}"
+                      f"{stats['p50_ms']:>10}{stats['p99_ms']:>10}", flush=True)
+    finally:
+        await db.close()
+    return results
+
+def compare(results: List[Dict], baseline: List[Dict], max_regression: float) -> List[str]:
+    """Cells slower than the baseline by more than max_regression (throughput or p99)."""
+    previous = {(cell['guilds'], cell['method'], cell['concurrency']): cell for cell in baseline}
+    regressions = []
+    for cell in results:
+        before = previous.get((cell['guilds'], cell['method'], cell['concurrency']))
+        if before is None:
+            continue
+        label = f"{cell['method']} @ {cell['guilds']:,} guilds, concurrency {cell['concurrency']}"
+        if cell['ops_per_second'] < before['ops_per_second'] * (1 - max_regression):
+            regressions.append(
+                f"{label}: {before['ops_per_second']:,.1f} -> {cell['ops_per_second']:,.1f} ops/s"
+            )
+        if before['p99_ms'] and cell['p99_ms'] > before['p99_ms'] * (1 + max_regression):
+            regressions.append(f"{label}: p99 {before['p99_ms']} -> {cell['p99_ms']} ms")
+    return regressions
+
+def parse_list(value: str, kind=int) -> List:
+    return [kind(part) for part in value.split(',') if part]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="DatabaseManager microbenchmarks")
+    parser.add_argument('--scales', default='1000,10000,100000', help="Guild counts to seed")
+    parser.add_argument('--history-rows', type=int, default=1000000,
+                        help="Treasury history rows seeded at every scale")
+    parser.add_argument('--concurrency', default='1,8,32,128', help="Concurrent callers to sweep")
+    parser.add_argument('--methods', default=','.join(BENCHMARKS),
+                        help="DatabaseManager methods to benchmark")
+    parser.add_argument('--seconds', type=float, default=2.0, help="Duration of each cell")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'economic_bot_bench'),
+                        help="Where seeded databases are kept between runs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Write results to this file")
+    parser.add_argument('--baseline', help="Results of an earlier run to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed slowdown per cell as a fraction (with --baseline)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    methods = parse_list(args.methods, str)
+    unknown = [method for method in methods if method not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Unknown methods: {', '.join(unknown)}")
+    
+    os.makedirs(args.data_dir, exist_ok=True)
+    rng = random.Random(args.seed)
+    results = []
+    
+    print(f"{'guilds':>8} {'method':<22}{'conc':>5}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for guilds in parse_list(args.scales):
+        seeded = seeded_database(args.data_dir, guilds, args.history_rows, args.seed)
+        with tempfile.TemporaryDirectory() as directory:
+            # Benchmarks write, so each run works on a copy of the seeded file
+            working = os.path.join(directory, 'bench.db')
+            shutil.copyfile(seeded, working)
+            results.extend(asyncio.run(run_scale(
+                working, guilds, methods, parse_list(args.concurrency), args.seconds, rng
+            )))
+    
+    report = {
+        'config': {
+            'scales': parse_list(args.scales),
+            'history_rows': args.history_rows,
+            'concurrency': parse_list(args.concurrency),
+            'seconds': args.seconds,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.max_regression:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
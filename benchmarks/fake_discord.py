@@ -0,0 +1,169 @@
+"""
+Stand-ins for the Discord objects the bot touches, for offline runs
+"""
+
+import itertools
+from typing import Dict, List, Optional
+
+import discord
+
+_ids = itertools.count(10 ** 17)
+
+def next_id() -> int:
+    """Snowflake-sized unique id."""
+    return next(_ids)
+
+class FakeMessage:
+    """A sent message; edits are recorded but go nowhere."""
+    
+    def __init__(self, channel=None, **fields):
+        self.id = next_id()
+        self.channel = channel
+        self.fields = fields
+    
+    async def edit(self, **fields):
+        self.fields.update(fields)
+        return self
+
+class FakeMember:
+    """Guild member with just enough of discord.Member for the cogs."""
+    
+    def __init__(self, guild: 'FakeGuild', bot: bool = False, administrator: bool = False):
+        self.id = next_id()
+        self.guild = guild
+        self.bot = bot
+        self.name = f"member-{self.id}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.guild_permissions = (
+            discord.Permissions.all() if administrator else discord.Permissions.general()
+        )
+        self.sent = 0
+    
+    async def send(self, content: Optional[str] = None, **fields):
+        self.sent += 1
+        return FakeMessage(None, content=content, **fields)
+
+class FakeTextChannel(discord.TextChannel):
+    """Text channel the bot can always post in.
+    
+    Subclasses discord.TextChannel (without its gateway state) so that
+    isinstance checks, mention and hashing behave like the real thing.
+    """
+    
+    def __init__(self, guild: 'FakeGuild', name: str):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.sent = 0
+    
+    def permissions_for(self, obj) -> discord.Permissions:
+        return discord.Permissions.all()
+    
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(self)
+    
+    async def send(self, content: Optional[str] = None, **fields):
+        self.sent += 1
+        return FakeMessage(self, content=content, **fields)
+
+class FakeGuild:
+    """Guild with members and a couple of text channels."""
+    
+    def __init__(self, member_count: int, bot_members: int = 1):
+        self.id = next_id()
+        self.name = f"guild-{self.id}"
+        self.members: List[FakeMember] = [FakeMember(self, administrator=True)]
+        self.members.extend(FakeMember(self) for _ in range(member_count - 1))
+        self.members.extend(FakeMember(self, bot=True) for _ in range(bot_members))
+        self.me = self.members[-1] if bot_members else None
+        self.text_channels = [FakeTextChannel(self, 'general'), FakeTextChannel(self, 'economy')]
+        self._members: Dict[int, FakeMember] = {member.id: member for member in self.members}
+        self._channels = {channel.id: channel for channel in self.text_channels}
+    
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+    
+    def get_member(self, member_id: int) -> Optional[FakeMember]:
+        return self._members.get(member_id)
+    
+    def get_channel(self, channel_id: int) -> Optional[FakeTextChannel]:
+        return self._channels.get(channel_id)
+    
+    async def fetch_members(self, limit: Optional[int] = None, after=None):
+        after_id = after.id if after is not None else 0
+        for member in sorted(self.members, key=lambda member: member.id):
+            if member.id > after_id:
+                yield member
+
+class FakeResponse:
+    """interaction.response: records what the command answered with."""
+    
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+        self._done = False
+    
+    def is_done(self) -> bool:
+        return self._done
+    
+    def _respond(self, **fields):
+        if self._done:
+            raise RuntimeError("Interaction already responded to")
+        self._done = True
+        self.interaction.messages.append(fields)
+    
+    async def defer(self, **fields):
+        self._respond(deferred=True, **fields)
+    
+    async def send_message(self, content: Optional[str] = None, **fields):
+        self._respond(content=content, **fields)
+    
+    async def edit_message(self, **fields):
+        self._respond(edit=True, **fields)
+
+class FakeFollowup:
+    """interaction.followup (a webhook in the real API)."""
+    
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+    
+    async def send(self, content: Optional[str] = None, **fields):
+        self.interaction.messages.append(dict(content=content, **fields))
+        return FakeMessage(self.interaction.channel, content=content, **fields)
+
+class FakeInteraction:
+    """A slash command or button interaction from one member."""
+    
+    def __init__(self, client, guild: FakeGuild, user: FakeMember, command=None):
+        self.id = next_id()
+        self.client = client
+        self._state = client._connection  # Read by app_commands.Namespace
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = guild.text_channels[0]
+        self.command = command
+        self.created_at = discord.utils.utcnow()
+        self.extras = {}
+        self.messages: List[Dict] = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+    
+    def replied_with(self, prefix) -> bool:
+        """Whether any response or followup's text starts with a prefix (or tuple of prefixes)."""
+        return any((message.get('content') or '').startswith(prefix) for message in self.messages)
+    
+    def last_view(self) -> Optional[discord.ui.View]:
+        """The view attached to the most recent response, if any."""
+        for message in reversed(self.messages):
+            if message.get('view') is not None:
+                return message['view']
+        return None
+    
+    async def original_response(self) -> FakeMessage:
+        return FakeMessage(self.channel)
+    
+    async def edit_original_response(self, **fields):
+        self.messages.append(dict(edit=True, **fields))
+        return FakeMessage(self.channel, **fields)
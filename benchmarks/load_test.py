@@ -0,0 +1,352 @@
+"""
+Offline load test for EconomicBot
+
+Builds the bot against a temporary SQLite file and fake guilds, then runs a
+weighted mix of slash commands alongside full passes of the background jobs.
+Commands go through the same path CommandTree uses for gateway interactions
+(tree check and tracing, rate limits and other command checks, argument
+transformers, error handler, completion hook); only the gateway itself is
+skipped. Reports throughput, per-command latency percentiles, errors and
+rejections, tick durations and database growth, so changes to database.py,
+economic_engine.py and the cogs can be compared.
+
+    python -m benchmarks.load_test --guilds 200 --members 50 --commands 5000
+    python -m benchmarks.load_test --mix market-report=5,treasury=1 --json result.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from discord import app_commands
+from discord.app_commands.namespace import Namespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot import COGS, EconomicBot
+from utils.rate_limit import RateLimited
+from benchmarks.fake_discord import FakeGuild, FakeInteraction
+from benchmarks.stats import summarize
+
+# Relative weights of the default command mix (chart commands are the expensive ones)
+DEFAULT_MIX = {
+    'market-report': 5,
+    'next-event': 3,
+    'recent-events': 3,
+    'treasury-history': 3,
+    'economic-influence': 3,
+    'action-history': 2,
+    'trade-effects': 2,
+    'trade-history': 2,
+    'treasury': 2,
+    'admin-costs': 1,
+    'economic-status': 1,
+    'forecast': 1,
+    'trade-policy': 1,
+    'treasury-inject': 1,
+    'server-boost': 1,
+    'change-trade-policy': 1
+}
+
+# Values for parameters that have no choices
+PARAMETER_VALUES = {
+    'hours': 24,
+    'limit': 10,
+    'amount': 100,
+    'message': "Load test announcement"
+}
+
+# Commands answered with a confirmation view, and the button the harness clicks
+CONFIRM_BUTTONS = {
+    'change-trade-policy': 'confirm_policy_change',
+    'mass-message': 'confirm_action'
+}
+
+# ❌ replies that turn a request down (like a rate limit) rather than report a failure
+REFUSALS = ('❌ Insufficient treasury funds', '❌ The trade policy is already set')
+
+BACKGROUND_JOBS = ['treasury_updater', 'passive_income_generator', 'random_event_scheduler']
+
+class HarnessBot(EconomicBot):
+    """EconomicBot whose guild cache is a set of fake guilds."""
+    
+    def __init__(self, db_path: str, guilds: List[FakeGuild]):
+        super().__init__(db_path=db_path)
+        self.fake_guilds = {guild.id: guild for guild in guilds}
+    
+    @property
+    def guilds(self):
+        return list(self.fake_guilds.values())
+    
+    def get_guild(self, guild_id: int):
+        return self.fake_guilds.get(guild_id)
+    
+    def get_channel(self, channel_id: int):
+        for guild in self.fake_guilds.values():
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+    
+    async def start_offline(self):
+        """The parts of setup_hook and on_ready that don't need Discord."""
+        await self.db.initialize()
+        await self.economic_engine.refresh_modifiers()
+        for cog in COGS:
+            await self.load_extension(cog)
+        await self.warm_up()
+        for schedule in self.schedules.values():
+            schedule.sync(self.fake_guilds)
+        await self.renew_job_leases()
+        self.dispatcher.start()
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'name=weight,name=weight' into a command mix."""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def database_size(db_path: str) -> int:
+    return sum(
+        os.path.getsize(path) for path in (db_path, f"{db_path}-wal") if os.path.exists(path)
+    )
+
+def table_rows(db_path: str) -> Dict[str, int]:
+    connection = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        tables = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in sorted(tables)}
+    finally:
+        connection.close()
+
+class LoadTest:
+    """One load test run."""
+    
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self.tick_latencies: Dict[str, List[float]] = defaultdict(list)
+    
+    def options_for(self, command) -> List[Dict]:
+        """Interaction options as the gateway would send them."""
+        options = []
+        for parameter in command.parameters:
+            if parameter.choices:
+                value = self.rng.choice(parameter.choices).value
+            elif parameter.name in PARAMETER_VALUES:
+                value = PARAMETER_VALUES[parameter.name]
+            else:
+                continue
+            options.append({'name': parameter.name, 'type': parameter.type.value, 'value': value})
+        return options
+    
+    async def dispatch(self, bot: HarnessBot, command, interaction: FakeInteraction):
+        """Handle a command interaction the way CommandTree._call does after parsing it.
+        
+        Returns the AppCommandError the command failed with, if any.
+        """
+        if not await bot.tree.interaction_check(interaction):
+            return app_commands.CheckFailure("The tree's interaction check failed")
+        
+        namespace = Namespace(interaction, {}, self.options_for(command))
+        try:
+            await command._invoke_with_namespace(interaction, namespace)
+        except app_commands.AppCommandError as e:
+            await command._invoke_error_handlers(interaction, e)
+            await bot.tree.on_error(interaction, e)
+            return e
+        
+        await bot.on_app_command_completion(interaction, command)
+        return None
+    
+    async def invoke(self, bot: HarnessBot, command, guild: FakeGuild):
+        """Run one slash command (and click its confirmation button, if any).
+        
+        The cogs catch their own exceptions and answer with a ❌ message, so
+        those replies count as errors. Rate limits and refusals such as a
+        short treasury count as rejections.
+        """
+        user = self.rng.choice([member for member in guild.members[:50] if not member.bot])
+        interactions = [FakeInteraction(bot, guild, user, command)]
+        
+        start = time.perf_counter()
+        try:
+            error = await self.dispatch(bot, command, interactions[0])
+            
+            button = CONFIRM_BUTTONS.get(command.name)
+            view = interactions[0].last_view() if button else None
+            if view is not None:
+                interactions.append(FakeInteraction(bot, guild, user))
+                await getattr(view, button).callback(interactions[-1])
+        except Exception:
+            self.errors[command.name] += 1
+        else:
+            if isinstance(error, RateLimited) or \
+                    any(interaction.replied_with(REFUSALS) for interaction in interactions):
+                self.rejected[command.name] += 1
+            elif error is not None or any(interaction.replied_with('❌') for interaction in interactions):
+                self.errors[command.name] += 1
+        finally:
+            self.latencies[command.name].append(time.perf_counter() - start)
+    
+    async def run_commands(self, bot: HarnessBot, guilds: List[FakeGuild]):
+        commands = {name: bot.tree.get_command(name) for name in self.mix}
+        missing = [name for name, command in commands.items() if command is None]
+        if missing:
+            raise SystemExit(f"Unknown commands in mix: {', '.join(missing)}")
+        
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        plan = [
+            (commands[name], self.rng.choice(guilds))
+            for name in self.rng.choices(names, weights, k=self.args.commands)
+        ]
+        
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        
+        async def limited(command, guild):
+            async with semaphore:
+                await self.invoke(bot, command, guild)
+        
+        await asyncio.gather(*(limited(command, guild) for command, guild in plan))
+    
+    async def run_ticks(self, bot: HarnessBot, stop: asyncio.Event):
+        """Full passes of every background job until the commands finish."""
+        while True:
+            for job in BACKGROUND_JOBS:
+                bot.schedules[job].rewind()
+                start = time.perf_counter()
+                await getattr(bot, job).coro(bot)
+                self.tick_latencies[job].append(time.perf_counter() - start)
+            try:
+                await asyncio.wait_for(stop.wait(), self.args.tick_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+    
+    async def run(self) -> Dict:
+        args = self.args
+        guilds = [FakeGuild(args.members) for _ in range(args.guilds)]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = os.path.join(directory, 'load_test.db')
+            bot = HarnessBot(db_path, guilds)
+            await bot.start_offline()
+            
+            size_before = database_size(db_path)
+            rows_before = table_rows(db_path)
+            
+            stop = asyncio.Event()
+            ticks = asyncio.create_task(self.run_ticks(bot, stop))
+            start = time.perf_counter()
+            await self.run_commands(bot, guilds)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await ticks
+            
+            size_after = database_size(db_path)
+            rows_after = table_rows(db_path)
+            await bot.close()
+        
+        all_latencies = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            'config': {
+                'guilds': args.guilds,
+                'members': args.members,
+                'commands': args.commands,
+                'concurrency': args.concurrency,
+                'tick_interval': args.tick_interval,
+                'seed': args.seed,
+                'mix': self.mix
+            },
+            'elapsed_seconds': round(elapsed, 3),
+            'overall': dict(summarize(all_latencies, elapsed), errors=sum(self.errors.values()),
+                            rejected=sum(self.rejected.values())),
+            'commands': {
+                name: dict(summarize(latencies, elapsed), errors=self.errors[name],
+                           rejected=self.rejected[name])
+                for name, latencies in sorted(self.latencies.items())
+            },
+            'ticks': {
+                job: summarize(latencies, elapsed) for job, latencies in self.tick_latencies.items()
+            },
+            'database': {
+                'size_before_bytes': size_before,
+                'size_after_bytes': size_after,
+                'growth_bytes': size_after - size_before,
+                'rows_added': {
+                    table: rows_after[table] - rows_before.get(table, 0)
+                    for table in rows_after if rows_after[table] != rows_before.get(table, 0)
+                }
+            }
+        }
+
+def print_report(report: Dict):
+    overall = report['overall']
+    print(f"\n{report['config']['commands']} commands on {report['config']['guilds']} guilds "
+          f"in {report['elapsed_seconds']:.2f} s: {overall['ops_per_second']} commands/s, "
+          f"p50 {overall['p50_ms']} ms, p99 {overall['p99_ms']} ms, {overall['errors']} errors, "
+          f"{overall['rejected']} rejected\n")
+    
+    print(f"{'command':<22}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}"
+          f"{'rejected':>10}")
+    for name, stats in report['commands'].items():
+        print(f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p99_ms']:>10}"
+              f"{stats['max_ms']:>10}{stats['errors']:>8}{stats['rejected']:>10}")
+    
+    print(f"\n{'background job':<26}{'passes':>7}{'p50 ms':>10}{'max ms':>10}")
+    for job, stats in report['ticks'].items():
+        print(f"{job:<26}{stats['count']:>7}{stats['p50_ms']:>10}{stats['max_ms']:>10}")
+    
+    database = report['database']
+    print(f"\nDatabase grew {database['growth_bytes'] / 1024:.0f} KiB "
+          f"({database['size_before_bytes'] / 1024:.0f} -> {database['size_after_bytes'] / 1024:.0f} KiB)")
+    for table, added in database['rows_added'].items():
+        print(f"  {table}: +{added} rows")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test for the economic bot")
+    parser.add_argument('--guilds', type=int, default=100, help="Number of fake guilds")
+    parser.add_argument('--members', type=int, default=50, help="Human members per guild")
+    parser.add_argument('--commands', type=int, default=2000, help="Slash commands to run")
+    parser.add_argument('--concurrency', type=int, default=20, help="Commands in flight at once")
+    parser.add_argument('--tick-interval', type=float, default=5.0,
+                        help="Seconds between full passes of the background jobs")
+    parser.add_argument('--mix', help="Command weights, e.g. 'market-report=5,treasury=1'")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the report to this file")
+    parser.add_argument('--verbose', action='store_true', help="Keep the bot's INFO logging")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    
+    report = asyncio.run(LoadTest(args).run())
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Latency summaries shared by the benchmarks
+"""
+
+import math
+from typing import Dict, List, Sequence
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (in milliseconds) of a set of timed calls."""
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'ops_per_second': round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(values, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+    }
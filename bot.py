@@ -3,28 +3,56 @@ Main bot class and initialization
 """
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 import os
 import asyncio
 import logging
-from datetime import datetime, timedelta
-import random
+import hashlib
+import json
+import socket
+import time
+import uuid
+from datetime import timedelta
 
+from chart_generator import ChartGenerator
 from database import DatabaseManager
 from economic_engine import EconomicEngine
+from utils import clock, rng
+from utils.broadcast import BroadcastManager
+from utils.cooldowns import CooldownStore
+from utils.dispatcher import MessageDispatcher
+from utils.loop_monitor import LoopMonitor
+from utils.memory import MemoryDiagnostics
+from utils.notifications import NotificationChannelResolver
+from utils.rate_limit import RateLimiter, RateLimited, rate_limit_check
+from utils.scheduler import PhasedSchedule
+from utils.metrics import MetricsServer, metrics
+from utils.tracing import finish_trace, start_trace
+from utils.startup import startup_profile
 from utils.constants import (
     BOT_COLOR, ECONOMIC_STATUS, TRADE_POLICIES,
-    ADMIN_ACTIONS_COSTS, EVENT_INTERVALS
+    ADMIN_ACTIONS_COSTS, EVENT_INTERVALS, JOB_LEASES,
+    CATCH_UP, TICK_SPREAD, UPDATE_INTERVALS, PERMISSIONS, MODIFIERS, METRICS, TRACING,
+    LOOP_MONITOR, DATABASE_CONFIG, RNG, MEMORY_DIAGNOSTICS, BROADCAST
 )
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COGS = [
+    'cogs.treasury',
+    'cogs.administration', 
+    'cogs.economy',
+    'cogs.events',
+    'cogs.trade'
+]
+
 class EconomicBot(commands.Bot):
     """Main Discord bot class for economic simulation."""
     
-    def __init__(self):
+    def __init__(self, force_sync: bool = False, db_path: str = DATABASE_CONFIG['db_name']):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
@@ -37,37 +65,147 @@ class EconomicBot(commands.Bot):
             description="Economic Simulation Bot inspired by TNO and Millennium Dawn"
         )
         
-        self.db = DatabaseManager()
+        # Logged so a run's random draws can be reproduced with RNG_SEED
+        seed = os.getenv('RNG_SEED', RNG['seed'])
+        streams = rng.seed(int(seed) if seed is not None else None)
+        logger.info(f"Random streams seeded with {streams.seed}")
+        
+        self.db = DatabaseManager(db_path)
         self.economic_engine = EconomicEngine(self.db)
-        self.start_time = datetime.now()
+        self.chart_gen = ChartGenerator()  # Shared by all cogs
+        self.influence_cooldowns = CooldownStore(
+            self.db, 'economic_influence',
+            timedelta(hours=PERMISSIONS['economic_influence_cooldown'])
+        )
+        self.rate_limiter = RateLimiter()
+        self.notification_channels = NotificationChannelResolver(self.db)
+        self.broadcasts = BroadcastManager(self)
+        self.dispatcher = MessageDispatcher(
+            on_undeliverable=lambda channel: self.notification_channels.invalidate(channel.guild.id)
+        )
+        self.metrics_server = MetricsServer(
+            metrics,
+            os.getenv('METRICS_HOST', METRICS['host']),
+            int(os.getenv('METRICS_PORT', METRICS['port'])),
+            METRICS['path']
+        )
+        self.loop_monitor = LoopMonitor()
+        self.memory_diagnostics = MemoryDiagnostics()
+        self.register_memory_sources()
+        self.tree.on_error = self.on_app_command_error
+        self.tree.interaction_check = self.start_command_trace
+        self.start_time = clock.now()
+        self.warmed_up = False
+        self.force_sync = force_sync
+        self.first_command_recorded = False
+        
+        # Job leases: background jobs only touch guilds in partitions we own
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.leased_jobs = [
+            'treasury_updater',
+            'passive_income_generator',
+            'random_event_scheduler'
+        ]
+        self.held_leases = {job: {} for job in self.leased_jobs}  # job -> {partition: expires_at}
+        
+        # Spread each job's guilds across its interval instead of ticking all at once
+        job_intervals = {
+            'treasury_updater': UPDATE_INTERVALS['treasury_update_seconds'],
+            'passive_income_generator': UPDATE_INTERVALS['passive_income_minutes'] * 60,
+            'random_event_scheduler': UPDATE_INTERVALS['event_check_hours'] * 3600
+        }
+        self.schedules = {
+            job: PhasedSchedule(job, interval, TICK_SPREAD['slot_seconds'])
+            for job, interval in job_intervals.items()
+        }
+    
+    def register_memory_sources(self):
+        """Tell the memory diagnostics about every cache and queue the bot owns."""
+        sources = {
+            'database': self.db.cache_sizes,
+            'modifiers': lambda: len(self.economic_engine.modifiers),
+            'influence_cooldowns': lambda: len(self.influence_cooldowns),
+            'rate_limit_buckets': lambda: len(self.rate_limiter.buckets),
+            'notification_channels': lambda: len(self.notification_channels),
+            'dispatcher': lambda: {
+                'queued': len(self.dispatcher),
+                'channel_buckets': len(self.dispatcher.channel_buckets)
+            },
+            'broadcasts': lambda: len(self.broadcasts.tasks),
+            'charts': self.chart_gen.memory_usage,
+            'metrics_series': lambda: (
+                len(metrics.counters) + len(metrics.gauges) + len(metrics.histograms)
+            ),
+            'rng_streams': lambda: len(rng.get_streams()),
+            'discord': lambda: {
+                'guilds': len(self.guilds),
+                'members': sum(len(guild.members) for guild in self.guilds),
+                'users': len(self.users),
+                'messages': len(self.cached_messages),
+                'persistent_views': len(self.persistent_views)
+            }
+        }
+        for name, source in sources.items():
+            self.memory_diagnostics.register(name, source)
         
     async def setup_hook(self):
         """Called when the bot is starting up."""
         # Initialize database
-        await self.db.initialize()
+        with startup_profile.stage('initialize database'):
+            await self.db.initialize()
         
-        # Load cogs
-        cogs = [
-            'cogs.treasury',
-            'cogs.administration', 
-            'cogs.economy',
-            'cogs.events',
-            'cogs.trade'
-        ]
+        # Active boosts, petition effects and emergency protections
+        try:
+            await self.economic_engine.refresh_modifiers()
+        except Exception as e:
+            logger.error(f"Failed to load active modifiers: {e}")
+        
+        # Credit missed accrual before the gateway connects
+        if CATCH_UP['enabled']:
+            try:
+                with startup_profile.stage('downtime catch-up'):
+                    await self.economic_engine.catch_up_downtime()
+            except Exception as e:
+                logger.error(f"Downtime catch-up failed: {e}")
         
-        for cog in cogs:
+        # Load cogs
+        for cog in COGS:
             try:
-                await self.load_extension(cog)
+                with startup_profile.stage(f'load {cog}'):
+                    await self.load_extension(cog)
                 logger.info(f"Loaded cog: {cog}")
             except Exception as e:
                 logger.error(f"Failed to load cog {cog}: {e}")
         
+        # Rate limit every slash command
+        for command in self.tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                command.add_check(rate_limit_check)
+        
+        # Sync slash commands only if the command tree changed
+        with startup_profile.stage('command tree sync'):
+            await self.sync_command_tree()
+        
+        # Claim job leases before any background work runs
+        await self.renew_job_leases()
+        
+        if METRICS['enabled']:
+            await self.metrics_server.start()
+        if LOOP_MONITOR['enabled']:
+            self.loop_monitor.start()
+        if os.getenv('MEMORY_DIAGNOSTICS', '1' if MEMORY_DIAGNOSTICS['enabled'] else '0') == '1':
+            self.memory_diagnostics.start()
+        
         # Start background tasks
+        self.dispatcher.start()
+        self.lease_heartbeat.start()
+        self.modifier_maintenance.start()
         self.treasury_updater.start()
         self.passive_income_generator.start()
         self.random_event_scheduler.start()
         
-        logger.info("Bot setup completed")
+        logger.info(f"Bot setup completed in {startup_profile.elapsed():.2f} s")
+        logger.info(f"Startup profile: {startup_profile.summary()}")
     
     async def on_ready(self):
         """Called when the bot is ready."""
@@ -76,11 +214,18 @@ class EconomicBot(commands.Bot):
         print(f'Guilds: {len(self.guilds)}')
         print(f'Started at: {self.start_time}')
         
-        try:
-            synced = await self.tree.sync()
-            print(f'Synced {len(synced)} slash commands')
-        except Exception as e:
-            print(f'Failed to sync commands: {e}')
+        # Warm-up: create and load every guild economy once, in bulk
+        if not self.warmed_up:
+            await self.warm_up()
+            self.chart_gen.preload()
+            
+            # Pick up mass messages interrupted by a restart, then keep checking for stale ones
+            if not self.broadcast_resumer.is_running():
+                self.broadcast_resumer.start()
+        
+        # (Re)build tick schedules from the current guild list
+        for schedule in self.schedules.values():
+            schedule.sync(guild.id for guild in self.guilds)
         
         # Set bot status
         await self.change_presence(
@@ -90,10 +235,100 @@ class EconomicBot(commands.Bot):
             )
         )
     
+    def command_tree_hash(self) -> str:
+        """Stable hash of every registered app command's payload."""
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda command: (command.get('type', 1), command['name'])
+        )
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+    
+    async def sync_command_tree(self):
+        """Sync the global command tree unless it matches what was last synced."""
+        state_key = f"command_tree_hash:{self.application_id}"
+        tree_hash = self.command_tree_hash()
+        
+        try:
+            if not self.force_sync and await self.db.get_state(state_key) == tree_hash:
+                logger.info("Slash commands unchanged, skipping sync")
+                return
+            
+            synced = await self.tree.sync()
+            await self.db.set_state(state_key, tree_hash)
+            logger.info(f"Synced {len(synced)} slash commands")
+        except Exception as e:
+            logger.error(f"Failed to sync commands: {e}")
+    
+    async def warm_up(self):
+        """Preload all guild economies so first commands and ticks hit memory."""
+        warmup_start = time.perf_counter()
+        try:
+            loaded = await self.db.warm_up(guild.id for guild in self.guilds)
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+            return
+        
+        self.warmed_up = True
+        warmup_seconds = time.perf_counter() - warmup_start
+        startup_seconds = startup_profile.elapsed()
+        metrics.set_gauge('warmup_seconds', warmup_seconds)
+        metrics.set_gauge('startup_seconds', startup_seconds)
+        logger.info(
+            f"Warm-up loaded {loaded} economies in {warmup_seconds * 1000:.0f} ms; "
+            f"ready {startup_seconds:.2f} s after start"
+        )
+    
+    async def start_command_trace(self, interaction) -> bool:
+        """Open a (sampled) trace covering the rest of a slash command's handling."""
+        interaction.extras['trace'] = start_trace(
+            f"/{interaction.command.qualified_name}" if interaction.command else "/unknown",
+            guild_id=interaction.guild_id,
+            user_id=interaction.user.id,
+            gateway_delay_ms=round(
+                (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000, 1
+            )
+        )
+        return True
+    
+    async def on_app_command_completion(self, interaction, command):
+        """Record slash command latency, and how long the first one after startup took."""
+        latency = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        metrics.observe('command_latency_seconds', latency, command=command.qualified_name)
+        finish_trace(interaction.extras.get('trace'), TRACING['slow_command_seconds'])
+        
+        if self.first_command_recorded:
+            return
+        
+        self.first_command_recorded = True
+        metrics.set_gauge('first_command_latency_seconds', latency)
+        logger.info(f"First command /{command.qualified_name} completed in {latency * 1000:.0f} ms")
+    
     async def on_guild_join(self, guild):
         """Called when bot joins a new guild."""
         logger.info(f"Joined new guild: {guild.name} (ID: {guild.id})")
         await self.db.initialize_guild(guild.id)
+        for schedule in self.schedules.values():
+            schedule.add(guild.id)
+    
+    async def on_guild_remove(self, guild):
+        """Called when bot is removed from a guild."""
+        for schedule in self.schedules.values():
+            schedule.remove(guild.id)
+        self.notification_channels.invalidate(guild.id)
+    
+    # Channel and role changes can change where (and whether) we can announce
+    async def on_guild_channel_create(self, channel):
+        self.notification_channels.invalidate(channel.guild.id)
+    
+    async def on_guild_channel_delete(self, channel):
+        self.notification_channels.invalidate(channel.guild.id)
+    
+    async def on_guild_channel_update(self, before, after):
+        self.notification_channels.invalidate(after.guild.id)
+    
+    async def on_guild_role_update(self, before, after):
+        self.notification_channels.invalidate(after.guild.id)
     
     async def on_command_error(self, ctx, error):
         """Global error handler for prefix commands."""
@@ -109,70 +344,180 @@ class EconomicBot(commands.Bot):
             logger.error(f"Unhandled command error: {error}")
             await ctx.send("❌ An unexpected error occurred.")
     
-    @tasks.loop(seconds=30)
+    async def renew_job_leases(self):
+        """Claim or renew the job partitions this process is allowed to run."""
+        partitions = JOB_LEASES['partitions']
+        max_owned = JOB_LEASES['max_partitions_per_instance'] or partitions
+        
+        for job in self.leased_jobs:
+            held = self.held_leases[job]
+            for partition in range(partitions):
+                if partition not in held and len(held) >= max_owned:
+                    continue
+                
+                try:
+                    expires_at = await self.db.acquire_lease(
+                        job, partition, self.instance_id, JOB_LEASES['ttl_seconds']
+                    )
+                except Exception as e:
+                    logger.error(f"Lease renewal error for {job}[{partition}]: {e}")
+                    continue
+                
+                if expires_at:
+                    if partition not in held:
+                        logger.info(f"Acquired lease {job}[{partition}]")
+                    held[partition] = expires_at
+                elif held.pop(partition, None):
+                    logger.warning(f"Lost lease {job}[{partition}] to another process")
+    
+    def leased_guilds(self, job: str):
+        """Yield the guilds due for this job whose partition we hold a valid lease for."""
+        due_ids = self.schedules[job].due()
+        
+        now = clock.now()
+        held = self.held_leases[job]
+        valid = {p for p, expires_at in held.items() if expires_at > now}
+        if not valid:
+            return
+        
+        partitions = JOB_LEASES['partitions']
+        for guild_id in due_ids:
+            if guild_id % partitions not in valid:
+                continue
+            guild = self.get_guild(guild_id)
+            if guild:
+                yield guild
+    
+    async def on_app_command_error(self, interaction, error):
+        """Global error handler for slash commands."""
+        metrics.inc(
+            'command_errors_total',
+            command=interaction.command.qualified_name if interaction.command else 'unknown',
+            error=type(error).__name__
+        )
+        finish_trace(
+            interaction.extras.get('trace'), TRACING['slow_command_seconds'],
+            error=type(error).__name__
+        )
+        
+        if isinstance(error, RateLimited):
+            message = f"⏰ You're doing that too often. Try again in {error.retry_after:.0f} seconds."
+        elif isinstance(error, app_commands.MissingPermissions):
+            message = "❌ You don't have permission to use this command."
+        else:
+            command_name = interaction.command.qualified_name if interaction.command else 'unknown'
+            logger.error(f"Unhandled app command error in /{command_name}: {error}")
+            message = "❌ An unexpected error occurred."
+        
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException:
+            pass
+    
+    @tasks.loop(seconds=JOB_LEASES['heartbeat_seconds'])
+    async def lease_heartbeat(self):
+        """Keep job leases alive while this process is running."""
+        try:
+            await self.renew_job_leases()
+        except Exception as e:
+            logger.error(f"Lease heartbeat error: {e}")
+    
+    @tasks.loop(seconds=BROADCAST['stale_seconds'])
+    async def broadcast_resumer(self):
+        """Resume released broadcasts and take over ones whose owner stopped."""
+        try:
+            await self.broadcasts.resume_all()
+        except Exception as e:
+            logger.error(f"Failed to resume broadcasts: {e}")
+    
+    @tasks.loop(seconds=MODIFIERS['maintenance_seconds'])
+    async def modifier_maintenance(self):
+        """Prune expired modifiers and pick up ones added by other processes."""
+        try:
+            await self.economic_engine.prune_modifiers()
+            await self.economic_engine.refresh_modifiers()
+        except Exception as e:
+            logger.error(f"Modifier maintenance error: {e}")
+    
+    @tasks.loop(seconds=TICK_SPREAD['slot_seconds'])
     async def treasury_updater(self):
         """Update treasury values in real-time."""
         try:
-            for guild in self.guilds:
-                await self.economic_engine.update_real_time_treasury(guild.id)
+            with self.schedules['treasury_updater'].timed_tick():
+                for guild in self.leased_guilds('treasury_updater'):
+                    await self.economic_engine.update_real_time_treasury(guild.id)
         except Exception as e:
             logger.error(f"Treasury updater error: {e}")
     
-    @tasks.loop(minutes=5)
+    @tasks.loop(seconds=TICK_SPREAD['slot_seconds'])
     async def passive_income_generator(self):
         """Generate passive income from server participants."""
         try:
-            for guild in self.guilds:
-                member_count = len([m for m in guild.members if not m.bot])
-                if member_count > 0:
-                    # Base income per member
-                    base_income = 10
-                    total_income = member_count * base_income
-                    
-                    # Apply economic modifiers
-                    economic_data = await self.db.get_guild_economy(guild.id)
-                    multiplier = self.economic_engine.get_income_multiplier(
-                        economic_data['economic_status']
-                    )
-                    
-                    final_income = int(total_income * multiplier)
-                    await self.db.update_treasury(guild.id, final_income)
-                    
-                    logger.info(f"Generated {final_income} passive income for guild {guild.id}")
+            with self.schedules['passive_income_generator'].timed_tick():
+                for guild in self.leased_guilds('passive_income_generator'):
+                    member_count = len([m for m in guild.members if not m.bot])
+                    if member_count > 0:
+                        # Base income per member
+                        base_income = 10
+                        total_income = member_count * base_income
+                        
+                        # Apply economic modifiers
+                        economic_data = await self.db.get_guild_economy(guild.id)
+                        multiplier = self.economic_engine.get_income_multiplier(
+                            economic_data['economic_status'], guild.id
+                        )
+                        
+                        final_income = int(total_income * multiplier)
+                        await self.db.record_passive_income(guild.id, final_income, member_count)
+                        
+                        metrics.inc('passive_income_generated_total', final_income)
+                        metrics.inc('passive_income_guilds_total')
         except Exception as e:
             logger.error(f"Passive income generator error: {e}")
     
-    @tasks.loop(hours=1)
+    @tasks.loop(seconds=TICK_SPREAD['slot_seconds'])
     async def random_event_scheduler(self):
         """Schedule random economic events."""
         try:
-            for guild in self.guilds:
-                # Check if it's time for an event
-                last_event = await self.db.get_last_event_time(guild.id)
-                now = datetime.now()
-                
-                if last_event is None:
-                    # First event
-                    next_event_hours = random.randint(1, 24)
-                    await self.db.set_next_event_time(
-                        guild.id, 
-                        now + timedelta(hours=next_event_hours)
-                    )
-                    continue
+            with self.schedules['random_event_scheduler'].timed_tick():
+                due_guild_ids = []
+                for guild in self.leased_guilds('random_event_scheduler'):
+                    # Check if it's time for an event
+                    last_event = await self.db.get_last_event_time(guild.id)
+                    now = clock.now()
+                    
+                    if last_event is None:
+                        # First event
+                        next_event_hours = rng.for_guild(guild.id, 'schedule').randint(
+                            EVENT_INTERVALS['min_hours'], EVENT_INTERVALS['max_hours']
+                        )
+                        await self.db.set_next_event_time(
+                            guild.id, 
+                            now + timedelta(hours=next_event_hours)
+                        )
+                        continue
+                    
+                    next_event_time = await self.db.get_next_event_time(guild.id)
+                    if next_event_time and now >= next_event_time:
+                        due_guild_ids.append(guild.id)
+                        
+                        # Schedule next event
+                        next_event_hours = rng.for_guild(guild.id, 'schedule').randint(
+                            EVENT_INTERVALS['min_hours'], EVENT_INTERVALS['max_hours']
+                        )
+                        await self.db.set_next_event_time(
+                            guild.id,
+                            now + timedelta(hours=next_event_hours)
+                        )
                 
-                next_event_time = await self.db.get_next_event_time(guild.id)
-                if next_event_time and now >= next_event_time:
-                    # Trigger event
+                # Trigger every due guild's event in one batch
+                if due_guild_ids:
                     events_cog = self.get_cog('Events')
-                    if events_cog and hasattr(events_cog, 'trigger_random_event'):
-                        await events_cog.trigger_random_event(guild.id)
-                    
-                    # Schedule next event
-                    next_event_hours = random.randint(1, 24)
-                    await self.db.set_next_event_time(
-                        guild.id,
-                        now + timedelta(hours=next_event_hours)
-                    )
+                    if events_cog and hasattr(events_cog, 'trigger_random_events'):
+                        await events_cog.trigger_random_events(due_guild_ids)
         except Exception as e:
             logger.error(f"Random event scheduler error: {e}")
     
@@ -188,11 +533,38 @@ class EconomicBot(commands.Bot):
         logger.info("Shutting down bot...")
         
         # Cancel tasks
+        self.lease_heartbeat.cancel()
+        self.broadcast_resumer.cancel()
+        self.modifier_maintenance.cancel()
         self.treasury_updater.cancel()
         self.passive_income_generator.cancel()
         self.random_event_scheduler.cancel()
         
+        # Unload cogs while the database is still open so they can flush buffered state
+        for name in list(self.cogs):
+            try:
+                await self.remove_cog(name)
+            except Exception as e:
+                logger.error(f"Failed to unload cog {name}: {e}")
+        
+        # Send what's still queued while the gateway is up
+        await self.dispatcher.close()
+        
+        # Stop broadcasts at their last checkpoint; they resume on the next start
+        await self.broadcasts.close()
+        
+        await self.metrics_server.close()
+        await self.loop_monitor.close()
+        await self.memory_diagnostics.close()
+        
+        # Hand leases over immediately instead of waiting for expiry
+        try:
+            await self.db.release_leases(self.instance_id)
+        except Exception as e:
+            logger.error(f"Failed to release job leases: {e}")
+        
         # Close database connections
         await self.db.close()
+        self.chart_gen.close()
         
         await super().close()
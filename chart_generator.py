@@ -2,20 +2,54 @@
 Chart generation for economic data visualization
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+import asyncio
 import io
-import discord
+import logging
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
-import numpy as np
+
+import discord
+
+from utils.metrics import metrics
+from utils.tracing import span
+from utils.startup import startup_profile
+
+logger = logging.getLogger(__name__)
+
+# matplotlib is imported on first render, inside the render worker
+plt = None
+mdates = None
+
+def _load_matplotlib():
+    """Import matplotlib with the non-interactive backend (once)."""
+    global plt, mdates
+    if plt is not None:
+        return
+    
+    with startup_profile.stage('import matplotlib') as stage:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as pyplot
+        import matplotlib.dates as dates
+    
+    plt, mdates = pyplot, dates
+    logger.info(f"Loaded matplotlib in {stage.seconds * 1000:.0f} ms")
 
 class ChartGenerator:
-    """Generates charts and graphs for economic data."""
+    """Generates charts and graphs for economic data.
+    
+    One instance is shared by the bot. Rendering runs on a single worker
+    thread so pyplot's global state is never touched concurrently and the
+    event loop is not blocked while a chart is drawn.
+    """
     
     def __init__(self):
-        # Set matplotlib to use non-interactive backend
-        plt.switch_backend('Agg')
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-render')
+        self.renders_in_flight = 0
+        self._buffers = weakref.WeakSet()  # Rendered PNGs still referenced somewhere
         
         # Define color scheme
         self.colors = {
@@ -36,6 +70,63 @@ class ChartGenerator:
             'Free Trade': '#1E90FF'
         }
     
+    async def _render(self, draw, *args) -> io.BytesIO:
+        """Run a drawing function on the render worker and return the PNG buffer."""
+        loop = asyncio.get_running_loop()
+        chart = draw.__name__.replace('_draw_', '', 1)
+        queued_at = time.perf_counter()
+        self.renders_in_flight += 1
+        try:
+            with span(f'render {chart}'):
+                buffer, draw_seconds = await loop.run_in_executor(
+                    self._executor, self._draw_in_worker, draw, args
+                )
+        finally:
+            self.renders_in_flight -= 1
+        self._buffers.add(buffer)
+        
+        # Recorded on the event loop; the registry isn't shared with the worker thread
+        metrics.observe('chart_render_seconds', draw_seconds, chart=chart)
+        metrics.observe('chart_wait_seconds', time.perf_counter() - queued_at - draw_seconds, chart=chart)
+        return buffer
+    
+    def _draw_in_worker(self, draw, args):
+        _load_matplotlib()
+        start = time.perf_counter()
+        buffer = draw(*args)
+        return buffer, time.perf_counter() - start
+    
+    def preload(self):
+        """Import matplotlib on the render worker in the background."""
+        self._executor.submit(_load_matplotlib)
+    
+    def _save_figure(self, fig) -> io.BytesIO:
+        """Lay out, save and close a figure, returning the PNG buffer."""
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
+        buffer.seek(0)
+        plt.close(fig)
+        return buffer
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Queued renders and the rendered buffers that haven't been released yet."""
+        live_bytes = 0
+        buffers = list(self._buffers)
+        for buffer in buffers:
+            if not buffer.closed:
+                with buffer.getbuffer() as view:
+                    live_bytes += view.nbytes
+        return {
+            'renders_in_flight': self.renders_in_flight,
+            'live_buffers': len(buffers),
+            'live_buffer_bytes': live_bytes
+        }
+    
+    def close(self):
+        """Stop the render worker."""
+        self._executor.shutdown(wait=False)
+    
     async def generate_treasury_chart(self, history_data: List[Dict[str, Any]], 
                                     current_status: str, 
                                     guild_name: str = "Server") -> discord.File:
@@ -43,6 +134,11 @@ class ChartGenerator:
         if not history_data:
             return await self.generate_empty_chart("No treasury data available")
         
+        buffer = await self._render(self._draw_treasury_chart, history_data, current_status, guild_name)
+        return discord.File(buffer, filename='treasury_chart.png')
+    
+    def _draw_treasury_chart(self, history_data: List[Dict[str, Any]],
+                             current_status: str, guild_name: str) -> io.BytesIO:
         # Prepare data
         timestamps = [datetime.fromisoformat(h['timestamp']) for h in history_data]
         treasury_values = [h['treasury_amount'] for h in history_data]
@@ -89,20 +185,17 @@ class ChartGenerator:
                        bbox=dict(boxstyle='round,pad=0.3', facecolor=line_color, alpha=0.8),
                        color='white', fontweight='bold')
         
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
-        buffer.seek(0)
-        plt.close()
-        
-        return discord.File(buffer, filename='treasury_chart.png')
+        return self._save_figure(fig)
     
     async def generate_forecast_chart(self, forecast_data: Dict[str, Any], 
                                     current_economy: Dict[str, Any],
                                     guild_name: str = "Server") -> discord.File:
         """Generate a 24-hour forecast chart."""
+        buffer = await self._render(self._draw_forecast_chart, forecast_data, current_economy, guild_name)
+        return discord.File(buffer, filename='forecast_chart.png')
+    
+    def _draw_forecast_chart(self, forecast_data: Dict[str, Any],
+                             current_economy: Dict[str, Any], guild_name: str) -> io.BytesIO:
         hourly_forecast = forecast_data['hourly_forecast']
         
         # Prepare data
@@ -159,20 +252,16 @@ class ChartGenerator:
                 verticalalignment='top', bbox=dict(boxstyle='round', 
                 facecolor='black', alpha=0.8), color='white', fontsize=10)
         
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
-        buffer.seek(0)
-        plt.close()
-        
-        return discord.File(buffer, filename='forecast_chart.png')
+        return self._save_figure(fig)
     
     async def generate_economic_status_pie_chart(self, 
                                                current_status: str,
                                                guild_name: str = "Server") -> discord.File:
         """Generate a pie chart showing economic status distribution."""
+        buffer = await self._render(self._draw_economic_status_pie_chart, current_status, guild_name)
+        return discord.File(buffer, filename='economic_status.png')
+    
+    def _draw_economic_status_pie_chart(self, current_status: str, guild_name: str) -> io.BytesIO:
         # Create mock data for visual appeal (in real implementation, 
         # this could show historical distribution)
         statuses = list(self.colors.keys())
@@ -201,19 +290,15 @@ class ChartGenerator:
         ax.set_title(f'{guild_name} - Current Economic Status\n{current_status}', 
                     color='white', fontsize=16, fontweight='bold', pad=20)
         
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
-        buffer.seek(0)
-        plt.close()
-        
-        return discord.File(buffer, filename='economic_status.png')
+        return self._save_figure(fig)
     
     async def generate_trade_policy_chart(self, current_policy: str,
                                         guild_name: str = "Server") -> discord.File:
         """Generate a trade policy visualization."""
+        buffer = await self._render(self._draw_trade_policy_chart, current_policy, guild_name)
+        return discord.File(buffer, filename='trade_policy.png')
+    
+    def _draw_trade_policy_chart(self, current_policy: str, guild_name: str) -> io.BytesIO:
         policies = list(self.trade_colors.keys())
         current_index = policies.index(current_policy) if current_policy in policies else 0
         
@@ -223,7 +308,7 @@ class ChartGenerator:
         ax.set_facecolor('#36393F')
         
         # Create horizontal bar chart
-        y_pos = np.arange(len(policies))
+        y_pos = list(range(len(policies)))
         values = [100 if i == current_index else 20 for i in range(len(policies))]
         colors = [self.trade_colors[policy] for policy in policies]
         
@@ -249,18 +334,14 @@ class ChartGenerator:
         for spine in ax.spines.values():
             spine.set_color('white')
         
-        plt.tight_layout()
-        
-        # Save to buffer
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
-        buffer.seek(0)
-        plt.close()
-        
-        return discord.File(buffer, filename='trade_policy.png')
+        return self._save_figure(fig)
     
     async def generate_empty_chart(self, message: str) -> discord.File:
         """Generate an empty chart with a message."""
+        buffer = await self._render(self._draw_empty_chart, message)
+        return discord.File(buffer, filename='empty_chart.png')
+    
+    def _draw_empty_chart(self, message: str) -> io.BytesIO:
         fig, ax = plt.subplots(figsize=(10, 6))
         fig.patch.set_facecolor('#2F3136')
         ax.set_facecolor('#36393F')
@@ -273,11 +354,4 @@ class ChartGenerator:
         for spine in ax.spines.values():
             spine.set_visible(False)
         
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', facecolor='#2F3136', dpi=150)
-        buffer.seek(0)
-        plt.close()
-        
-        return discord.File(buffer, filename='empty_chart.png')
+        return self._save_figure(fig)
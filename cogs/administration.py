@@ -6,9 +6,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import Optional
+from datetime import timedelta
 
+from utils.broadcast import progress_embed
 from utils.embeds import EconomicEmbeds
-from utils.constants import ADMIN_ACTIONS_COSTS, BOT_COLOR
+from utils.constants import (
+    ADMIN_ACTIONS_COSTS, ACTION_MODIFIERS, BOT_COLOR, ECONOMIC_STATUS, ERROR_MESSAGES, PENDING_ACTIONS
+)
 
 class Administration(commands.Cog):
     """Administrative actions that require treasury funds."""
@@ -36,7 +40,7 @@ class Administration(commands.Cog):
             # Calculate cost
             base_cost = ADMIN_ACTIONS_COSTS['mass_message']
             cost_multiplier = self.bot.economic_engine.get_action_cost_multiplier(
-                economy['economic_status']
+                economy['economic_status'], guild_id
             )
             total_cost = int(base_cost * cost_multiplier)
             
@@ -60,8 +64,12 @@ class Administration(commands.Cog):
             embed.add_field(name="Recipients", value=f"{len([m for m in interaction.guild.members if not m.bot])}", inline=True)
             embed.add_field(name="Message Preview", value=f"```{message[:100]}{'...' if len(message) > 100 else ''}```", inline=False)
             
+            token = await self.bot.db.create_pending_action(
+                guild_id, interaction.user.id, 'mass_message', total_cost,
+                PENDING_ACTIONS['ttl_seconds']
+            )
             view = ConfirmActionView(self.bot, guild_id, interaction.user.id, 
-                                   'mass_message', total_cost, message)
+                                   'mass_message', total_cost, message, token)
             
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             
@@ -93,7 +101,7 @@ class Administration(commands.Cog):
             
             base_cost = boost_costs.get(boost_type, 5000)
             cost_multiplier = self.bot.economic_engine.get_action_cost_multiplier(
-                economy['economic_status']
+                economy['economic_status'], guild_id
             )
             total_cost = int(base_cost * cost_multiplier)
             
@@ -131,8 +139,14 @@ class Administration(commands.Cog):
                 success=True
             )
             
-            # Apply boost effect (would be implemented based on boost type)
-            if boost_type == "growth":
+            # Apply boost effect
+            modifier = ACTION_MODIFIERS.get(f"server_boost_{boost_type}")
+            if modifier:
+                await self.bot.economic_engine.add_modifier(
+                    guild_id, modifier['modifier'], modifier['value'],
+                    timedelta(hours=modifier['hours']), f"server_boost_{boost_type}"
+                )
+            elif boost_type == "growth":
                 # Trigger a positive event
                 events_cog = self.bot.get_cog('Events')
                 if events_cog:
@@ -176,7 +190,7 @@ class Administration(commands.Cog):
             
             base_cost = action_costs.get(action_type, 15000)
             cost_multiplier = self.bot.economic_engine.get_action_cost_multiplier(
-                economy['economic_status']
+                economy['economic_status'], guild_id
             )
             total_cost = int(base_cost * cost_multiplier)
             
@@ -219,6 +233,20 @@ class Administration(commands.Cog):
             # Apply treasury bonus
             await self.bot.db.update_treasury(guild_id, effect['treasury_bonus'])
             
+            # Apply the lasting effect
+            modifier = ACTION_MODIFIERS.get(f"emergency_{action_type}")
+            if modifier:
+                await self.bot.economic_engine.add_modifier(
+                    guild_id, modifier['modifier'], modifier['value'],
+                    timedelta(hours=modifier['hours']), f"emergency_{action_type}"
+                )
+            elif action_type == "crisis":
+                # Move the economy up one status level
+                economy = await self.bot.db.get_guild_economy(guild_id)
+                status_index = ECONOMIC_STATUS.index(economy['economic_status'])
+                if status_index < len(ECONOMIC_STATUS) - 1:
+                    await self.bot.db.update_economic_status(guild_id, ECONOMIC_STATUS[status_index + 1])
+            
             # Log action
             await self.bot.db.log_admin_action(
                 guild_id=guild_id,
@@ -247,6 +275,39 @@ class Administration(commands.Cog):
                 ephemeral=True
             )
     
+    @app_commands.command(name="economy-channel", description="[ADMIN] Choose the channel for economic announcements")
+    @app_commands.describe(channel="Channel for event announcements (leave empty for automatic selection)")
+    @app_commands.default_permissions(administrator=True)
+    async def economy_channel(self, interaction: discord.Interaction, channel: Optional[discord.TextChannel] = None):
+        """Set or clear the guild's notification channel."""
+        try:
+            resolver = self.bot.notification_channels
+            
+            if channel is not None and not resolver.can_post(channel):
+                await interaction.response.send_message(
+                    f"❌ I can't post embeds in {channel.mention}. "
+                    f"Grant me View Channel, Send Messages and Embed Links there first.",
+                    ephemeral=True
+                )
+                return
+            
+            await resolver.set_channel(interaction.guild.id, channel.id if channel else None)
+            
+            if channel is None:
+                resolved = await resolver.resolve(interaction.guild)
+                current = resolved.mention if resolved else "none available"
+                message = f"✅ Economic announcements will use automatic selection (currently {current})."
+            else:
+                message = f"✅ Economic announcements will be posted in {channel.mention}."
+            
+            await interaction.response.send_message(message, ephemeral=True)
+            
+        except Exception as e:
+            await interaction.response.send_message(
+                "❌ An error occurred while updating the announcement channel.",
+                ephemeral=True
+            )
+    
     @app_commands.command(name="action-history", description="View recent administrative actions")
     @app_commands.describe(limit="Number of actions to show (max 20)")
     async def action_history(self, interaction: discord.Interaction, limit: Optional[int] = 10):
@@ -277,11 +338,61 @@ class Administration(commands.Cog):
                 "❌ An error occurred while fetching action history.",
                 ephemeral=True
             )
+    
+    @commands.command(name="memory")
+    @commands.is_owner()
+    async def memory_report(self, ctx):
+        """Report memory use and write a snapshot (bot owner only; covers every guild)."""
+        try:
+            path, report = await self.bot.memory_diagnostics.write_snapshot()
+            
+            embed = discord.Embed(title="🧠 Memory Report", color=BOT_COLOR)
+            
+            process = []
+            if report['rss_bytes'] is not None:
+                process.append(f"RSS: {report['rss_bytes'] / 2**20:,.1f} MiB")
+            traced = report.get('tracemalloc')
+            if traced:
+                process.append(f"Traced: {traced['current_bytes'] / 2**20:,.1f} MiB "
+                               f"(peak {traced['peak_bytes'] / 2**20:,.1f} MiB)")
+            else:
+                process.append("Allocation tracing is off (set MEMORY_DIAGNOSTICS=1)")
+            embed.add_field(name="Process", value="\n".join(process), inline=False)
+            
+            caches = sorted(report['caches'].items(), key=lambda item: item[1], reverse=True)[:10]
+            embed.add_field(
+                name="Largest Caches",
+                value="\n".join(f"`{name}`: {size:,}" for name, size in caches) or "None",
+                inline=True
+            )
+            embed.add_field(
+                name="Object Types",
+                value="\n".join(
+                    f"`{kind}`: {count:,}" for kind, count in list(report['object_types'].items())[:10]
+                ),
+                inline=True
+            )
+            if traced:
+                embed.add_field(
+                    name="Top Allocators",
+                    value="\n".join(
+                        f"`{stat['site'][-60:]}`: {stat['size_bytes'] / 1024:,.0f} KiB"
+                        for stat in traced['top_allocators'][:5]
+                    ) or "None",
+                    inline=False
+                )
+            embed.set_footer(text=f"Snapshot: {path}")
+            
+            await ctx.send(embed=embed)
+            
+        except Exception as e:
+            await ctx.send("❌ An error occurred while building the memory report.")
 
 class ConfirmActionView(discord.ui.View):
     """Confirmation view for expensive administrative actions."""
     
-    def __init__(self, bot, guild_id: int, user_id: int, action_type: str, cost: int, data: str):
+    def __init__(self, bot, guild_id: int, user_id: int, action_type: str, cost: int, data: str,
+                 token: str):
         super().__init__(timeout=60)
         self.bot = bot
         self.guild_id = guild_id
@@ -289,6 +400,8 @@ class ConfirmActionView(discord.ui.View):
         self.action_type = action_type
         self.cost = cost
         self.data = data
+        self.token = token
+        self.processing = False
     
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger, emoji="✅")
     async def confirm_action(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -299,37 +412,67 @@ class ConfirmActionView(discord.ui.View):
             )
             return
         
-        # Execute the action
-        success = await self.bot.db.deduct_treasury(self.guild_id, self.cost)
-        
-        if not success:
+        # Clicks racing in this process stop here, before touching the database
+        if self.processing:
             await interaction.response.send_message(
-                "❌ Insufficient funds to complete this action.",
+                "⏳ This action is already being processed.",
                 ephemeral=True
             )
             return
+        self.processing = True
         
-        if self.action_type == 'mass_message':
-            # Send mass message logic would go here
-            recipient_count = len([m for m in interaction.guild.members if not m.bot])
+        try:
+            if self.action_type == 'mass_message':
+                # Delivered in the background; the admin's message shows progress
+                async def report(progress, done):
+                    try:
+                        await interaction.edit_original_response(embed=progress_embed(progress, done))
+                    except discord.HTTPException:
+                        pass  # Interaction token expired (15 minutes); the summary is also DMed
+                
+                # Claiming the token pays for the broadcast and records it in one transaction
+                result = await self.bot.broadcasts.start(
+                    interaction.guild, self.token, self.user_id, self.data, report
+                )
+            else:
+                # Claiming the token pays for the action exactly once
+                result = await self.bot.db.claim_pending_action(self.token, self.guild_id)
             
-            await self.bot.db.log_admin_action(
-                guild_id=self.guild_id,
-                user_id=self.user_id,
-                action_type=self.action_type,
-                cost=self.cost,
-                description=f"Mass message sent to {recipient_count} members",
-                success=True
-            )
-        
-        embed = discord.Embed(
-            title="✅ Action Completed",
-            description=f"Administrative action executed successfully.",
-            color=0x00FF00
-        )
-        embed.add_field(name="Cost", value=f"${self.cost:,}", inline=True)
-        
-        await interaction.response.edit_message(embed=embed, view=None)
+            if result != 'claimed':
+                self.processing = result == 'action_used'  # A funds shortfall may be retried
+                await interaction.response.send_message(
+                    ERROR_MESSAGES[result],
+                    ephemeral=True
+                )
+                return
+            
+            if self.action_type == 'mass_message':
+                embed = discord.Embed(
+                    title="📢 Mass Message Started",
+                    description="Members are being messaged in the background. "
+                                "Undelivered messages are refunded proportionally when it finishes.",
+                    color=0xFFA500
+                )
+            else:
+                embed = discord.Embed(
+                    title="✅ Action Completed",
+                    description=f"Administrative action executed successfully.",
+                    color=0x00FF00
+                )
+            embed.add_field(name="Cost", value=f"${self.cost:,}", inline=True)
+            
+            await interaction.response.edit_message(embed=embed, view=None)
+            
+        except Exception as e:
+            # A failed claim rolled back; a repeated click after a successful one is refused
+            self.processing = False
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send(ERROR_MESSAGES['general_error'], ephemeral=True)
+                else:
+                    await interaction.response.send_message(ERROR_MESSAGES['general_error'], ephemeral=True)
+            except discord.HTTPException:
+                pass
     
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="❌")
     async def cancel_action(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -340,6 +483,13 @@ class ConfirmActionView(discord.ui.View):
             )
             return
         
+        if self.processing or not await self.bot.db.cancel_pending_action(self.token):
+            await interaction.response.send_message(
+                "❌ This action has already been confirmed.",
+                ephemeral=True
+            )
+            return
+        
         embed = discord.Embed(
             title="❌ Action Cancelled",
             description="Administrative action was cancelled.",
@@ -347,6 +497,10 @@ class ConfirmActionView(discord.ui.View):
         )
         
         await interaction.response.edit_message(embed=embed, view=None)
+    
+    async def on_timeout(self):
+        if not self.processing:
+            await self.bot.db.cancel_pending_action(self.token)
 
 async def setup(bot):
     await bot.add_cog(Administration(bot))
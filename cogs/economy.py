@@ -3,14 +3,217 @@ Economic influence and participation commands
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from typing import Optional, Dict, List
-import random
+from typing import Optional, Dict, List, Set, Tuple
+import asyncio
+import logging
+import time
 from datetime import datetime, timedelta
 
+from utils import clock, rng
 from utils.embeds import EconomicEmbeds
-from utils.constants import BOT_COLOR, ECONOMIC_STATUS
+from utils.constants import BOT_COLOR, ECONOMIC_STATUS, PERMISSIONS, PETITIONS, PETITION_TYPES
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class PetitionSupportButton(discord.ui.DynamicItem[discord.ui.Button],
+                            template=r'petition:support:(?P<petition_id>[0-9]+)'):
+    """Support button for a petition.
+    
+    The petition id lives in the custom id, so buttons on old messages keep
+    working after a restart without re-attaching views.
+    """
+    
+    def __init__(self, petition_id: int):
+        super().__init__(discord.ui.Button(
+            label="Support",
+            emoji="👍",
+            style=discord.ButtonStyle.success,
+            custom_id=f"petition:support:{petition_id}"
+        ))
+        self.petition_id = petition_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match['petition_id']))
+    
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog('Economy')
+        await cog.petitions.vote(interaction, self.petition_id)
+
+def petition_view(petition_id: int) -> discord.ui.View:
+    """Persistent view holding a petition's support button."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(PetitionSupportButton(petition_id))
+    return view
+
+class PetitionTracker:
+    """Collects petition votes in memory and writes them in batches.
+    
+    Each open petition's voter set is loaded once, so repeat clicks are
+    rejected without a query. New votes are queued and flushed in one
+    transaction every few seconds, and a petition's embed is edited at most
+    once per embed_edit_seconds however many people click in between.
+    Effects are applied by whichever flush first sees the threshold reached.
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.embeds = EconomicEmbeds()
+        self.petitions: Dict[int, Dict] = {}
+        self.voters: Dict[int, Set[int]] = {}
+        self.pending: List[Tuple[int, int]] = []
+        self.dirty: Set[int] = set()
+        self.last_edit: Dict[int, float] = {}
+        self._load_lock = asyncio.Lock()
+    
+    def track(self, petition: Dict):
+        """Start tracking a petition that was just created."""
+        self.petitions[petition['id']] = petition
+        self.voters[petition['id']] = {petition['started_by']}
+        self.last_edit[petition['id']] = time.monotonic()
+    
+    def _forget(self, petition_id: int):
+        self.petitions.pop(petition_id, None)
+        self.voters.pop(petition_id, None)
+        self.last_edit.pop(petition_id, None)
+        self.dirty.discard(petition_id)
+    
+    async def _load(self, petition_id: int) -> Optional[Dict]:
+        """Get an open petition, loading it and its voters on first use."""
+        if petition_id in self.petitions:
+            return self.petitions[petition_id]
+        
+        async with self._load_lock:
+            if petition_id not in self.petitions:
+                petition = await self.bot.db.get_petition(petition_id)
+                if petition is None or petition['status'] != 'open':
+                    return petition
+                self.voters[petition_id] = await self.bot.db.get_petition_voters(petition_id)
+                self.petitions[petition_id] = petition
+            return self.petitions[petition_id]
+    
+    def _expired(self, petition: Dict) -> bool:
+        return datetime.fromisoformat(petition['expires_at']) <= clock.now()
+    
+    async def vote(self, interaction: discord.Interaction, petition_id: int):
+        """Record a support click; the vote is stored on the next flush."""
+        petition = await self._load(petition_id)
+        if petition is None or petition['status'] != 'open' or self._expired(petition):
+            await interaction.response.send_message(
+                "❌ This petition is no longer open.",
+                ephemeral=True
+            )
+            return
+        
+        voters = self.voters[petition_id]
+        if interaction.user.id in voters:
+            await interaction.response.send_message(
+                "ℹ️ You already support this petition.",
+                ephemeral=True
+            )
+            return
+        
+        voters.add(interaction.user.id)
+        self.pending.append((petition_id, interaction.user.id))
+        metrics.inc('petition_votes_total')
+        
+        await interaction.response.send_message(
+            f"✅ You now support **{PETITION_TYPES[petition['petition_type']]['name']}** "
+            f"({len(voters)}/{petition['required_supporters']} supporters).",
+            ephemeral=True
+        )
+    
+    async def flush(self):
+        """Write buffered votes, pass petitions at their threshold and refresh embeds."""
+        if self.pending:
+            batch, self.pending = self.pending, []
+            try:
+                counts = await self.bot.db.record_petition_votes(batch)
+            except Exception:
+                # Keep the votes for the next flush
+                self.pending = batch + self.pending
+                raise
+            metrics.observe('petition_flush_batch_size', len(batch))
+            
+            for petition_id, supporters in counts.items():
+                petition = self.petitions.get(petition_id)
+                if petition is None:
+                    continue
+                petition['supporters'] = supporters
+                if supporters >= petition['required_supporters']:
+                    await self._pass(petition)
+                else:
+                    self.dirty.add(petition_id)
+        
+        now = time.monotonic()
+        for petition_id in list(self.dirty):
+            if now - self.last_edit.get(petition_id, 0) >= PETITIONS['embed_edit_seconds']:
+                self.dirty.discard(petition_id)
+                await self._edit_message(self.petitions[petition_id])
+        
+        for petition in list(self.petitions.values()):
+            if self._expired(petition):
+                petition['status'] = 'expired'
+                await self._edit_message(petition)
+                self._forget(petition['id'])
+    
+    async def _pass(self, petition: Dict):
+        """Close a petition that reached its threshold and apply its effect once.
+        
+        The status change and the effect are one write, so a petition is
+        never marked passed without its effect, nor granted it twice.
+        """
+        petition_type = petition['petition_type']
+        effect = {}
+        if petition_type == 'stimulus':
+            effect['treasury_change'] = PETITIONS['stimulus_amount']
+        elif petition_type == 'lower_costs':
+            effect['modifier'] = (
+                'action_cost', PETITIONS['lower_costs_multiplier'],
+                clock.now() + timedelta(hours=PETITIONS['lower_costs_hours'])
+            )
+        elif petition_type == 'increase_income':
+            effect['modifier'] = (
+                'income', PETITIONS['increase_income_multiplier'],
+                clock.now() + timedelta(hours=PETITIONS['increase_income_hours'])
+            )
+        elif petition_type == 'trade_review':
+            effect['modifier'] = (
+                'trade_policy_cost', 0.0,
+                clock.now() + timedelta(hours=PETITIONS['trade_review_hours'])
+            )
+        
+        passed = await self.bot.db.pass_petition(
+            petition['id'], f"Petition passed: {PETITION_TYPES[petition_type]['effect']}", **effect
+        )
+        if passed:
+            if 'modifier' in effect:
+                await self.bot.economic_engine.refresh_modifiers()
+            logger.info(f"Petition {petition['id']} passed in guild {petition['guild_id']}")
+        
+        petition['status'] = 'passed'
+        await self._edit_message(petition)
+        self._forget(petition['id'])
+    
+    async def _edit_message(self, petition: Dict):
+        """Show a petition's current state on its message."""
+        self.last_edit[petition['id']] = time.monotonic()
+        channel = self.bot.get_channel(petition['channel_id']) if petition['channel_id'] else None
+        if channel is None:
+            return
+        
+        kwargs = {'embed': self.embeds.create_petition_embed(petition)}
+        if petition['status'] != 'open':
+            kwargs['view'] = None
+        
+        try:
+            await channel.get_partial_message(petition['message_id']).edit(**kwargs)
+            metrics.inc('petition_embed_edits_total')
+        except discord.HTTPException as e:
+            logger.warning(f"Could not update petition {petition['id']} message: {e}")
 
 class Economy(commands.Cog):
     """Commands for economic participation and influence."""
@@ -18,7 +221,29 @@ class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.embeds = EconomicEmbeds()
-        self.user_cooldowns = {}  # Simple in-memory cooldown tracking
+        self.cooldowns = bot.influence_cooldowns
+        self.petitions = PetitionTracker(bot)
+    
+    async def cog_load(self):
+        self.bot.add_dynamic_items(PetitionSupportButton)
+        self.petition_flusher.start()
+    
+    async def cog_unload(self):
+        self.petition_flusher.cancel()
+        # Don't lose votes clicked since the last flush
+        try:
+            await self.petitions.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush petition votes: {e}")
+        self.bot.remove_dynamic_items(PetitionSupportButton)
+    
+    @tasks.loop(seconds=PETITIONS['flush_seconds'])
+    async def petition_flusher(self):
+        """Write buffered petition votes in one batch."""
+        try:
+            await self.petitions.flush()
+        except Exception as e:
+            logger.error(f"Petition flush error: {e}")
     
     @app_commands.command(name="economic-influence", description="Attempt to influence the economy (limited uses)")
     @app_commands.describe(influence_type="Type of economic influence to attempt")
@@ -34,21 +259,19 @@ class Economy(commands.Cog):
         user_id = interaction.user.id
         guild_id = interaction.guild.id
         
-        # Check cooldown (6 hours per user)
-        cooldown_key = f"{user_id}_{guild_id}"
-        if cooldown_key in self.user_cooldowns:
-            last_use = self.user_cooldowns[cooldown_key]
-            if datetime.now() - last_use < timedelta(hours=6):
-                remaining = timedelta(hours=6) - (datetime.now() - last_use)
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
-                
-                await interaction.response.send_message(
-                    f"⏰ You can use economic influence again in {hours}h {minutes}m.",
-                    ephemeral=True
-                )
-                return
+        # Check and start cooldown (6 hours per user)
+        remaining = await self.cooldowns.try_start(guild_id, user_id)
+        if remaining:
+            hours = int(remaining.total_seconds() // 3600)
+            minutes = int((remaining.total_seconds() % 3600) // 60)
+            
+            await interaction.response.send_message(
+                f"⏰ You can use economic influence again in {hours}h {minutes}m.",
+                ephemeral=True
+            )
+            return
         
+        applied = False
         try:
             economy = await self.bot.db.get_guild_economy(guild_id)
             
@@ -63,44 +286,42 @@ class Economy(commands.Cog):
             }
             
             success_rate = success_rates.get(economy['economic_status'], 0.5)
-            is_successful = random.random() < success_rate
-            
-            # Set cooldown
-            self.user_cooldowns[cooldown_key] = datetime.now()
+            stream = rng.for_guild(guild_id, 'influence')
+            is_successful = stream.random() < success_rate
             
             influence_effects = {
                 'confidence': {
                     'name': 'Market Confidence Boost',
-                    'success_treasury': random.randint(500, 1500),
-                    'fail_treasury': random.randint(-300, 100),
+                    'success_treasury': stream.randint(500, 1500),
+                    'fail_treasury': stream.randint(-300, 100),
                     'success_desc': 'boosted market confidence, attracting investments!',
                     'fail_desc': 'failed to convince investors, causing minor uncertainty.'
                 },
                 'investment': {
                     'name': 'Investment Drive',
-                    'success_treasury': random.randint(800, 2000),
-                    'fail_treasury': random.randint(-500, 0),
+                    'success_treasury': stream.randint(800, 2000),
+                    'fail_treasury': stream.randint(-500, 0),
                     'success_desc': 'attracted new investments to the economy!',
                     'fail_desc': 'scared away potential investors with unrealistic promises.'
                 },
                 'spending': {
                     'name': 'Consumer Spending Push',
-                    'success_treasury': random.randint(400, 1200),
-                    'fail_treasury': random.randint(-200, 200),
+                    'success_treasury': stream.randint(400, 1200),
+                    'fail_treasury': stream.randint(-200, 200),
                     'success_desc': 'encouraged consumer spending, boosting local businesses!',
                     'fail_desc': 'created confusion in the marketplace.'
                 },
                 'export': {
                     'name': 'Export Promotion',
-                    'success_treasury': random.randint(600, 1800),
-                    'fail_treasury': random.randint(-400, 100),
+                    'success_treasury': stream.randint(600, 1800),
+                    'fail_treasury': stream.randint(-400, 100),
                     'success_desc': 'successfully promoted exports, bringing in foreign currency!',
                     'fail_desc': 'failed to secure export deals, wasting promotional resources.'
                 },
                 'innovation': {
                     'name': 'Innovation Initiative',
-                    'success_treasury': random.randint(300, 2500),
-                    'fail_treasury': random.randint(-600, 200),
+                    'success_treasury': stream.randint(300, 2500),
+                    'fail_treasury': stream.randint(-600, 200),
                     'success_desc': 'sparked innovation, creating new economic opportunities!',
                     'fail_desc': 'innovation attempt failed, consuming research resources.'
                 }
@@ -121,6 +342,7 @@ class Economy(commands.Cog):
             
             # Apply treasury change
             await self.bot.db.update_treasury(guild_id, treasury_change)
+            applied = True
             
             embed = discord.Embed(
                 title=result_title,
@@ -135,6 +357,9 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=embed)
             
         except Exception as e:
+            if not applied:
+                # The attempt had no effect, so it shouldn't use up the cooldown
+                await self.cooldowns.release(guild_id, user_id)
             await interaction.response.send_message(
                 "❌ An error occurred while processing your economic influence.",
                 ephemeral=True
@@ -152,56 +377,44 @@ class Economy(commands.Cog):
         """Start a petition for economic changes."""
         try:
             guild_id = interaction.guild.id
-            economy = await self.bot.db.get_guild_economy(guild_id)
             
-            petition_data = {
-                'lower_costs': {
-                    'name': 'Lower Administrative Costs',
-                    'description': 'Petition to reduce the cost of administrative actions by 25% for one week.',
-                    'required_supporters': 10,
-                    'effect': 'Reduced admin costs for 1 week'
-                },
-                'increase_income': {
-                    'name': 'Increase Passive Income',
-                    'description': 'Petition to temporarily increase passive income generation by 50% for 3 days.',
-                    'required_supporters': 15,
-                    'effect': '+50% passive income for 3 days'
-                },
-                'stimulus': {
-                    'name': 'Economic Stimulus Request',
-                    'description': 'Petition for a one-time economic stimulus package.',
-                    'required_supporters': 20,
-                    'effect': 'One-time treasury injection of $10,000'
-                },
-                'trade_review': {
-                    'name': 'Trade Policy Review',
-                    'description': 'Petition for a review and potential adjustment of current trade policy.',
-                    'required_supporters': 12,
-                    'effect': 'Allows immediate trade policy change'
-                }
-            }
-            
-            petition = petition_data[petition_type]
+            # One open petition per type, so support isn't split across duplicates
+            existing = await self.bot.db.get_open_petition(guild_id, petition_type)
+            if existing:
+                link = ""
+                if existing['message_id']:
+                    link = f"\nhttps://discord.com/channels/{guild_id}/{existing['channel_id']}/{existing['message_id']}"
+                await interaction.response.send_message(
+                    f"ℹ️ A {PETITION_TYPES[petition_type]['name']} petition is already open "
+                    f"({existing['supporters']}/{existing['required_supporters']} supporters).{link}",
+                    ephemeral=True
+                )
+                return
             
-            embed = discord.Embed(
-                title=f"📋 Economic Petition: {petition['name']}",
-                description=petition['description'],
-                color=BOT_COLOR
+            petition = await self.bot.db.create_petition(
+                guild_id=guild_id,
+                petition_type=petition_type,
+                started_by=interaction.user.id,
+                required_supporters=PERMISSIONS['petition_supporters_required'][petition_type],
+                expires_at=clock.now() + timedelta(hours=PETITIONS['duration_hours'])
             )
-            embed.add_field(name="Required Supporters", value=str(petition['required_supporters']), inline=True)
-            embed.add_field(name="Current Supporters", value="1", inline=True)
-            embed.add_field(name="Effect", value=petition['effect'], inline=False)
-            embed.add_field(name="Started by", value=interaction.user.mention, inline=True)
-            embed.set_footer(text="React with 👍 to support this petition")
             
-            await interaction.response.send_message(embed=embed)
-            # Note: Add reaction functionality would need to be implemented differently for slash commands
+            embed = self.embeds.create_petition_embed(petition)
+            await interaction.response.send_message(embed=embed, view=petition_view(petition['id']))
+            
+            message = await interaction.original_response()
+            petition['channel_id'] = message.channel.id
+            petition['message_id'] = message.id
+            await self.bot.db.set_petition_message(petition['id'], message.channel.id, message.id)
+            self.petitions.track(petition)
             
         except Exception as e:
-            await interaction.response.send_message(
-                "❌ An error occurred while starting the petition.",
-                ephemeral=True
-            )
+            logger.error(f"Error starting petition: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "❌ An error occurred while starting the petition.",
+                    ephemeral=True
+                )
     
     @app_commands.command(name="market-report", description="View current market conditions and opportunities")
     async def market_report(self, interaction: discord.Interaction):
@@ -250,24 +463,15 @@ class Economy(commands.Cog):
             embed.add_field(name="Market Sentiment", value=sentiment, inline=True)
             
             # Next influence availability
-            user_cooldown_key = f"{interaction.user.id}_{guild_id}"
-            if user_cooldown_key in self.user_cooldowns:
-                next_influence = self.user_cooldowns[user_cooldown_key] + timedelta(hours=6)
-                time_until = next_influence - datetime.now()
-                if time_until.total_seconds() > 0:
-                    hours = int(time_until.total_seconds() // 3600)
-                    minutes = int((time_until.total_seconds() % 3600) // 60)
-                    embed.add_field(
-                        name="Your Next Influence", 
-                        value=f"{hours}h {minutes}m", 
-                        inline=True
-                    )
-                else:
-                    embed.add_field(
-                        name="Your Next Influence", 
-                        value="Available now!", 
-                        inline=True
-                    )
+            time_until = await self.cooldowns.remaining(guild_id, interaction.user.id)
+            if time_until:
+                hours = int(time_until.total_seconds() // 3600)
+                minutes = int((time_until.total_seconds() % 3600) // 60)
+                embed.add_field(
+                    name="Your Next Influence", 
+                    value=f"{hours}h {minutes}m", 
+                    inline=True
+                )
             else:
                 embed.add_field(
                     name="Your Next Influence", 
@@ -5,11 +5,13 @@ Economic events system - random events that affect the economy
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
-from datetime import datetime
+from typing import List
 import asyncio
 
+from utils import clock, rng
 from utils.embeds import EconomicEmbeds
+from utils.dispatcher import PRIORITY_EVENT
+from utils.event_catalog import EventCatalog
 from utils.constants import BOT_COLOR
 
 class Events(commands.Cog):
@@ -19,178 +21,54 @@ class Events(commands.Cog):
         self.bot = bot
         self.embeds = EconomicEmbeds()
         
-        # Define economic events
-        self.positive_events = [
-            {
-                'name': 'Foreign Investment Surge',
-                'description': 'International investors have shown significant interest in the economy, bringing in substantial capital.',
-                'treasury_impact': random.randint(3000, 8000),
-                'probability': 0.15
-            },
-            {
-                'name': 'Technological Breakthrough',
-                'description': 'A major technological innovation has been developed, boosting productivity across sectors.',
-                'treasury_impact': random.randint(2000, 6000),
-                'status_impact': None,
-                'probability': 0.12
-            },
-            {
-                'name': 'Export Boom',
-                'description': 'International demand for domestic products has skyrocketed, boosting export revenues.',
-                'treasury_impact': random.randint(4000, 10000),
-                'probability': 0.13
-            },
-            {
-                'name': 'Resource Discovery',
-                'description': 'New valuable natural resources have been discovered, attracting mining investments.',
-                'treasury_impact': random.randint(5000, 12000),
-                'probability': 0.08
-            },
-            {
-                'name': 'Tourism Surge',
-                'description': 'A viral social media campaign has attracted millions of tourists, boosting the service sector.',
-                'treasury_impact': random.randint(2500, 7000),
-                'probability': 0.14
-            },
-            {
-                'name': 'Infrastructure Grant',
-                'description': 'International development organizations have approved major infrastructure funding.',
-                'treasury_impact': random.randint(6000, 15000),
-                'probability': 0.06
-            }
-        ]
-        
-        self.negative_events = [
-            {
-                'name': 'Market Crash',
-                'description': 'Sudden market volatility has caused widespread panic selling and economic uncertainty.',
-                'treasury_impact': random.randint(-8000, -3000),
-                'status_impact': 'Economic Recession',
-                'probability': 0.12
-            },
-            {
-                'name': 'Natural Disaster',
-                'description': 'A severe natural disaster has damaged critical infrastructure and disrupted economic activity.',
-                'treasury_impact': random.randint(-10000, -5000),
-                'probability': 0.10
-            },
-            {
-                'name': 'Trade War',
-                'description': 'International trade disputes have resulted in tariffs and reduced export opportunities.',
-                'treasury_impact': random.randint(-6000, -2000),
-                'probability': 0.11
-            },
-            {
-                'name': 'Banking Crisis',
-                'description': 'Major financial institutions are facing liquidity problems, affecting business loans.',
-                'treasury_impact': random.randint(-7000, -3000),
-                'status_impact': 'Economic Stagnation',
-                'probability': 0.09
-            },
-            {
-                'name': 'Energy Crisis',
-                'description': 'Sudden spike in energy prices has increased operational costs across all sectors.',
-                'treasury_impact': random.randint(-5000, -1500),
-                'probability': 0.13
-            },
-            {
-                'name': 'Labor Strike',
-                'description': 'Widespread labor strikes have disrupted production and transportation networks.',
-                'treasury_impact': random.randint(-4000, -1000),
-                'probability': 0.14
-            },
-            {
-                'name': 'Cyber Attack',
-                'description': 'A major cyber attack has disrupted financial systems and e-commerce platforms.',
-                'treasury_impact': random.randint(-6000, -2500),
-                'probability': 0.08
-            }
-        ]
-        
-        self.neutral_events = [
-            {
-                'name': 'Policy Announcement',
-                'description': 'Government has announced new economic policies that are receiving mixed reactions.',
-                'treasury_impact': random.randint(-1000, 1000),
-                'probability': 0.18
-            },
-            {
-                'name': 'Currency Fluctuation',
-                'description': 'The national currency has experienced moderate fluctuations against major currencies.',
-                'treasury_impact': random.randint(-2000, 2000),
-                'probability': 0.16
-            },
-            {
-                'name': 'Market Speculation',
-                'description': 'Investors are speculating about future market conditions, causing minor volatility.',
-                'treasury_impact': random.randint(-1500, 1500),
-                'probability': 0.15
-            }
-        ]
+        # Events are compiled once; impacts are sampled fresh per trigger
+        self.catalog = EventCatalog()
     
     async def trigger_random_event(self, guild_id: int):
         """Trigger a random economic event for a guild."""
+        await self.trigger_random_events([guild_id])
+    
+    async def trigger_random_events(self, guild_ids: List[int]):
+        """Trigger one random economic event for each guild.
+        
+        Events are selected for all guilds in one vectorized draw from the
+        alias table of each guild's economic status.
+        """
         try:
-            economy = await self.bot.db.get_guild_economy(guild_id)
-            
-            # Select event type based on current economic status
-            event_weights = self.get_event_weights(economy['economic_status'])
-            
-            event_type = random.choices(
-                ['positive', 'negative', 'neutral'],
-                weights=event_weights
-            )[0]
-            
-            # Select specific event
-            if event_type == 'positive':
-                event = random.choice(self.positive_events)
-            elif event_type == 'negative':
-                event = random.choice(self.negative_events)
-            else:
-                event = random.choice(self.neutral_events)
-            
-            # Randomize treasury impact
-            base_impact = event['treasury_impact']
-            if isinstance(base_impact, int):
-                # Add some randomness (±20%)
-                variance = int(abs(base_impact) * 0.2)
-                if base_impact > 0:
-                    final_impact = random.randint(base_impact - variance, base_impact + variance)
-                else:
-                    final_impact = random.randint(base_impact - variance, base_impact + variance)
+            engine = self.bot.economic_engine
+            keys = []
+            for guild_id in guild_ids:
+                economy = await self.bot.db.get_guild_economy(guild_id)
+                # A stability boost rules out negative events
+                keys.append((economy['economic_status'], engine.has_modifier(guild_id, 'event_protection')))
+            
+            # Each guild draws from its own seeded stream, so batching doesn't change its pick
+            if len(keys) == 1:
+                picks = [self.catalog.pick(*keys[0], rng=rng.for_guild(guild_ids[0], 'events'))]
             else:
-                final_impact = base_impact
-            
-            # Apply event effects
-            event_data = {
-                'type': event_type,
-                'name': event['name'],
-                'description': event['description'],
-                'treasury_impact': final_impact,
-                'status_impact': event.get('status_impact')
-            }
-            
-            await self.bot.economic_engine.apply_economic_event(guild_id, event_data)
-            
-            # Send event notification to the guild
-            guild = self.bot.get_guild(guild_id)
-            if guild:
-                await self.send_event_notification(guild, event_data)
-            
+                picks = self.catalog.pick_many(
+                    keys, uniforms=rng.get_streams().random(guild_ids, 'events')
+                )
         except Exception as e:
-            print(f"Error triggering random event for guild {guild_id}: {e}")
+            print(f"Error selecting random events for {len(guild_ids)} guilds: {e}")
+            return
+        
+        for guild_id, (event_type, event) in zip(guild_ids, picks):
+            try:
+                await self.fire_event(guild_id, self.catalog.event_data(
+                    event_type, event, rng.for_guild(guild_id, 'events')
+                ))
+            except Exception as e:
+                print(f"Error triggering random event for guild {guild_id}: {e}")
     
     async def trigger_positive_event(self, guild_id: int):
         """Trigger a positive economic event (for admin boost)."""
         try:
-            event = random.choice(self.positive_events)
+            stream = rng.for_guild(guild_id, 'events')
+            _, event = self.catalog.pick_type('positive', stream)
             
             # Boost the impact for admin-triggered events
-            base_impact = event['treasury_impact']
-            if isinstance(base_impact, int):
-                boosted_impact = int(base_impact * 1.5)  # 50% boost
-            else:
-                boosted_impact = base_impact
+            boosted_impact = int(self.catalog.roll_impact(event, stream) * 1.5)  # 50% boost
             
             event_data = {
                 'type': 'positive',
@@ -200,45 +78,24 @@ class Events(commands.Cog):
                 'status_impact': event.get('status_impact')
             }
             
-            await self.bot.economic_engine.apply_economic_event(guild_id, event_data)
-            
-            guild = self.bot.get_guild(guild_id)
-            if guild:
-                await self.send_event_notification(guild, event_data)
+            await self.fire_event(guild_id, event_data)
                 
         except Exception as e:
             print(f"Error triggering positive event for guild {guild_id}: {e}")
     
-    def get_event_weights(self, economic_status: str) -> list:
-        """Get event probability weights based on current economic status."""
-        # [positive_weight, negative_weight, neutral_weight]
-        weights = {
-            'Economic Crash': [0.4, 0.1, 0.5],      # More positive events during crash
-            'Economic Recession': [0.35, 0.2, 0.45],
-            'Economic Stagnation': [0.3, 0.3, 0.4],
-            'Stable Growth': [0.25, 0.25, 0.5],     # Balanced
-            'Rapid Growth': [0.2, 0.35, 0.45],      # More risk of negative events
-            'Economic Boom': [0.15, 0.4, 0.45]      # High risk during boom
-        }
+    async def fire_event(self, guild_id: int, event_data: dict):
+        """Apply an event's effects and announce it in the guild."""
+        await self.bot.economic_engine.apply_economic_event(guild_id, event_data)
         
-        return weights.get(economic_status, [0.25, 0.25, 0.5])
+        guild = self.bot.get_guild(guild_id)
+        if guild:
+            await self.send_event_notification(guild, event_data)
     
     async def send_event_notification(self, guild: discord.Guild, event_data: dict):
         """Send event notification to the guild."""
         try:
-            # Find a suitable channel to send the notification
-            # Priority: 'economy' channel, 'general' channel, first text channel
-            target_channel = None
-            
-            for channel in guild.text_channels:
-                if 'economy' in channel.name.lower():
-                    target_channel = channel
-                    break
-                elif 'general' in channel.name.lower() and target_channel is None:
-                    target_channel = channel
-                elif target_channel is None:
-                    target_channel = channel
-            
+            # Configured or auto-detected channel the bot can post in (cached per guild)
+            target_channel = await self.bot.notification_channels.resolve(guild)
             if not target_channel:
                 return  # No suitable channel found
             
@@ -258,7 +115,7 @@ class Events(commands.Cog):
                 title=f"{emoji} Economic Event: {event_data['name']}",
                 description=event_data['description'],
                 color=color,
-                timestamp=datetime.now()
+                timestamp=clock.now()
             )
             
             treasury_impact = event_data.get('treasury_impact', 0)
@@ -279,7 +136,10 @@ class Events(commands.Cog):
             
             embed.set_footer(text="Economic Event System")
             
-            await target_channel.send(embed=embed)
+            # Queued; the dispatcher paces sends and merges pending updates for this guild
+            self.bot.dispatcher.enqueue(
+                target_channel, embed=embed, priority=PRIORITY_EVENT, coalesce_key=guild.id
+            )
             
         except Exception as e:
             print(f"Error sending event notification to guild {guild.id}: {e}")
@@ -321,7 +181,7 @@ class Events(commands.Cog):
                 )
                 return
             
-            now = datetime.now()
+            now = clock.now()
             if next_event_time <= now:
                 await interaction.response.send_message(
                     "⏰ An economic event should occur soon!",
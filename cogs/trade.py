@@ -7,16 +7,17 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 
-from chart_generator import ChartGenerator
 from utils.embeds import EconomicEmbeds
-from utils.constants import TRADE_POLICIES, TRADE_POLICY_EFFECTS, BOT_COLOR
+from utils.constants import (
+    TRADE_POLICIES, TRADE_POLICY_EFFECTS, BOT_COLOR, ERROR_MESSAGES, PENDING_ACTIONS
+)
+from utils.tracing import span
 
 class Trade(commands.Cog):
     """Trade policy management commands."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.chart_gen = ChartGenerator()
         self.embeds = EconomicEmbeds()
     
     @app_commands.command(name="trade-policy", description="View current trade policy status")
@@ -27,14 +28,15 @@ class Trade(commands.Cog):
             economy = await self.bot.db.get_guild_economy(guild_id)
             
             # Generate trade policy chart
-            chart_file = await self.chart_gen.generate_trade_policy_chart(
+            chart_file = await self.bot.chart_gen.generate_trade_policy_chart(
                 economy['trade_policy'], interaction.guild.name
             )
             
             # Create embed with trade policy information
             embed = self.embeds.create_trade_policy_embed(economy)
             
-            await interaction.response.send_message(embed=embed, file=chart_file)
+            with span('upload response'):
+                await interaction.response.send_message(embed=embed, file=chart_file)
             
         except Exception as e:
             await interaction.response.send_message(
@@ -72,7 +74,11 @@ class Trade(commands.Cog):
                 current_policy, new_policy
             )
             
-            transition_cost = effects['transition_cost']
+            # A passed trade review petition waives the transition cost
+            cost_multiplier = self.bot.economic_engine.get_modifier_multiplier(
+                guild_id, 'trade_policy_cost'
+            )
+            transition_cost = int(effects['transition_cost'] * cost_multiplier)
             
             # Check if enough treasury for transition
             if economy['treasury'] < transition_cost:
@@ -110,9 +116,13 @@ class Trade(commands.Cog):
             if effects_text:
                 embed.add_field(name="Policy Effects", value="\n".join(effects_text), inline=False)
             
+            token = await self.bot.db.create_pending_action(
+                guild_id, interaction.user.id, 'trade_policy_change', transition_cost,
+                PENDING_ACTIONS['ttl_seconds']
+            )
             view = ConfirmTradePolicyView(
                 self.bot, guild_id, interaction.user.id, 
-                current_policy, new_policy, transition_cost
+                current_policy, new_policy, transition_cost, token
             )
             
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
@@ -205,7 +215,8 @@ class Trade(commands.Cog):
 class ConfirmTradePolicyView(discord.ui.View):
     """Confirmation view for trade policy changes."""
     
-    def __init__(self, bot, guild_id: int, user_id: int, current_policy: str, new_policy: str, cost: int):
+    def __init__(self, bot, guild_id: int, user_id: int, current_policy: str, new_policy: str, cost: int,
+                 token: str):
         super().__init__(timeout=60)
         self.bot = bot
         self.guild_id = guild_id
@@ -213,6 +224,8 @@ class ConfirmTradePolicyView(discord.ui.View):
         self.current_policy = current_policy
         self.new_policy = new_policy
         self.cost = cost
+        self.token = token
+        self.processing = False
     
     @discord.ui.button(label="Confirm Change", style=discord.ButtonStyle.danger, emoji="✅")
     async def confirm_policy_change(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -223,20 +236,30 @@ class ConfirmTradePolicyView(discord.ui.View):
             )
             return
         
+        # Clicks racing in this process stop here, before touching the database
+        if self.processing:
+            await interaction.response.send_message(
+                "⏳ This policy change is already being processed.",
+                ephemeral=True
+            )
+            return
+        self.processing = True
+        
         try:
-            # Deduct transition cost
-            success = await self.bot.db.deduct_treasury(self.guild_id, self.cost)
+            # Claiming the token deducts the transition cost exactly once, in the
+            # same transaction that changes the policy
+            result = await self.bot.db.claim_trade_policy_change(
+                self.token, self.guild_id, self.new_policy
+            )
             
-            if not success:
+            if result != 'claimed':
+                self.processing = result == 'action_used'  # A funds shortfall may be retried
                 await interaction.response.send_message(
-                    "❌ Insufficient treasury funds to complete the policy change.",
+                    ERROR_MESSAGES[result],
                     ephemeral=True
                 )
                 return
             
-            # Update trade policy
-            await self.bot.db.update_trade_policy(self.guild_id, self.new_policy)
-            
             # Log the action
             await self.bot.db.log_admin_action(
                 guild_id=self.guild_id,
@@ -259,10 +282,16 @@ class ConfirmTradePolicyView(discord.ui.View):
             await interaction.response.edit_message(embed=embed, view=None)
             
         except Exception as e:
-            await interaction.response.send_message(
-                "❌ An error occurred while applying the policy change.",
-                ephemeral=True
-            )
+            # A failed claim rolled back; a repeated click after a successful one is refused
+            self.processing = False
+            message = "❌ An error occurred while applying the policy change."
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send(message, ephemeral=True)
+                else:
+                    await interaction.response.send_message(message, ephemeral=True)
+            except discord.HTTPException:
+                pass
     
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="❌")
     async def cancel_policy_change(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -273,6 +302,13 @@ class ConfirmTradePolicyView(discord.ui.View):
             )
             return
         
+        if self.processing or not await self.bot.db.cancel_pending_action(self.token):
+            await interaction.response.send_message(
+                "❌ This policy change has already been confirmed.",
+                ephemeral=True
+            )
+            return
+        
         embed = discord.Embed(
             title="❌ Policy Change Cancelled",
             description="Trade policy change has been cancelled.",
@@ -280,6 +316,10 @@ class ConfirmTradePolicyView(discord.ui.View):
         )
         
         await interaction.response.edit_message(embed=embed, view=None)
+    
+    async def on_timeout(self):
+        if not self.processing:
+            await self.bot.db.cancel_pending_action(self.token)
 
 async def setup(bot):
     await bot.add_cog(Trade(bot))
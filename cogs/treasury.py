@@ -7,16 +7,15 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 
-from chart_generator import ChartGenerator
 from utils.embeds import EconomicEmbeds
 from utils.constants import ECONOMIC_STATUS, BOT_COLOR
+from utils.tracing import span
 
 class Treasury(commands.Cog):
     """Treasury management and monitoring commands."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.chart_gen = ChartGenerator()
         self.embeds = EconomicEmbeds()
     
     @app_commands.command(name="treasury", description="View current treasury status")
@@ -34,14 +33,15 @@ class Treasury(commands.Cog):
             
             # Generate treasury chart
             history = await self.bot.db.get_treasury_history(guild_id, 24)
-            chart_file = await self.chart_gen.generate_treasury_chart(
+            chart_file = await self.bot.chart_gen.generate_treasury_chart(
                 history, economy['economic_status'], interaction.guild.name
             )
             
             # Create embed
             embed = self.embeds.create_treasury_embed(economy, interaction.guild.name)
             
-            await interaction.followup.send(embed=embed, file=chart_file)
+            with span('upload response'):
+                await interaction.followup.send(embed=embed, file=chart_file)
             
         except Exception as e:
             await interaction.followup.send(
@@ -62,14 +62,15 @@ class Treasury(commands.Cog):
             forecast = self.bot.economic_engine.get_economic_forecast(economy)
             
             # Generate forecast chart
-            chart_file = await self.chart_gen.generate_forecast_chart(
+            chart_file = await self.bot.chart_gen.generate_forecast_chart(
                 forecast, economy, interaction.guild.name
             )
             
             # Create embed
             embed = self.embeds.create_forecast_embed(forecast, economy)
             
-            await interaction.followup.send(embed=embed, file=chart_file)
+            with span('upload response'):
+                await interaction.followup.send(embed=embed, file=chart_file)
             
         except Exception as e:
             await interaction.followup.send(
@@ -87,7 +88,7 @@ class Treasury(commands.Cog):
             economy = await self.bot.db.get_guild_economy(guild_id)
             
             # Generate status chart
-            chart_file = await self.chart_gen.generate_economic_status_pie_chart(
+            chart_file = await self.bot.chart_gen.generate_economic_status_pie_chart(
                 economy['economic_status'], interaction.guild.name
             )
             
@@ -97,7 +98,8 @@ class Treasury(commands.Cog):
             # Create embed
             embed = self.embeds.create_economic_status_embed(economy, recent_events)
             
-            await interaction.followup.send(embed=embed, file=chart_file)
+            with span('upload response'):
+                await interaction.followup.send(embed=embed, file=chart_file)
             
         except Exception as e:
             await interaction.followup.send(
@@ -148,7 +150,9 @@ class Treasury(commands.Cog):
             economy = await self.bot.db.get_guild_economy(guild_id)
             
             # Create costs embed
-            embed = self.embeds.create_admin_costs_embed(economy)
+            embed = self.embeds.create_admin_costs_embed(
+                economy, self.bot.economic_engine, guild_id
+            )
             
             await interaction.response.send_message(embed=embed)
             
@@ -3,182 +3,520 @@ Database management for the economic bot
 """
 
 import aiosqlite
+import asyncio
 import json
+import secrets
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Tuple
 import logging
 
+from utils import clock
+from utils.constants import DATABASE_CONFIG, PENDING_ACTIONS
+from utils.metrics import instrument_methods, metrics
+
 logger = logging.getLogger(__name__)
 
+@instrument_methods('db_call_seconds')
 class DatabaseManager:
-    """Handles all database operations for the economic bot."""
+    """Handles all database operations for the economic bot.
+    
+    Every mutation is queued to a single writer task that owns the only
+    write connection, so concurrent cogs, views and background loops never
+    contend for the SQLite write lock. Reads use a small pool of read-only
+    connections that run alongside the writer thanks to WAL mode.
+    """
     
     def __init__(self, db_path: str = "economic_bot.db"):
         self.db_path = db_path
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._writer_db: Optional[aiosqlite.Connection] = None
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._read_connections = []
+        
+        # In-memory economy rows: guild_id -> (row, loaded_at); kept current by the writer
+        self._economy_cache: Dict[int, Tuple[Dict[str, Any], float]] = {}
     
     async def initialize(self):
-        """Initialize the database with all required tables."""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Guild economies table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS guild_economies (
-                    guild_id INTEGER PRIMARY KEY,
-                    treasury INTEGER DEFAULT 10000,
-                    economic_status TEXT DEFAULT 'Stable Growth',
-                    trade_policy TEXT DEFAULT 'Balanced Trade',
-                    last_update TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Treasury history for charts
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS treasury_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    treasury_amount INTEGER,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
-                )
-            """)
-            
-            # Administrative actions log
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS admin_actions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    user_id INTEGER,
-                    action_type TEXT,
-                    cost INTEGER,
-                    description TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    success BOOLEAN DEFAULT TRUE,
-                    FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
-                )
-            """)
-            
-            # Economic events
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS economic_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    event_type TEXT,
-                    event_name TEXT,
-                    description TEXT,
-                    treasury_impact INTEGER,
-                    economic_impact TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
-                )
-            """)
-            
-            # Event scheduling
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS event_schedule (
-                    guild_id INTEGER PRIMARY KEY,
-                    last_event_time TIMESTAMP,
-                    next_event_time TIMESTAMP,
-                    FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
-                )
-            """)
-            
-            # Economic policies and decisions
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS economic_policies (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER,
-                    policy_type TEXT,
-                    policy_value TEXT,
-                    set_by INTEGER,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
-                )
-            """)
-            
-            await db.commit()
-            logger.info("Database initialized successfully")
+        """Initialize the database, the writer task and the read pool."""
+        # Autocommit mode: the writer task manages transactions explicitly
+        self._writer_db = await aiosqlite.connect(self.db_path, isolation_level=None)
+        self._writer_db.row_factory = aiosqlite.Row
+        await self._writer_db.execute("PRAGMA journal_mode=WAL")
+        await self._writer_db.execute(f"PRAGMA busy_timeout = {DATABASE_CONFIG['busy_timeout_ms']}")
+        await self._create_schema(self._writer_db)
+        
+        # Read-only connection pool
+        self._read_pool = asyncio.Queue()
+        read_uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        for _ in range(DATABASE_CONFIG['read_pool_size']):
+            conn = await aiosqlite.connect(read_uri, uri=True)
+            conn.row_factory = aiosqlite.Row
+            await conn.execute(f"PRAGMA busy_timeout = {DATABASE_CONFIG['busy_timeout_ms']}")
+            self._read_connections.append(conn)
+            self._read_pool.put_nowait(conn)
+        
+        # Single writer
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        logger.info("Database initialized successfully")
+    
+    async def _create_schema(self, db):
+        """Create all required tables."""
+        await db.execute("BEGIN")
+        
+        # Guild economies table
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS guild_economies (
+                guild_id INTEGER PRIMARY KEY,
+                treasury INTEGER DEFAULT 10000,
+                economic_status TEXT DEFAULT 'Stable Growth',
+                trade_policy TEXT DEFAULT 'Balanced Trade',
+                last_update TIMESTAMP,
+                created_at TIMESTAMP
+            )
+        """)
+        
+        # Treasury history for charts
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS treasury_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                treasury_amount INTEGER,
+                timestamp TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Administrative actions log
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS admin_actions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                user_id INTEGER,
+                action_type TEXT,
+                cost INTEGER,
+                description TEXT,
+                timestamp TIMESTAMP,
+                success BOOLEAN DEFAULT TRUE,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Economic events
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS economic_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                event_type TEXT,
+                event_name TEXT,
+                description TEXT,
+                treasury_impact INTEGER,
+                economic_impact TEXT,
+                timestamp TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Event scheduling
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS event_schedule (
+                guild_id INTEGER PRIMARY KEY,
+                last_event_time TIMESTAMP,
+                next_event_time TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Economic policies and decisions
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS economic_policies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                policy_type TEXT,
+                policy_value TEXT,
+                set_by INTEGER,
+                timestamp TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Background job leases (one owner per job partition)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS job_leases (
+                job_name TEXT,
+                partition INTEGER,
+                owner_id TEXT,
+                acquired_at TIMESTAMP,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (job_name, partition)
+            )
+        """)
+        
+        # Per-user action cooldowns
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS cooldowns (
+                action TEXT,
+                guild_id INTEGER,
+                user_id INTEGER,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (action, guild_id, user_id)
+            )
+        """)
+        
+        # Process-level key/value state (e.g. last synced command tree hash)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS bot_state (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                updated_at TIMESTAMP
+            )
+        """)
+        
+        # Member petitions and their (one per user) supporting votes
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS petitions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                petition_type TEXT,
+                started_by INTEGER,
+                required_supporters INTEGER,
+                supporters INTEGER DEFAULT 0,
+                status TEXT DEFAULT 'open',
+                channel_id INTEGER,
+                message_id INTEGER,
+                created_at TIMESTAMP,
+                expires_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS petition_votes (
+                petition_id INTEGER,
+                user_id INTEGER,
+                voted_at TIMESTAMP,
+                PRIMARY KEY (petition_id, user_id),
+                FOREIGN KEY (petition_id) REFERENCES petitions (id)
+            )
+        """)
+        
+        # Time-bounded economic modifiers (petition effects, boosts)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS guild_modifiers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                modifier_type TEXT,
+                value REAL,
+                source TEXT,
+                created_at TIMESTAMP,
+                expires_at TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Mass-message DM broadcasts, checkpointed so a restart resumes them
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcasts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER,
+                requested_by INTEGER,
+                message TEXT,
+                cost INTEGER,
+                status TEXT DEFAULT 'running',
+                total_recipients INTEGER,
+                last_member_id INTEGER DEFAULT 0,
+                sent INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                refund INTEGER DEFAULT 0,
+                owner_id TEXT,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                completed_at TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Single-use tokens for confirmation buttons; claiming one also pays for it
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS pending_actions (
+                token TEXT PRIMARY KEY,
+                guild_id INTEGER,
+                user_id INTEGER,
+                action_type TEXT,
+                cost INTEGER,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP,
+                expires_at TIMESTAMP,
+                claimed_at TIMESTAMP,
+                FOREIGN KEY (guild_id) REFERENCES guild_economies (guild_id)
+            )
+        """)
+        
+        # Columns added after the original schema
+        await self._ensure_column(db, 'guild_economies', 'member_count', 'INTEGER DEFAULT 0')
+        await self._ensure_column(db, 'guild_economies', 'notification_channel_id', 'INTEGER')
+        
+        await self._normalize_timestamps(db)
+        
+        await db.execute("COMMIT")
+    
+    async def _normalize_timestamps(self, db):
+        """Rewrite timestamps stored by older versions in the clock's layout.
+        
+        Values older versions wrote themselves were local ISO 8601 strings
+        ('T' separator, microseconds), which don't compare correctly as text
+        against clock.db_timestamp() values. Values in the plain layout came
+        from SQLite's CURRENT_TIMESTAMP, which is UTC, so they are converted
+        to local time; otherwise e.g. downtime catch-up would read a UTC
+        last_update as local and credit the host's UTC offset as extra
+        downtime. Runs once per database file, tracked by PRAGMA user_version.
+        """
+        cursor = await db.execute("PRAGMA user_version")
+        if (await cursor.fetchone())[0] >= 1:
+            return
+        
+        cursor = await db.execute("""
+            SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        """)
+        for table, in await cursor.fetchall():
+            columns = await db.execute(f"PRAGMA table_info({table})")
+            for column in await columns.fetchall():
+                if column[2] != 'TIMESTAMP':
+                    continue
+                name = column[1]
+                await db.execute(f"""
+                    UPDATE {table} SET {name} = datetime({name}, 'localtime')
+                    WHERE typeof({name}) = 'text'
+                      AND length({name}) = 19 AND substr({name}, 11, 1) = ' '
+                """)
+                await db.execute(f"""
+                    UPDATE {table} SET {name} = replace(substr({name}, 1, 19), 'T', ' ')
+                    WHERE typeof({name}) = 'text'
+                      AND (length({name}) > 19 OR substr({name}, 11, 1) = 'T')
+                """)
+        
+        await db.execute("PRAGMA user_version = 1")
+    
+    async def _ensure_column(self, db, table: str, column: str, definition: str):
+        """Add a column to an existing table if an older schema lacks it."""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        columns = [row[1] for row in await cursor.fetchall()]
+        if column not in columns:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
     
     async def initialize_guild(self, guild_id: int):
         """Initialize a new guild in the database."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT OR IGNORE INTO guild_economies (guild_id)
-                VALUES (?)
-            """, (guild_id,))
-            
-            await db.execute("""
+        async def operation(db):
+            await self._insert_guild(db, guild_id)
+        
+        await self._write(operation)
+    
+    async def _insert_guild(self, db, guild_id: int):
+        """Insert default rows for a guild on the writer connection."""
+        now = clock.now()
+        await db.execute("""
+            INSERT OR IGNORE INTO guild_economies (guild_id, last_update, created_at)
+            VALUES (?, ?, ?)
+        """, (guild_id, clock.db_timestamp(now), clock.db_timestamp(now)))
+        
+        await db.execute("""
+            INSERT OR IGNORE INTO event_schedule (guild_id, last_event_time)
+            VALUES (?, ?)
+        """, (guild_id, clock.db_timestamp(now)))
+    
+    async def warm_up(self, guild_ids: Iterable[int]) -> int:
+        """Create rows for all known guilds and load every economy into memory.
+        
+        Uses one batched insert and one SELECT instead of a query (and possible
+        initialize_guild round trip) per guild on first use. Returns the number
+        of economies loaded.
+        """
+        params = [(guild_id,) for guild_id in guild_ids]
+        now = clock.now()
+        created = clock.db_timestamp(now)
+        
+        async def operation(db):
+            await db.executemany("""
+                INSERT OR IGNORE INTO guild_economies (guild_id, last_update, created_at)
+                VALUES (?, ?, ?)
+            """, [(guild_id, created, created) for guild_id, in params])
+            await db.executemany("""
                 INSERT OR IGNORE INTO event_schedule (guild_id, last_event_time)
                 VALUES (?, ?)
-            """, (guild_id, datetime.now()))
-            
-            await db.commit()
+            """, [(guild_id, created) for guild_id, in params])
+        
+        await self._write(operation)
+        
+        async with self._reader() as db:
+            cursor = await db.execute("SELECT * FROM guild_economies")
+            rows = await cursor.fetchall()
+        
+        loaded_at = time.monotonic()
+        for row in rows:
+            self._economy_cache[row['guild_id']] = (dict(row), loaded_at)
+        
+        return len(rows)
+    
+    def cache_sizes(self) -> Dict[str, int]:
+        """Entries held in memory: cached economies and queued writes."""
+        return {
+            'economy_cache': len(self._economy_cache),
+            'write_queue': self._write_queue.qsize() if self._write_queue else 0
+        }
     
     async def get_guild_economy(self, guild_id: int) -> Dict[str, Any]:
         """Get the complete economic data for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        cached = self._economy_cache.get(guild_id)
+        ttl = DATABASE_CONFIG['economy_cache_ttl_seconds']
+        if cached and (ttl is None or time.monotonic() - cached[1] < ttl):
+            metrics.inc('economy_cache_hits')
+            return dict(cached[0])
+        metrics.inc('economy_cache_misses')
+        
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT * FROM guild_economies WHERE guild_id = ?
             """, (guild_id,))
             
             row = await cursor.fetchone()
-            if row is None:
-                # Initialize guild if not exists
-                await self.initialize_guild(guild_id)
-                return await self.get_guild_economy(guild_id)
-            
-            return dict(row)
+        
+        if row is None:
+            # Initialize guild if not exists
+            await self.initialize_guild(guild_id)
+            return await self.get_guild_economy(guild_id)
+        
+        self._economy_cache[guild_id] = (dict(row), time.monotonic())
+        return dict(row)
+    
+    async def _refresh_economy(self, db, guild_id: int):
+        """Reload a guild's economy row into the cache from the writer connection."""
+        cursor = await db.execute("""
+            SELECT * FROM guild_economies WHERE guild_id = ?
+        """, (guild_id,))
+        row = await cursor.fetchone()
+        if row is not None:
+            self._economy_cache[guild_id] = (dict(row), time.monotonic())
     
     async def update_treasury(self, guild_id: int, amount: int) -> bool:
         """Update treasury amount. Returns True if successful."""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Get current treasury
-            cursor = await db.execute("""
-                SELECT treasury FROM guild_economies WHERE guild_id = ?
-            """, (guild_id,))
-            
-            row = await cursor.fetchone()
-            if row is None:
-                await self.initialize_guild(guild_id)
-                current_treasury = 10000
-            else:
-                current_treasury = row[0]
-            
-            new_treasury = max(0, current_treasury + amount)
-            
-            # Update treasury
+        async def operation(db):
+            return await self._change_treasury(db, guild_id, amount)
+        
+        return await self._write(operation)
+    
+    async def _change_treasury(self, db, guild_id: int, amount: int) -> bool:
+        """Change a treasury and record the history point on the writer connection."""
+        # Get current treasury
+        cursor = await db.execute("""
+            SELECT treasury FROM guild_economies WHERE guild_id = ?
+        """, (guild_id,))
+        
+        row = await cursor.fetchone()
+        if row is None:
+            await self._insert_guild(db, guild_id)
+            current_treasury = 10000
+        else:
+            current_treasury = row[0]
+        
+        new_treasury = max(0, current_treasury + amount)
+        now = clock.db_timestamp()
+        
+        # Update treasury
+        await db.execute("""
+            UPDATE guild_economies 
+            SET treasury = ?, last_update = ? 
+            WHERE guild_id = ?
+        """, (new_treasury, now, guild_id))
+        
+        # Record in history
+        await db.execute("""
+            INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+            VALUES (?, ?, ?)
+        """, (guild_id, new_treasury, now))
+        
+        await self._refresh_economy(db, guild_id)
+        return True
+    
+    async def record_passive_income(self, guild_id: int, amount: int, member_count: int):
+        """Add passive income and remember the member count it was based on."""
+        async def operation(db):
             await db.execute("""
                 UPDATE guild_economies 
-                SET treasury = ?, last_update = CURRENT_TIMESTAMP 
+                SET treasury = MAX(0, treasury + ?), member_count = ?,
+                    last_update = ? 
                 WHERE guild_id = ?
-            """, (new_treasury, guild_id))
+            """, (amount, member_count, clock.db_timestamp(), guild_id))
             
-            # Record in history
             await db.execute("""
-                INSERT INTO treasury_history (guild_id, treasury_amount)
-                VALUES (?, ?)
-            """, (guild_id, new_treasury))
+                INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+                SELECT guild_id, treasury, last_update FROM guild_economies WHERE guild_id = ?
+            """, (guild_id,))
             
-            await db.commit()
-            return True
+            await self._refresh_economy(db, guild_id)
+        
+        await self._write(operation)
+    
+    async def get_accrual_snapshot(self) -> list:
+        """Get the accrual inputs for every guild in a single query."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT guild_id, treasury, economic_status, trade_policy,
+                       member_count, last_update
+                FROM guild_economies
+            """)
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
+    async def apply_catch_up(self, updates: list) -> int:
+        """Apply (guild_id, amount, seen_last_update) changes in one transaction.
+        
+        Rows whose last_update moved since the snapshot was taken were already
+        updated by another process and are skipped. Returns the number applied.
+        """
+        async def operation(db):
+            now = clock.db_timestamp()
+            applied = []
+            for guild_id, amount, seen_last_update in updates:
+                cursor = await db.execute("""
+                    UPDATE guild_economies 
+                    SET treasury = MAX(0, treasury + ?), last_update = ? 
+                    WHERE guild_id = ? AND last_update = ?
+                """, (amount, now, guild_id, seen_last_update))
+                if cursor.rowcount:
+                    applied.append((guild_id,))
+                    self._economy_cache.pop(guild_id, None)
+            
+            await db.executemany("""
+                INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+                SELECT guild_id, treasury, last_update FROM guild_economies WHERE guild_id = ?
+            """, applied)
+            
+            return len(applied)
+        
+        return await self._write(operation)
     
     async def get_treasury_history(self, guild_id: int, hours: int = 24) -> list:
         """Get treasury history for the last N hours."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT treasury_amount, timestamp
                 FROM treasury_history
-                WHERE guild_id = ? AND timestamp > datetime('now', '-{} hours')
+                WHERE guild_id = ? AND timestamp > ?
                 ORDER BY timestamp ASC
-            """.format(hours), (guild_id,))
+            """, (guild_id, clock.db_timestamp(clock.now() - timedelta(hours=hours))))
             
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
     
     async def deduct_treasury(self, guild_id: int, amount: int) -> bool:
         """Deduct amount from treasury. Returns True if successful (enough funds)."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def operation(db):
             cursor = await db.execute("""
                 SELECT treasury FROM guild_economies WHERE guild_id = ?
             """, (guild_id,))
@@ -193,75 +531,97 @@ class DatabaseManager:
             
             # Deduct amount
             new_treasury = current_treasury - amount
+            now = clock.db_timestamp()
             await db.execute("""
                 UPDATE guild_economies 
-                SET treasury = ?, last_update = CURRENT_TIMESTAMP 
+                SET treasury = ?, last_update = ? 
                 WHERE guild_id = ?
-            """, (new_treasury, guild_id))
+            """, (new_treasury, now, guild_id))
             
             # Record in history
             await db.execute("""
-                INSERT INTO treasury_history (guild_id, treasury_amount)
-                VALUES (?, ?)
-            """, (guild_id, new_treasury))
+                INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+                VALUES (?, ?, ?)
+            """, (guild_id, new_treasury, now))
             
-            await db.commit()
+            await self._refresh_economy(db, guild_id)
             return True
+        
+        return await self._write(operation)
     
     async def log_admin_action(self, guild_id: int, user_id: int, action_type: str, 
                               cost: int, description: str, success: bool = True):
         """Log an administrative action."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO admin_actions 
-                (guild_id, user_id, action_type, cost, description, success)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (guild_id, user_id, action_type, cost, description, success))
-            await db.commit()
+        async def operation(db):
+            await self._insert_admin_action(db, guild_id, user_id, action_type, cost,
+                                            description, success)
+        
+        await self._write(operation)
+    
+    async def _insert_admin_action(self, db, guild_id: int, user_id: int, action_type: str,
+                                   cost: int, description: str, success: bool = True):
+        """Log an administrative action on the writer connection."""
+        await db.execute("""
+            INSERT INTO admin_actions 
+            (guild_id, user_id, action_type, cost, description, success, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (guild_id, user_id, action_type, cost, description, success, clock.db_timestamp()))
     
     async def update_economic_status(self, guild_id: int, status: str):
         """Update the economic status of a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def operation(db):
             await db.execute("""
                 UPDATE guild_economies 
-                SET economic_status = ?, last_update = CURRENT_TIMESTAMP
+                SET economic_status = ?, last_update = ?
                 WHERE guild_id = ?
-            """, (status, guild_id))
-            await db.commit()
+            """, (status, clock.db_timestamp(), guild_id))
+            
+            await self._refresh_economy(db, guild_id)
+        
+        await self._write(operation)
     
     async def update_trade_policy(self, guild_id: int, policy: str):
         """Update the trade policy of a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                UPDATE guild_economies 
-                SET trade_policy = ?, last_update = CURRENT_TIMESTAMP
-                WHERE guild_id = ?
-            """, (policy, guild_id))
-            await db.commit()
-            
-            # Log policy change
-            await db.execute("""
-                INSERT INTO economic_policies 
-                (guild_id, policy_type, policy_value, set_by)
-                VALUES (?, ?, ?, ?)
-            """, (guild_id, 'trade_policy', policy, 0))  # 0 = system
-            await db.commit()
+        async def operation(db):
+            await self._set_trade_policy(db, guild_id, policy)
+        
+        await self._write(operation)
+    
+    async def _set_trade_policy(self, db, guild_id: int, policy: str):
+        """Change a trade policy and log it on the writer connection."""
+        now = clock.db_timestamp()
+        await db.execute("""
+            UPDATE guild_economies 
+            SET trade_policy = ?, last_update = ?
+            WHERE guild_id = ?
+        """, (policy, now, guild_id))
+        
+        # Log policy change
+        await db.execute("""
+            INSERT INTO economic_policies 
+            (guild_id, policy_type, policy_value, set_by, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        """, (guild_id, 'trade_policy', policy, 0, now))  # 0 = system
+        
+        await self._refresh_economy(db, guild_id)
     
     async def add_economic_event(self, guild_id: int, event_type: str, event_name: str,
                                description: str, treasury_impact: int, economic_impact: str):
         """Add an economic event to the database."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def operation(db):
             await db.execute("""
                 INSERT INTO economic_events 
-                (guild_id, event_type, event_name, description, treasury_impact, economic_impact)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (guild_id, event_type, event_name, description, treasury_impact, economic_impact))
-            await db.commit()
+                (guild_id, event_type, event_name, description, treasury_impact, economic_impact,
+                 timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (guild_id, event_type, event_name, description, treasury_impact, economic_impact,
+                  clock.db_timestamp()))
+        
+        await self._write(operation)
     
     async def get_recent_events(self, guild_id: int, limit: int = 5) -> list:
         """Get recent economic events for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT * FROM economic_events
                 WHERE guild_id = ?
@@ -274,7 +634,7 @@ class DatabaseManager:
     
     async def get_last_event_time(self, guild_id: int) -> Optional[datetime]:
         """Get the last event time for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT last_event_time FROM event_schedule WHERE guild_id = ?
             """, (guild_id,))
@@ -287,7 +647,7 @@ class DatabaseManager:
     
     async def get_next_event_time(self, guild_id: int) -> Optional[datetime]:
         """Get the next scheduled event time for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT next_event_time FROM event_schedule WHERE guild_id = ?
             """, (guild_id,))
@@ -300,18 +660,18 @@ class DatabaseManager:
     
     async def set_next_event_time(self, guild_id: int, next_time: datetime):
         """Set the next event time for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async def operation(db):
             await db.execute("""
                 INSERT OR REPLACE INTO event_schedule 
                 (guild_id, last_event_time, next_event_time)
                 VALUES (?, ?, ?)
-            """, (guild_id, datetime.now().isoformat(), next_time.isoformat()))
-            await db.commit()
+            """, (guild_id, clock.db_timestamp(), clock.db_timestamp(next_time)))
+        
+        await self._write(operation)
     
     async def get_admin_action_history(self, guild_id: int, limit: int = 10) -> list:
         """Get recent administrative actions for a guild."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._reader() as db:
             cursor = await db.execute("""
                 SELECT * FROM admin_actions
                 WHERE guild_id = ?
@@ -322,6 +682,629 @@ class DatabaseManager:
             rows = await cursor.fetchall()
             return [dict(row) for row in rows]
     
+    async def acquire_lease(self, job_name: str, partition: int, owner_id: str,
+                            ttl_seconds: int) -> Optional[datetime]:
+        """Claim or renew a job lease. Returns the new expiry if this owner holds it."""
+        async def operation(db):
+            now = clock.now()
+            expires_at = now + timedelta(seconds=ttl_seconds)
+            
+            # Take the lease if it is free, expired, or already ours
+            cursor = await db.execute("""
+                INSERT INTO job_leases (job_name, partition, owner_id, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (job_name, partition) DO UPDATE SET
+                    owner_id = excluded.owner_id,
+                    acquired_at = CASE WHEN job_leases.owner_id = excluded.owner_id
+                                       THEN job_leases.acquired_at
+                                       ELSE excluded.acquired_at END,
+                    expires_at = excluded.expires_at
+                WHERE job_leases.owner_id = excluded.owner_id
+                   OR job_leases.expires_at < ?
+            """, (job_name, partition, owner_id, clock.db_timestamp(now),
+                  clock.db_timestamp(expires_at), clock.db_timestamp(now)))
+            
+            if cursor.rowcount == 0:
+                return None
+            
+            return expires_at
+        
+        return await self._write(operation)
+    
+    async def release_leases(self, owner_id: str):
+        """Release every lease held by an owner so another process can take over."""
+        async def operation(db):
+            await db.execute("""
+                DELETE FROM job_leases WHERE owner_id = ?
+            """, (owner_id,))
+        
+        await self._write(operation)
+    
+    async def get_cooldown(self, action: str, guild_id: int, user_id: int) -> Optional[datetime]:
+        """Get when a user's cooldown for an action expires (None if never set)."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT expires_at FROM cooldowns
+                WHERE action = ? AND guild_id = ? AND user_id = ?
+            """, (action, guild_id, user_id))
+            
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            
+            return datetime.fromisoformat(row[0])
+    
+    async def claim_cooldown(self, action: str, guild_id: int, user_id: int,
+                             expires_at: datetime) -> Optional[datetime]:
+        """Start a cooldown unless one is still active.
+        
+        Returns None if the cooldown was started, otherwise the expiry of the
+        cooldown that is already running.
+        """
+        async def operation(db):
+            now = clock.now()
+            cursor = await db.execute("""
+                INSERT INTO cooldowns (action, guild_id, user_id, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (action, guild_id, user_id) DO UPDATE SET
+                    expires_at = excluded.expires_at
+                WHERE cooldowns.expires_at <= ?
+            """, (action, guild_id, user_id, clock.db_timestamp(expires_at), clock.db_timestamp(now)))
+            
+            if cursor.rowcount:
+                return None
+            
+            cursor = await db.execute("""
+                SELECT expires_at FROM cooldowns
+                WHERE action = ? AND guild_id = ? AND user_id = ?
+            """, (action, guild_id, user_id))
+            row = await cursor.fetchone()
+            return datetime.fromisoformat(row[0])
+        
+        return await self._write(operation)
+    
+    async def release_cooldown(self, action: str, guild_id: int, user_id: int,
+                               expires_at: datetime) -> bool:
+        """Remove a cooldown started with claim_cooldown, if it is still that claim.
+        
+        Returns False if the row has changed since (e.g. another process
+        started a new cooldown), in which case it is left alone.
+        """
+        async def operation(db):
+            cursor = await db.execute("""
+                DELETE FROM cooldowns
+                WHERE action = ? AND guild_id = ? AND user_id = ? AND expires_at = ?
+            """, (action, guild_id, user_id, clock.db_timestamp(expires_at)))
+            return cursor.rowcount > 0
+        
+        return await self._write(operation)
+    
+    async def get_state(self, key: str) -> Optional[str]:
+        """Get a stored bot state value."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT value FROM bot_state WHERE key = ?
+            """, (key,))
+            
+            row = await cursor.fetchone()
+            return row[0] if row else None
+    
+    async def set_state(self, key: str, value: str):
+        """Store a bot state value."""
+        async def operation(db):
+            await db.execute("""
+                INSERT OR REPLACE INTO bot_state (key, value, updated_at)
+                VALUES (?, ?, ?)
+            """, (key, value, clock.db_timestamp()))
+        
+        await self._write(operation)
+    
+    async def set_notification_channel(self, guild_id: int, channel_id: Optional[int]):
+        """Set (or clear, with None) the channel used for economic announcements."""
+        async def operation(db):
+            await self._insert_guild(db, guild_id)
+            await db.execute("""
+                UPDATE guild_economies SET notification_channel_id = ?
+                WHERE guild_id = ?
+            """, (channel_id, guild_id))
+            
+            await self._refresh_economy(db, guild_id)
+        
+        await self._write(operation)
+    
+    async def create_petition(self, guild_id: int, petition_type: str, started_by: int,
+                              required_supporters: int, expires_at: datetime) -> Dict[str, Any]:
+        """Open a petition with its starter as the first supporter."""
+        async def operation(db):
+            now = clock.db_timestamp()
+            cursor = await db.execute("""
+                INSERT INTO petitions
+                (guild_id, petition_type, started_by, required_supporters, supporters,
+                 created_at, expires_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?)
+            """, (guild_id, petition_type, started_by, required_supporters, now,
+                  clock.db_timestamp(expires_at)))
+            petition_id = cursor.lastrowid
+            
+            await db.execute("""
+                INSERT INTO petition_votes (petition_id, user_id, voted_at)
+                VALUES (?, ?, ?)
+            """, (petition_id, started_by, now))
+            
+            cursor = await db.execute("""
+                SELECT * FROM petitions WHERE id = ?
+            """, (petition_id,))
+            return dict(await cursor.fetchone())
+        
+        return await self._write(operation)
+    
+    async def set_petition_message(self, petition_id: int, channel_id: int, message_id: int):
+        """Remember where a petition's embed was posted."""
+        async def operation(db):
+            await db.execute("""
+                UPDATE petitions SET channel_id = ?, message_id = ?
+                WHERE id = ?
+            """, (channel_id, message_id, petition_id))
+        
+        await self._write(operation)
+    
+    async def get_petition(self, petition_id: int) -> Optional[Dict[str, Any]]:
+        """Get a petition by id."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT * FROM petitions WHERE id = ?
+            """, (petition_id,))
+            
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+    
+    async def get_open_petition(self, guild_id: int, petition_type: str) -> Optional[Dict[str, Any]]:
+        """Get a guild's open, unexpired petition of a type, if any."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT * FROM petitions
+                WHERE guild_id = ? AND petition_type = ? AND status = 'open'
+                  AND expires_at > ?
+                ORDER BY id DESC
+                LIMIT 1
+            """, (guild_id, petition_type, clock.db_timestamp()))
+            
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+    
+    async def get_petition_voters(self, petition_id: int) -> set:
+        """Get the ids of every user supporting a petition."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT user_id FROM petition_votes WHERE petition_id = ?
+            """, (petition_id,))
+            
+            rows = await cursor.fetchall()
+            return {row[0] for row in rows}
+    
+    async def record_petition_votes(self, votes: list) -> Dict[int, int]:
+        """Store a batch of (petition_id, user_id) votes in one transaction.
+        
+        Repeat votes are ignored. Returns the resulting supporter count of
+        every petition in the batch.
+        """
+        petition_ids = sorted({petition_id for petition_id, _ in votes})
+        
+        async def operation(db):
+            now = clock.db_timestamp()
+            await db.executemany("""
+                INSERT OR IGNORE INTO petition_votes (petition_id, user_id, voted_at)
+                VALUES (?, ?, ?)
+            """, [(petition_id, user_id, now) for petition_id, user_id in votes])
+            
+            counts = {}
+            for petition_id in petition_ids:
+                cursor = await db.execute("""
+                    SELECT COUNT(*) FROM petition_votes WHERE petition_id = ?
+                """, (petition_id,))
+                counts[petition_id] = (await cursor.fetchone())[0]
+            
+            await db.executemany("""
+                UPDATE petitions SET supporters = ? WHERE id = ?
+            """, [(count, petition_id) for petition_id, count in counts.items()])
+            
+            return counts
+        
+        return await self._write(operation)
+    
+    async def pass_petition(self, petition_id: int, description: str, treasury_change: int = 0,
+                            modifier: Optional[Tuple[str, float, datetime]] = None) -> bool:
+        """Mark an open petition as passed and grant its effect in one transaction.
+        
+        The effect is a treasury change and/or a (type, value, expires_at)
+        modifier, logged as an action of the petition's starter. Returns
+        False, changing nothing, if the petition was already closed.
+        """
+        async def operation(db):
+            cursor = await db.execute("""
+                UPDATE petitions SET status = 'passed', completed_at = ?
+                WHERE id = ? AND status = 'open'
+            """, (clock.db_timestamp(), petition_id))
+            if cursor.rowcount == 0:
+                return False
+            
+            cursor = await db.execute("""
+                SELECT guild_id, started_by, petition_type FROM petitions WHERE id = ?
+            """, (petition_id,))
+            petition = await cursor.fetchone()
+            guild_id = petition['guild_id']
+            
+            if treasury_change:
+                await self._change_treasury(db, guild_id, treasury_change)
+            if modifier:
+                modifier_type, value, expires_at = modifier
+                await self._insert_modifier(db, guild_id, modifier_type, value,
+                                            f"petition:{petition_id}", expires_at)
+            
+            await self._insert_admin_action(db, guild_id, petition['started_by'],
+                                            f"petition_{petition['petition_type']}", 0, description)
+            return True
+        
+        return await self._write(operation)
+    
+    async def add_modifier(self, guild_id: int, modifier_type: str, value: float,
+                           source: str, expires_at: datetime) -> Dict[str, Any]:
+        """Activate a time-bounded modifier for a guild. Returns the stored row."""
+        async def operation(db):
+            return await self._insert_modifier(db, guild_id, modifier_type, value, source,
+                                               expires_at)
+        
+        return await self._write(operation)
+    
+    async def _insert_modifier(self, db, guild_id: int, modifier_type: str, value: float,
+                               source: str, expires_at: datetime) -> Dict[str, Any]:
+        """Insert a modifier on the writer connection and return its row."""
+        cursor = await db.execute("""
+            INSERT INTO guild_modifiers
+            (guild_id, modifier_type, value, source, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (guild_id, modifier_type, value, source, clock.db_timestamp(),
+              clock.db_timestamp(expires_at)))
+        
+        cursor = await db.execute("""
+            SELECT * FROM guild_modifiers WHERE id = ?
+        """, (cursor.lastrowid,))
+        return dict(await cursor.fetchone())
+    
+    async def get_active_modifiers(self, after_id: int = 0) -> list:
+        """Get every unexpired modifier with an id above after_id."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT * FROM guild_modifiers
+                WHERE id > ? AND expires_at > ?
+                ORDER BY id ASC
+            """, (after_id, clock.db_timestamp()))
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
+    async def get_modifiers_active_since(self, since: datetime, modifier_type: str) -> list:
+        """Get every modifier of one type still in force at or after `since`, even if expired now."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT * FROM guild_modifiers
+                WHERE modifier_type = ? AND expires_at > ?
+                ORDER BY id ASC
+            """, (modifier_type, clock.db_timestamp(since)))
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
+    async def delete_expired_modifiers(self) -> int:
+        """Remove expired modifiers. Returns how many were deleted."""
+        async def operation(db):
+            cursor = await db.execute("""
+                DELETE FROM guild_modifiers WHERE expires_at <= ?
+            """, (clock.db_timestamp(),))
+            return cursor.rowcount
+        
+        return await self._write(operation)
+    
+    async def _insert_broadcast(self, db, guild_id: int, requested_by: int, message: str,
+                                cost: int, total_recipients: int, owner_id: str) -> Dict[str, Any]:
+        """Insert a broadcast on the writer connection and return its row."""
+        cursor = await db.execute("""
+            INSERT INTO broadcasts
+            (guild_id, requested_by, message, cost, total_recipients, owner_id,
+             created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (guild_id, requested_by, message, cost, total_recipients, owner_id,
+              clock.db_timestamp(), clock.db_timestamp()))
+        
+        cursor = await db.execute("""
+            SELECT * FROM broadcasts WHERE id = ?
+        """, (cursor.lastrowid,))
+        return dict(await cursor.fetchone())
+    
+    async def get_resumable_broadcasts(self) -> list:
+        """Get every broadcast that hasn't finished."""
+        async with self._reader() as db:
+            cursor = await db.execute("""
+                SELECT * FROM broadcasts WHERE status = 'running' ORDER BY id ASC
+            """)
+            
+            rows = await cursor.fetchall()
+            return [dict(row) for row in rows]
+    
+    async def claim_broadcast(self, broadcast_id: int, owner_id: str, stale_seconds: int) -> bool:
+        """Take over an unfinished broadcast that was released or whose owner stopped checkpointing."""
+        async def operation(db):
+            stale_before = clock.now() - timedelta(seconds=stale_seconds)
+            cursor = await db.execute("""
+                UPDATE broadcasts SET owner_id = ?, updated_at = ?
+                WHERE id = ? AND status = 'running'
+                  AND (owner_id IS NULL OR owner_id = ? OR updated_at < ?)
+            """, (owner_id, clock.db_timestamp(), broadcast_id,
+                  owner_id, clock.db_timestamp(stale_before)))
+            return cursor.rowcount > 0
+        
+        return await self._write(operation)
+    
+    async def release_broadcasts(self, owner_id: str):
+        """Give up an owner's unfinished broadcasts so the next process resumes them at once."""
+        async def operation(db):
+            await db.execute("""
+                UPDATE broadcasts SET owner_id = NULL
+                WHERE owner_id = ? AND status = 'running'
+            """, (owner_id,))
+        
+        await self._write(operation)
+    
+    async def save_broadcast_progress(self, broadcast_id: int, last_member_id: int,
+                                      sent: int, failed: int):
+        """Checkpoint a broadcast: every member up to last_member_id was handled."""
+        async def operation(db):
+            await db.execute("""
+                UPDATE broadcasts
+                SET last_member_id = ?, sent = ?, failed = ?, updated_at = ?
+                WHERE id = ?
+            """, (last_member_id, sent, failed, clock.db_timestamp(), broadcast_id))
+        
+        await self._write(operation)
+    
+    async def finish_broadcast(self, broadcast_id: int, last_member_id: int, sent: int,
+                               failed: int, refund: int) -> bool:
+        """Mark a broadcast completed and refund undelivered messages, atomically.
+        
+        Returns False if it was already finished (so the refund is never paid twice).
+        """
+        async def operation(db):
+            now = clock.now()
+            cursor = await db.execute("""
+                UPDATE broadcasts
+                SET status = 'completed', last_member_id = ?, sent = ?, failed = ?, refund = ?,
+                    updated_at = ?, completed_at = ?
+                WHERE id = ? AND status = 'running'
+            """, (last_member_id, sent, failed, refund, clock.db_timestamp(now),
+                  clock.db_timestamp(now), broadcast_id))
+            if cursor.rowcount == 0:
+                return False
+            
+            if refund:
+                cursor = await db.execute("""
+                    SELECT guild_id FROM broadcasts WHERE id = ?
+                """, (broadcast_id,))
+                guild_id = (await cursor.fetchone())[0]
+                
+                await db.execute("""
+                    UPDATE guild_economies
+                    SET treasury = treasury + ?, last_update = ?
+                    WHERE guild_id = ?
+                """, (refund, clock.db_timestamp(now), guild_id))
+                
+                await db.execute("""
+                    INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+                    SELECT guild_id, treasury, last_update FROM guild_economies WHERE guild_id = ?
+                """, (guild_id,))
+                
+                await self._refresh_economy(db, guild_id)
+            return True
+        
+        return await self._write(operation)
+    
+    async def create_pending_action(self, guild_id: int, user_id: int, action_type: str,
+                                    cost: int, ttl_seconds: int) -> str:
+        """Issue a single-use token for a confirmation prompt. Returns the token."""
+        token = secrets.token_urlsafe(16)
+        
+        async def operation(db):
+            now = clock.now()
+            await db.execute("""
+                INSERT INTO pending_actions
+                (token, guild_id, user_id, action_type, cost, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (token, guild_id, user_id, action_type, cost, clock.db_timestamp(now),
+                  clock.db_timestamp(now + timedelta(seconds=ttl_seconds))))
+            
+            # Tokens are only looked up while their prompt is open
+            await db.execute("""
+                DELETE FROM pending_actions WHERE expires_at < ?
+            """, (clock.db_timestamp(now - timedelta(hours=PENDING_ACTIONS['retention_hours'])),))
+        
+        await self._write(operation)
+        return token
+    
+    async def claim_pending_action(self, token: str, guild_id: int) -> str:
+        """Claim a confirmation token and deduct its cost in one transaction.
+        
+        Returns 'claimed' when the action was paid for and may run,
+        'insufficient_funds' (the token stays usable), or 'action_used' /
+        'action_expired' when the token can no longer be claimed, so a
+        repeated click never charges twice.
+        """
+        async def operation(db):
+            return await self._claim_pending_action(db, token, guild_id)
+        
+        return await self._write(operation)
+    
+    async def claim_trade_policy_change(self, token: str, guild_id: int, policy: str) -> str:
+        """Claim a trade policy change's token and apply the change in the same transaction.
+        
+        Returns what claim_pending_action does; the policy only changes when 'claimed'.
+        """
+        async def operation(db):
+            result = await self._claim_pending_action(db, token, guild_id)
+            if result == 'claimed':
+                await self._set_trade_policy(db, guild_id, policy)
+            return result
+        
+        return await self._write(operation)
+    
+    async def claim_broadcast_start(self, token: str, guild_id: int, requested_by: int,
+                                    message: str, total_recipients: int,
+                                    owner_id: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Claim a mass message's token and record its broadcast in the same transaction.
+        
+        Returns claim_pending_action's result and, when 'claimed', the new broadcast.
+        """
+        async def operation(db):
+            result = await self._claim_pending_action(db, token, guild_id)
+            if result != 'claimed':
+                return result, None
+            
+            cursor = await db.execute("""
+                SELECT cost FROM pending_actions WHERE token = ?
+            """, (token,))
+            cost = (await cursor.fetchone())['cost']
+            broadcast = await self._insert_broadcast(db, guild_id, requested_by, message, cost,
+                                                     total_recipients, owner_id)
+            return result, broadcast
+        
+        return await self._write(operation)
+    
+    async def _claim_pending_action(self, db, token: str, guild_id: int) -> str:
+        """Claim a token and deduct its cost on the writer connection (see claim_pending_action)."""
+        now = clock.now()
+        cursor = await db.execute("""
+            SELECT cost, status, expires_at FROM pending_actions
+            WHERE token = ? AND guild_id = ?
+        """, (token, guild_id))
+        
+        row = await cursor.fetchone()
+        if row is None or row['status'] != 'pending':
+            return 'action_used'
+        if datetime.fromisoformat(row['expires_at']) <= now:
+            return 'action_expired'
+        
+        cost = row['cost']
+        cursor = await db.execute("""
+            UPDATE guild_economies
+            SET treasury = treasury - ?, last_update = ?
+            WHERE guild_id = ? AND treasury >= ?
+        """, (cost, clock.db_timestamp(now), guild_id, cost))
+        if cursor.rowcount == 0:
+            return 'insufficient_funds'
+        
+        await db.execute("""
+            UPDATE pending_actions SET status = 'claimed', claimed_at = ?
+            WHERE token = ?
+        """, (clock.db_timestamp(now), token))
+        
+        await db.execute("""
+            INSERT INTO treasury_history (guild_id, treasury_amount, timestamp)
+            SELECT guild_id, treasury, last_update FROM guild_economies WHERE guild_id = ?
+        """, (guild_id,))
+        
+        await self._refresh_economy(db, guild_id)
+        return 'claimed'
+    
+    async def cancel_pending_action(self, token: str) -> bool:
+        """Void an unclaimed token. Returns False if it was already claimed or voided."""
+        async def operation(db):
+            cursor = await db.execute("""
+                UPDATE pending_actions SET status = 'cancelled'
+                WHERE token = ? AND status = 'pending'
+            """, (token,))
+            return cursor.rowcount > 0
+        
+        return await self._write(operation)
+    
+    async def _write(self, operation):
+        """Queue a mutation for the writer task and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((operation, future, time.perf_counter()))
+        metrics.set_gauge('db_write_queue_depth', self._write_queue.qsize())
+        return await future
+    
+    async def _writer_loop(self):
+        """Apply queued mutations, grouping whatever is waiting into one commit."""
+        db = self._writer_db
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < DATABASE_CONFIG['max_write_batch'] and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            metrics.set_gauge('db_write_queue_depth', self._write_queue.qsize())
+            metrics.observe('db_write_batch_size', len(batch))
+            
+            results = []
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                for operation, future, queued_at in batch:
+                    metrics.observe('db_write_wait_seconds', time.perf_counter() - queued_at)
+                    
+                    # Each mutation gets a savepoint so one failure doesn't undo the others
+                    await db.execute("SAVEPOINT mutation")
+                    try:
+                        result = await operation(db)
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO mutation")
+                        # The operation may have refreshed cached rows before failing
+                        self._economy_cache.clear()
+                        results.append((future, None, e))
+                    else:
+                        results.append((future, result, None))
+                    await db.execute("RELEASE mutation")
+                
+                await db.execute("COMMIT")
+            except Exception as e:
+                logger.error(f"Database writer error: {e}")
+                if db.in_transaction:
+                    await db.execute("ROLLBACK")
+                # Cached rows may reflect the rolled-back batch
+                self._economy_cache.clear()
+                results = [(future, None, e) for _, future, _ in batch]
+            
+            # Resolve only after commit so callers always see durable data
+            for future, result, error in results:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            
+            for _ in batch:
+                self._write_queue.task_done()
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a read-only connection from the pool."""
+        db = await self._read_pool.get()
+        try:
+            yield db
+        finally:
+            self._read_pool.put_nowait(db)
+    
     async def close(self):
-        """Close database connections (placeholder for connection pooling)."""
-        pass
+        """Flush pending writes and close all connections."""
+        if self._writer_task:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        
+        for conn in self._read_connections:
+            await conn.close()
+        self._read_connections = []
+        
+        if self._writer_db:
+            await self._writer_db.close()
+            self._writer_db = None
@@ -2,15 +2,17 @@
 Economic calculation engine for the bot
 """
 
-import random
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from utils import clock, rng
 from utils.constants import (
     ECONOMIC_STATUS, TRADE_POLICIES, 
-    ECONOMIC_STATUS_EFFECTS, TRADE_POLICY_EFFECTS
+    ECONOMIC_STATUS_EFFECTS, TRADE_POLICY_EFFECTS,
+    PASSIVE_INCOME, CATCH_UP
 )
+from utils.modifiers import ModifierRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,8 @@ class EconomicEngine:
     
     def __init__(self, database_manager):
         self.db = database_manager
+        self.modifiers = ModifierRegistry()
+        self._last_modifier_id = 0
     
     async def update_real_time_treasury(self, guild_id: int):
         """Update treasury based on real-time factors."""
@@ -27,7 +31,7 @@ class EconomicEngine:
             
             # Calculate time-based income/expenses
             last_update = datetime.fromisoformat(economy['last_update'])
-            now = datetime.now()
+            now = clock.now()
             time_diff = (now - last_update).total_seconds() / 3600  # hours
             
             if time_diff < 0.5:  # Less than 30 minutes, no update needed
@@ -48,8 +52,99 @@ class EconomicEngine:
         except Exception as e:
             logger.error(f"Error updating real-time treasury for guild {guild_id}: {e}")
     
-    def calculate_base_treasury_change(self, economy: Dict[str, Any]) -> int:
-        """Calculate base hourly treasury change."""
+    async def catch_up_downtime(self, max_hours: float = None) -> int:
+        """Credit accrual and passive income missed while the bot was offline.
+        
+        Reads every guild in one query and writes all changes in one
+        transaction. Returns the number of guilds that were updated.
+        """
+        if max_hours is None:
+            max_hours = CATCH_UP['max_hours']
+        
+        now = clock.now()
+        updates = []
+        
+        behind = []
+        for economy in await self.db.get_accrual_snapshot():
+            last_update = datetime.fromisoformat(economy['last_update'])
+            gap_minutes = (now - last_update).total_seconds() / 60
+            if gap_minutes >= CATCH_UP['min_gap_minutes']:
+                behind.append((economy, min(gap_minutes / 60, max_hours)))
+        
+        if not behind:
+            return 0
+        
+        # Every guild's fluctuation in one batch draw from its own stream
+        fluctuations = rng.get_streams().uniform(
+            [economy['guild_id'] for economy, _ in behind], 'accrual', -0.5, 0.5
+        )
+        
+        # Income modifiers in force at any point of the gap, including ones that expired since
+        since = min(datetime.fromisoformat(economy['last_update']) for economy, _ in behind)
+        income_modifiers = {}
+        for modifier in await self.db.get_modifiers_active_since(since, 'income'):
+            income_modifiers.setdefault(modifier['guild_id'], []).append(modifier)
+        
+        for (economy, hours), fluctuation in zip(behind, fluctuations.tolist()):
+            # Status/trade accrual, as update_real_time_treasury would have applied
+            accrual = int(self.calculate_base_treasury_change(economy, fluctuation) * hours)
+            
+            # Passive income for every missed interval, based on the last known member count
+            intervals = int(hours * 60 // PASSIVE_INCOME['interval_minutes'])
+            income = int(
+                (economy['member_count'] or 0) * PASSIVE_INCOME['base_rate'] *
+                self.get_income_multiplier(economy['economic_status']) *
+                self.missed_income_factor(
+                    datetime.fromisoformat(economy['last_update']), intervals,
+                    income_modifiers.get(economy['guild_id'], [])
+                )
+            )
+            
+            if accrual + income != 0:
+                updates.append((economy['guild_id'], accrual + income, economy['last_update']))
+        
+        if not updates:
+            return 0
+        
+        applied = await self.db.apply_catch_up(updates)
+        logger.info(f"Downtime catch-up applied to {applied} guilds")
+        return applied
+    
+    def missed_income_factor(self, last_update: datetime, intervals: int, modifiers: List[Dict]) -> float:
+        """Sum of the income modifier products over missed passive income ticks.
+        
+        Each missed tick counts with the product of the modifiers that
+        were in force at its time, as the live generator would have
+        applied them. Without modifiers this is just the number of ticks.
+        """
+        if not modifiers:
+            return float(intervals)
+        
+        windows = [
+            (datetime.fromisoformat(modifier['created_at']),
+             datetime.fromisoformat(modifier['expires_at']), modifier['value'])
+            for modifier in modifiers
+        ]
+        step = timedelta(minutes=PASSIVE_INCOME['interval_minutes'])
+        
+        factor = 0.0
+        for tick in range(1, intervals + 1):
+            at = last_update + tick * step
+            product = 1.0
+            for created_at, expires_at, value in windows:
+                if created_at <= at < expires_at:
+                    product *= value
+            factor += product
+        return factor
+    
+    def calculate_base_treasury_change(self, economy: Dict[str, Any],
+                                       fluctuation: Optional[float] = None,
+                                       purpose: str = 'accrual') -> int:
+        """Calculate base hourly treasury change.
+        
+        The random fluctuation is drawn from the guild's stream for `purpose`
+        unless a pre-drawn one (e.g. from a batch draw) is given.
+        """
         base_change = 0
         
         # Economic status effects
@@ -67,7 +162,8 @@ class EconomicEngine:
         base_change += trade_effects['treasury_per_hour']
         
         # Random fluctuation (-50% to +50%)
-        fluctuation = random.uniform(-0.5, 0.5)
+        if fluctuation is None:
+            fluctuation = rng.for_guild(economy['guild_id'], purpose).uniform(-0.5, 0.5)
         base_change = int(base_change * (1 + fluctuation))
         
         return base_change
@@ -78,33 +174,40 @@ class EconomicEngine:
             # Get recent treasury history
             history = await self.db.get_treasury_history(guild_id, 6)  # Last 6 hours
             
-            if len(history) < 2:
+            new_status = self.status_from_trend([h['treasury_amount'] for h in history])
+            if new_status is None:
                 return
             
-            # Calculate trend
-            recent_values = [h['treasury_amount'] for h in history[-3:]]
-            older_values = [h['treasury_amount'] for h in history[-6:-3]]
-            
-            if not older_values:
-                return
-            
-            recent_avg = sum(recent_values) / len(recent_values)
-            older_avg = sum(older_values) / len(older_values)
-            
-            change_rate = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
-            
-            # Determine new status
-            new_status = self.determine_economic_status(change_rate, int(recent_avg))
-            
             # Update if changed
             economy = await self.db.get_guild_economy(guild_id)
             if new_status != economy['economic_status']:
+                if not self.allows_status_change(guild_id, economy['economic_status'], new_status):
+                    logger.info(f"Status decline to {new_status} blocked by stabilization for guild {guild_id}")
+                    return
                 await self.db.update_economic_status(guild_id, new_status)
                 logger.info(f"Economic status changed for guild {guild_id}: {new_status}")
         
         except Exception as e:
             logger.error(f"Error checking economic status change for guild {guild_id}: {e}")
     
+    def status_from_trend(self, treasury_values: List[int]) -> Optional[str]:
+        """Status implied by a series of treasury values, oldest first.
+        
+        Compares the average of the last three values with the three before
+        them. Returns None when there isn't enough history for a trend.
+        """
+        recent_values = treasury_values[-3:]
+        older_values = treasury_values[-6:-3]
+        
+        if len(treasury_values) < 2 or not older_values:
+            return None
+        
+        recent_avg = sum(recent_values) / len(recent_values)
+        older_avg = sum(older_values) / len(older_values)
+        
+        change_rate = (recent_avg - older_avg) / older_avg if older_avg > 0 else 0
+        return self.determine_economic_status(change_rate, int(recent_avg))
+    
     def determine_economic_status(self, change_rate: float, current_treasury: int) -> str:
         """Determine economic status based on change rate and current treasury."""
         # Critical thresholds
@@ -125,8 +228,8 @@ class EconomicEngine:
         else:  # +15% or better
             return "Economic Boom"
     
-    def get_income_multiplier(self, economic_status: str) -> float:
-        """Get income multiplier based on economic status."""
+    def get_income_multiplier(self, economic_status: str, guild_id: int = None) -> float:
+        """Get income multiplier based on economic status and the guild's active modifiers."""
         multipliers = {
             "Economic Crash": 0.1,
             "Economic Recession": 0.5,
@@ -135,10 +238,13 @@ class EconomicEngine:
             "Rapid Growth": 1.3,
             "Economic Boom": 1.8
         }
-        return multipliers.get(economic_status, 1.0)
+        multiplier = multipliers.get(economic_status, 1.0)
+        if guild_id is not None:
+            multiplier *= self.modifiers.multiplier(guild_id, 'income')
+        return multiplier
     
-    def get_action_cost_multiplier(self, economic_status: str) -> float:
-        """Get administrative action cost multiplier."""
+    def get_action_cost_multiplier(self, economic_status: str, guild_id: int = None) -> float:
+        """Get administrative action cost multiplier, including the guild's active modifiers."""
         multipliers = {
             "Economic Crash": 2.0,
             "Economic Recession": 1.5,
@@ -147,7 +253,49 @@ class EconomicEngine:
             "Rapid Growth": 0.8,
             "Economic Boom": 0.6
         }
-        return multipliers.get(economic_status, 1.0)
+        multiplier = multipliers.get(economic_status, 1.0)
+        if guild_id is not None:
+            multiplier *= self.modifiers.multiplier(guild_id, 'action_cost')
+        return multiplier
+    
+    async def add_modifier(self, guild_id: int, modifier_type: str, value: float,
+                           duration: timedelta, source: str):
+        """Activate a time-bounded modifier.
+        
+        Multiplicative types: 'income', 'action_cost', 'trade_policy_cost'.
+        Flag types (value 1.0): 'event_protection', 'status_protection'.
+        """
+        modifier = await self.db.add_modifier(
+            guild_id, modifier_type, value, source, clock.now() + duration
+        )
+        self.modifiers.add(modifier)
+    
+    async def refresh_modifiers(self):
+        """Load modifiers added since the last refresh (including by other processes)."""
+        for modifier in await self.db.get_active_modifiers(self._last_modifier_id):
+            self._last_modifier_id = max(self._last_modifier_id, modifier['id'])
+            self.modifiers.add(modifier)
+    
+    async def prune_modifiers(self) -> int:
+        """Drop expired modifiers from memory and the database."""
+        removed = self.modifiers.prune()
+        await self.db.delete_expired_modifiers()
+        return removed
+    
+    def get_modifier_multiplier(self, guild_id: int, modifier_type: str) -> float:
+        """Combined multiplier of a guild's active modifiers of one type."""
+        return self.modifiers.multiplier(guild_id, modifier_type)
+    
+    def has_modifier(self, guild_id: int, modifier_type: str) -> bool:
+        """Whether a guild has an active modifier of one type."""
+        return self.modifiers.is_active(guild_id, modifier_type)
+    
+    def allows_status_change(self, guild_id: int, current_status: str, new_status: str) -> bool:
+        """False if the change is a decline and the guild's status is protected."""
+        if new_status not in ECONOMIC_STATUS or current_status not in ECONOMIC_STATUS:
+            return True
+        declining = ECONOMIC_STATUS.index(new_status) < ECONOMIC_STATUS.index(current_status)
+        return not (declining and self.has_modifier(guild_id, 'status_protection'))
     
     async def apply_economic_event(self, guild_id: int, event_data: Dict[str, Any]):
         """Apply the effects of an economic event."""
@@ -156,9 +304,11 @@ class EconomicEngine:
             if event_data.get('treasury_impact', 0) != 0:
                 await self.db.update_treasury(guild_id, event_data['treasury_impact'])
             
-            # Apply status impact if specified
+            # Apply status impact if specified (unless stabilization prevents a decline)
             if event_data.get('status_impact'):
-                await self.db.update_economic_status(guild_id, event_data['status_impact'])
+                economy = await self.db.get_guild_economy(guild_id)
+                if self.allows_status_change(guild_id, economy['economic_status'], event_data['status_impact']):
+                    await self.db.update_economic_status(guild_id, event_data['status_impact'])
             
             # Log the event
             await self.db.add_economic_event(
@@ -191,7 +341,8 @@ class EconomicEngine:
     
     def get_economic_forecast(self, economy: Dict[str, Any]) -> Dict[str, Any]:
         """Generate economic forecast for the next 24 hours."""
-        base_change = self.calculate_base_treasury_change(economy)
+        base_change = self.calculate_base_treasury_change(economy, purpose='forecast')
+        stream = rng.for_guild(economy['guild_id'], 'forecast')
         
         # Simulate 24 hours
         hourly_changes = []
@@ -199,7 +350,7 @@ class EconomicEngine:
         
         for hour in range(24):
             # Add some randomness
-            hourly_change = base_change + random.randint(-50, 50)
+            hourly_change = base_change + stream.randint(-50, 50)
             current_treasury += hourly_change
             hourly_changes.append({
                 'hour': hour,
@@ -4,6 +4,7 @@ Discord Economic Simulation Bot
 Inspired by The New Order and Millennium Dawn mods
 """
 
+import argparse
 import asyncio
 import os
 import sys
@@ -13,11 +14,48 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from bot import EconomicBot
+# Imported first so the startup profile covers everything after it
+from utils.startup import startup_profile
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Discord Economic Simulation Bot")
+    parser.add_argument(
+        '--force-sync', action='store_true',
+        help="Sync slash commands even if the command tree is unchanged"
+    )
+    
+    subcommands = parser.add_subparsers(dest='command')
+    simulate = subcommands.add_parser(
+        'simulate', help="Run the economy headless for many virtual guilds (no Discord)"
+    )
+    simulate.add_argument('--guilds', type=int, default=1000, help="Number of virtual guilds")
+    simulate.add_argument('--members', type=int, default=50, help="Average members per guild")
+    span = simulate.add_mutually_exclusive_group()
+    span.add_argument('--days', type=float, default=30, help="Simulated days")
+    span.add_argument('--hours', type=float, help="Simulated hours (instead of --days)")
+    simulate.add_argument('--step-minutes', type=int, default=60, help="Simulated minutes per step")
+    simulate.add_argument('--seed', type=int, default=0)
+    simulate.add_argument('--db', help="Keep the simulated database at this path")
+    return parser.parse_args()
+
+def simulate(args):
+    """Run the headless economy simulation."""
+    import logging
+    from simulation import run_simulation
+    
+    logging.basicConfig(level=logging.WARNING)
+    days = args.hours / 24 if args.hours is not None else args.days
+    asyncio.run(run_simulation(
+        args.guilds, args.members, days, args.step_minutes, seed=args.seed, db_path=args.db
+    ))
 
 def main():
     """Main entry point for the bot."""
-    bot = EconomicBot()
+    args = parse_args()
+    if args.command == 'simulate':
+        simulate(args)
+        return
     
     # Get token from environment
     token = os.getenv('DISCORD_TOKEN')
@@ -26,6 +64,12 @@ def main():
         print("Please set your Discord bot token in the environment variables.")
         sys.exit(1)
     
+    # discord.py is only imported once we know we are actually starting the bot
+    with startup_profile.stage('import bot'):
+        from bot import EconomicBot
+    
+    bot = EconomicBot(force_sync=args.force_sync)
+    
     try:
         bot.run(token)
     except KeyboardInterrupt:
@@ -0,0 +1,200 @@
+"""
+Headless economy simulation (no Discord)
+
+Runs EconomicEngine accrual, passive income, status changes and the random
+event catalog for many virtual guilds over a simulated time span, stepping
+a virtual clock as fast as the CPU allows. Used for capacity planning,
+balance tuning and as an end-to-end benchmark of the core engine.
+"""
+
+import os
+import random
+import tempfile
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional
+
+from database import DatabaseManager
+from economic_engine import EconomicEngine
+from utils import rng
+from utils.clock import FixedClock, set_clock
+from utils.constants import EVENT_INTERVALS, PASSIVE_INCOME
+from utils.event_catalog import EventCatalog
+
+# Treasury samples kept per guild for status trends (status_from_trend uses six)
+TREND_WINDOW = 6
+
+class EconomySimulation:
+    """Steps every virtual guild's economy forward in fixed increments.
+    
+    Each step reads all economies in one query, draws every guild's
+    fluctuation in one batch from the seeded per-guild streams, applies
+    the step's status and trade accrual plus passive income in one
+    transaction, updates statuses from each guild's treasury trend, and
+    fires the events that came due, drawn for all due guilds at once from
+    the event catalog.
+    """
+    
+    def __init__(self, db: DatabaseManager, guilds: int, members: int,
+                 step: timedelta, seed: int = 0):
+        self.db = db
+        self.engine = EconomicEngine(db)
+        self.catalog = EventCatalog()
+        self.guild_ids = list(range(1, guilds + 1))
+        self.step = step
+        self.clock = FixedClock(datetime(2000, 1, 1))
+        
+        self.streams = rng.seed(seed)  # Per-guild streams used by the engine and below
+        self.rng = random.Random(seed)
+        
+        # Member counts vary between guilds but stay fixed over a run
+        self.members = {
+            guild_id: max(1, int(self.rng.gauss(members, members / 3))) for guild_id in self.guild_ids
+        }
+        self.trends: Dict[int, Deque[int]] = {
+            guild_id: deque(maxlen=TREND_WINDOW) for guild_id in self.guild_ids
+        }
+        self.next_event: Dict[int, datetime] = {}
+        
+        self.steps = 0
+        self.events = Counter()
+        self.status_changes = 0
+    
+    def _schedule_event(self, guild_id: int):
+        hours = self.streams.stream(guild_id, 'schedule').randint(
+            EVENT_INTERVALS['min_hours'], EVENT_INTERVALS['max_hours']
+        )
+        self.next_event[guild_id] = self.clock.now() + timedelta(hours=hours)
+    
+    async def setup(self):
+        await self.db.warm_up(self.guild_ids)
+        for guild_id in self.guild_ids:
+            self._schedule_event(guild_id)
+    
+    async def run_step(self):
+        """Advance every guild by one step."""
+        step_hours = self.step.total_seconds() / 3600
+        intervals = self.step.total_seconds() / 60 / PASSIVE_INCOME['interval_minutes']
+        
+        # Accrual and passive income, written in one transaction
+        updates = []
+        treasuries = {}
+        economies = await self.db.get_accrual_snapshot()
+        fluctuations = self.streams.uniform(
+            [economy['guild_id'] for economy in economies], 'accrual', -0.5, 0.5
+        )
+        for economy, fluctuation in zip(economies, fluctuations.tolist()):
+            guild_id = economy['guild_id']
+            accrual = int(self.engine.calculate_base_treasury_change(economy, fluctuation) * step_hours)
+            income = int(
+                self.members[guild_id] * PASSIVE_INCOME['base_rate'] * intervals *
+                self.engine.get_income_multiplier(economy['economic_status'], guild_id)
+            )
+            updates.append((guild_id, accrual + income, economy['last_update']))
+            treasuries[guild_id] = (max(0, economy['treasury'] + accrual + income),
+                                    economy['economic_status'])
+        await self.db.apply_catch_up(updates)
+        
+        # Status changes from each guild's treasury trend
+        for guild_id, (treasury, status) in treasuries.items():
+            trend = self.trends[guild_id]
+            trend.append(treasury)
+            new_status = self.engine.status_from_trend(list(trend))
+            if new_status and new_status != status and \
+                    self.engine.allows_status_change(guild_id, status, new_status):
+                await self.db.update_economic_status(guild_id, new_status)
+                self.status_changes += 1
+        
+        # Random events that came due during this step
+        self.clock.advance(self.step)
+        due = [guild_id for guild_id, at in self.next_event.items() if at <= self.clock.now()]
+        if due:
+            await self._fire_events(due)
+        
+        self.steps += 1
+    
+    async def _fire_events(self, guild_ids: List[int]):
+        keys = []
+        for guild_id in guild_ids:
+            economy = await self.db.get_guild_economy(guild_id)
+            keys.append((economy['economic_status'], self.engine.has_modifier(guild_id, 'event_protection')))
+        
+        picks = self.catalog.pick_many(keys, uniforms=self.streams.random(guild_ids, 'events'))
+        
+        for guild_id, (event_type, event) in zip(guild_ids, picks):
+            stream = self.streams.stream(guild_id, 'events')
+            await self.engine.apply_economic_event(
+                guild_id, self.catalog.event_data(event_type, event, stream)
+            )
+            self.events[event_type] += 1
+            self._schedule_event(guild_id)
+    
+    async def final_state(self) -> Dict:
+        """Distributions of status, trade policy and treasury across guilds."""
+        economies = await self.db.get_accrual_snapshot()
+        treasuries = sorted(economy['treasury'] for economy in economies)
+        
+        def percentile(fraction: float) -> int:
+            return treasuries[min(len(treasuries) - 1, int(fraction * len(treasuries)))]
+        
+        return {
+            'statuses': Counter(economy['economic_status'] for economy in economies),
+            'trade_policies': Counter(economy['trade_policy'] for economy in economies),
+            'treasury': {
+                'min': treasuries[0],
+                'p10': percentile(0.10),
+                'p50': percentile(0.50),
+                'p90': percentile(0.90),
+                'max': treasuries[-1],
+                'bankrupt': sum(1 for treasury in treasuries if treasury <= 0)
+            },
+            'events': dict(self.events),
+            'status_changes': self.status_changes
+        }
+
+async def run_simulation(guilds: int, members: int, days: float, step_minutes: int,
+                         seed: int = 0, db_path: Optional[str] = None):
+    """Run a simulation and print throughput and the final state."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = db_path or os.path.join(directory, 'simulation.db')
+        db = DatabaseManager(path)
+        await db.initialize()
+        
+        simulation = EconomySimulation(db, guilds, members, timedelta(minutes=step_minutes), seed)
+        # The engine and the database timestamp everything with the virtual clock
+        previous_clock = set_clock(simulation.clock)
+        try:
+            await simulation.setup()
+            
+            total_steps = int(days * 24 * 60 // step_minutes)
+            start = time.perf_counter()
+            for step in range(total_steps):
+                await simulation.run_step()
+                if (step + 1) % max(1, total_steps // 10) == 0:
+                    print(f"  day {(step + 1) * step_minutes / 1440:.1f} / {days:g}", flush=True)
+            elapsed = time.perf_counter() - start
+            
+            state = await simulation.final_state()
+        finally:
+            set_clock(previous_clock)
+            await db.close()
+        db_size = os.path.getsize(path)
+    
+    guild_hours = guilds * total_steps * step_minutes / 60
+    print(f"\nSimulated {guilds:,} guilds for {days:g} days ({total_steps:,} steps of "
+          f"{step_minutes} min) in {elapsed:.2f} s")
+    print(f"Throughput: {guild_hours / elapsed:,.0f} guild-hours/s, "
+          f"{total_steps / elapsed:,.1f} steps/s; database {db_size / 1024 / 1024:.1f} MiB")
+    
+    print("\nEconomic status:")
+    for status, count in state['statuses'].most_common():
+        print(f"  {status:<22}{count:>8} ({count / guilds:.1%})")
+    print("Trade policy:")
+    for policy, count in state['trade_policies'].most_common():
+        print(f"  {policy:<22}{count:>8}")
+    treasury = state['treasury']
+    print(f"Treasury: min ${treasury['min']:,}  p10 ${treasury['p10']:,}  p50 ${treasury['p50']:,}  "
+          f"p90 ${treasury['p90']:,}  max ${treasury['max']:,}  ({treasury['bankrupt']} at $0)")
+    print(f"Events: {state['events']}; status changes: {state['status_changes']:,}")
+    return state
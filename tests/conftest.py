@@ -0,0 +1,41 @@
+"""
+Shared fixtures: a fixed clock and a fresh database per test
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database import DatabaseManager
+from utils import clock
+from utils.clock import FixedClock
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+@pytest.fixture
+def fixed_clock():
+    """Install a FixedClock at START for the test, restoring the previous clock afterwards."""
+    fixed = FixedClock(START)
+    previous = clock.set_clock(fixed)
+    yield fixed
+    clock.set_clock(previous)
+
+@pytest.fixture
+def run_db(tmp_path, fixed_clock):
+    """Run `scenario(db)` against a freshly initialized database and return its result.
+    
+    pytest-asyncio isn't a dependency, so each call gets its own event loop.
+    """
+    def run(scenario, path=None):
+        async def main():
+            db = DatabaseManager(str(path or tmp_path / 'test.db'))
+            await db.initialize()
+            try:
+                return await scenario(db)
+            finally:
+                await db.close()
+        
+        return asyncio.run(main())
+    
+    return run
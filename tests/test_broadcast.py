@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from utils.broadcast import BroadcastProgress
+
+def progress():
+    return BroadcastProgress({'sent': 3, 'failed': 1, 'last_member_id': 5})
+
+def test_checkpoint_waits_for_earlier_members():
+    tracker = progress()
+    for member_id in (10, 20, 30, 40):
+        tracker.queued(member_id)
+    
+    tracker.handled(20, True)
+    tracker.handled(30, False)
+    assert tracker.checkpoint == 5
+    
+    tracker.handled(10, True)
+    assert tracker.checkpoint == 30
+    
+    tracker.handled(40, True)
+    assert tracker.checkpoint == 40
+    assert (tracker.sent, tracker.failed, tracker.processed) == (6, 2, 8)
+
+async def start_broadcast(db, owner_id='process-a', guild_id=1, cost=100):
+    await db.initialize_guild(guild_id)
+    token = await db.create_pending_action(guild_id, 7, 'mass_message', cost, 60)
+    result, broadcast = await db.claim_broadcast_start(token, guild_id, 7, "hello", 50, owner_id)
+    assert result == 'claimed'
+    return broadcast
+
+def test_stale_broadcast_is_taken_over(run_db, fixed_clock):
+    async def scenario(db):
+        broadcast = await start_broadcast(db)
+        assert not await db.claim_broadcast(broadcast['id'], 'process-b', 60)
+        assert await db.claim_broadcast(broadcast['id'], 'process-a', 60)
+        
+        await db.save_broadcast_progress(broadcast['id'], 99, 10, 2)
+        fixed_clock.advance(timedelta(seconds=61))
+        assert await db.claim_broadcast(broadcast['id'], 'process-b', 60)
+        
+        resumed, = await db.get_resumable_broadcasts()
+        return resumed
+    
+    resumed = run_db(scenario)
+    assert resumed['owner_id'] == 'process-b'
+    assert (resumed['last_member_id'], resumed['sent'], resumed['failed']) == (99, 10, 2)
+
+def test_released_broadcast_resumes_at_once(run_db):
+    async def scenario(db):
+        broadcast = await start_broadcast(db)
+        await db.release_broadcasts('process-a')
+        assert await db.claim_broadcast(broadcast['id'], 'process-b', 60)
+        assert not await db.claim_broadcast(broadcast['id'], 'process-c', 60)
+    
+    run_db(scenario)
+
+def test_finish_refunds_once(run_db):
+    async def scenario(db):
+        broadcast = await start_broadcast(db, cost=100)
+        charged = (await db.get_guild_economy(1))['treasury']
+        
+        assert await db.finish_broadcast(broadcast['id'], 99, 40, 10, refund=10)
+        assert not await db.finish_broadcast(broadcast['id'], 99, 40, 10, refund=10)
+        assert not await db.claim_broadcast(broadcast['id'], 'process-a', 60)
+        
+        return charged, (await db.get_guild_economy(1))['treasury'], await db.get_resumable_broadcasts()
+    
+    charged, treasury, resumable = run_db(scenario)
+    assert charged == 10000 - 100
+    assert treasury == charged + 10
+    assert resumable == []
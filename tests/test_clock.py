@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils import clock
+from utils.clock import AcceleratedClock, Clock, FixedClock
+
+from .conftest import START
+
+def test_fixed_clock_stands_still_until_advanced():
+    fixed = FixedClock(START)
+    assert fixed.now() == START
+    
+    fixed.advance(90)
+    assert fixed.now() == START + timedelta(seconds=90)
+    
+    fixed.advance(timedelta(hours=1))
+    assert fixed.now() == START + timedelta(hours=1, seconds=90)
+    
+    fixed.set(datetime(2030, 5, 5))
+    assert fixed.now() == datetime(2030, 5, 5)
+    assert fixed.timestamp() == datetime(2030, 5, 5).timestamp()
+
+def test_accelerated_clock_scales_elapsed_time(monkeypatch):
+    real = [1000.0]
+    monkeypatch.setattr(clock.time, 'monotonic', lambda: real[0])
+    
+    fast = AcceleratedClock(60, START)
+    real[0] += 10
+    assert fast.now() == START + timedelta(minutes=10)
+
+def test_incomplete_clock_fails_on_creation():
+    class NoNow(Clock):
+        pass
+    
+    with pytest.raises(TypeError):
+        NoNow()
+
+def test_set_clock_returns_previous_clock():
+    first = FixedClock(START)
+    original = clock.set_clock(first)
+    try:
+        assert clock.get_clock() is first
+        assert clock.now() == START
+        
+        second = FixedClock(START + timedelta(days=1))
+        assert clock.set_clock(second) is first
+        assert clock.now() == START + timedelta(days=1)
+    finally:
+        clock.set_clock(original)
+
+def test_db_timestamp_layout(fixed_clock):
+    assert clock.db_timestamp() == '2024-01-01 12:00:00'
+    # Microseconds are dropped so stored values compare correctly as text
+    assert clock.db_timestamp(datetime(2024, 3, 4, 5, 6, 7, 891011)) == '2024-03-04 05:06:07'
+    assert clock.db_timestamp(START) < clock.db_timestamp(START + timedelta(seconds=1))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from utils.cooldowns import CooldownStore
+
+def test_try_start_claims_then_reports_remaining(run_db, fixed_clock):
+    async def scenario(db):
+        store = CooldownStore(db, 'petition', timedelta(minutes=10))
+        assert await store.remaining(1, 7) is None
+        assert await store.try_start(1, 7) is None
+        
+        fixed_clock.advance(timedelta(minutes=4))
+        assert await store.try_start(1, 7) == timedelta(minutes=6)
+        assert await store.remaining(1, 8) is None
+        
+        fixed_clock.advance(timedelta(minutes=6))
+        return await store.try_start(1, 7)
+    
+    assert run_db(scenario) is None
+
+def test_claim_by_another_process_is_noticed(run_db, fixed_clock):
+    async def scenario(db):
+        ours = CooldownStore(db, 'petition', timedelta(minutes=10))
+        theirs = CooldownStore(db, 'petition', timedelta(minutes=10))
+        
+        # Cache a "no cooldown" answer, then let the other process claim it
+        assert await ours.remaining(1, 7) is None
+        assert await theirs.try_start(1, 7) is None
+        
+        return await ours.try_start(1, 7)
+    
+    assert run_db(scenario) == timedelta(minutes=10)
+
+def test_expired_entries_leave_the_cache(run_db, fixed_clock):
+    async def scenario(db):
+        store = CooldownStore(db, 'petition', timedelta(minutes=10))
+        for user_id in range(5):
+            await store.try_start(1, user_id)
+        await store.remaining(1, 99)
+        assert len(store) == 6
+        
+        fixed_clock.advance(timedelta(minutes=10))
+        await store.remaining(1, 0)
+        return len(store)
+    
+    assert run_db(scenario) == 1
+
+def test_release_undoes_only_our_claim(run_db, fixed_clock):
+    async def scenario(db):
+        store = CooldownStore(db, 'influence', timedelta(hours=6))
+        assert await store.try_start(1, 7) is None
+        await store.release(1, 7)
+        assert await db.get_cooldown('influence', 1, 7) is None
+        assert await store.try_start(1, 7) is None
+        
+        # Another process's cooldown replaced our claim; releasing ours leaves it alone
+        assert await db.release_cooldown('influence', 1, 7, fixed_clock.now() + timedelta(hours=6))
+        assert await db.claim_cooldown('influence', 1, 7, fixed_clock.now() + timedelta(hours=1)) is None
+        await store.release(1, 7)
+        return await db.get_cooldown('influence', 1, 7)
+    
+    assert run_db(scenario) == fixed_clock.now() + timedelta(hours=1)
@@ -0,0 +1,202 @@
+import asyncio
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+from .conftest import START
+
+GUILD = 1
+STARTING_TREASURY = 10000
+
+async def treasury(db, guild_id=GUILD):
+    return (await db.get_guild_economy(guild_id))['treasury']
+
+async def pending_status(db, token):
+    async with db._reader() as conn:
+        cursor = await conn.execute("SELECT status FROM pending_actions WHERE token = ?", (token,))
+        return (await cursor.fetchone())[0]
+
+def test_failed_write_does_not_undo_its_batch(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        
+        async def failing(conn):
+            await conn.execute("UPDATE guild_economies SET treasury = 0 WHERE guild_id = ?", (GUILD,))
+            await db._refresh_economy(conn, GUILD)
+            raise RuntimeError("boom")
+        
+        # Queued together, so both run in the same transaction
+        results = await asyncio.gather(
+            db._write(failing), db.update_treasury(GUILD, 50), return_exceptions=True
+        )
+        return results, await treasury(db)
+    
+    (error, updated), final = run_db(scenario)
+    assert isinstance(error, RuntimeError)
+    assert updated is True
+    # The failed mutation was rolled back and its cached row discarded
+    assert final == STARTING_TREASURY + 50
+
+def test_claim_charges_once(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'mass_message', 300, 60)
+        results = [await db.claim_pending_action(token, GUILD) for _ in range(3)]
+        return results, await treasury(db), await pending_status(db, token)
+    
+    results, final, status = run_db(scenario)
+    assert results == ['claimed', 'action_used', 'action_used']
+    assert final == STARTING_TREASURY - 300
+    assert status == 'claimed'
+
+def test_claim_rejects_other_guild_expired_and_cancelled_tokens(run_db, fixed_clock):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'mass_message', 300, 60)
+        wrong_guild = await db.claim_pending_action(token, 2)
+        
+        fixed_clock.advance(timedelta(seconds=61))
+        expired = await db.claim_pending_action(token, GUILD)
+        
+        cancelled_token = await db.create_pending_action(GUILD, 7, 'mass_message', 300, 60)
+        assert await db.cancel_pending_action(cancelled_token)
+        assert not await db.cancel_pending_action(cancelled_token)
+        cancelled = await db.claim_pending_action(cancelled_token, GUILD)
+        
+        return wrong_guild, expired, cancelled, await treasury(db)
+    
+    assert run_db(scenario) == ('action_used', 'action_expired', 'action_used', STARTING_TREASURY)
+
+def test_insufficient_funds_keeps_token_usable(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'mass_message', STARTING_TREASURY + 1, 60)
+        first = await db.claim_pending_action(token, GUILD)
+        status = await pending_status(db, token)
+        
+        await db.update_treasury(GUILD, 1)
+        second = await db.claim_pending_action(token, GUILD)
+        return first, status, second, await treasury(db)
+    
+    assert run_db(scenario) == ('insufficient_funds', 'pending', 'claimed', 0)
+
+def test_trade_policy_change_is_claimed_with_its_effect(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'trade_policy', 500, 60)
+        first = await db.claim_trade_policy_change(token, GUILD, 'Free Trade')
+        second = await db.claim_trade_policy_change(token, GUILD, 'Protectionism')
+        economy = await db.get_guild_economy(GUILD)
+        return first, second, economy['trade_policy'], economy['treasury']
+    
+    assert run_db(scenario) == ('claimed', 'action_used', 'Free Trade', STARTING_TREASURY - 500)
+
+def test_failing_effect_rolls_back_the_claim(run_db, monkeypatch):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'trade_policy', 500, 60)
+        
+        async def broken(conn, guild_id, policy):
+            raise sqlite3.OperationalError("disk I/O error")
+        
+        monkeypatch.setattr(db, '_set_trade_policy', broken)
+        with pytest.raises(sqlite3.OperationalError):
+            await db.claim_trade_policy_change(token, GUILD, 'Free Trade')
+        
+        return await pending_status(db, token), await treasury(db)
+    
+    assert run_db(scenario) == ('pending', STARTING_TREASURY)
+
+def test_broadcast_start_records_the_cost(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        token = await db.create_pending_action(GUILD, 7, 'mass_message', 250, 60)
+        claimed = await db.claim_broadcast_start(token, GUILD, 7, "hello", 20, 'process-a')
+        repeated = await db.claim_broadcast_start(token, GUILD, 7, "hello", 20, 'process-a')
+        return claimed, repeated, await db.get_resumable_broadcasts()
+    
+    (result, broadcast), repeated, resumable = run_db(scenario)
+    assert result == 'claimed'
+    assert (broadcast['cost'], broadcast['total_recipients'], broadcast['owner_id']) == (250, 20, 'process-a')
+    assert repeated == ('action_used', None)
+    assert [row['id'] for row in resumable] == [broadcast['id']]
+
+def test_leases(run_db, fixed_clock):
+    async def scenario(db):
+        first = await db.acquire_lease('events', 0, 'a', 30)
+        assert first == START + timedelta(seconds=30)
+        assert await db.acquire_lease('events', 0, 'b', 30) is None
+        assert await db.acquire_lease('events', 1, 'b', 30) is not None
+        
+        # The holder renews; another owner only gets it once it has expired
+        fixed_clock.advance(20)
+        assert await db.acquire_lease('events', 0, 'a', 30) == START + timedelta(seconds=50)
+        fixed_clock.advance(20)
+        assert await db.acquire_lease('events', 0, 'b', 30) is None
+        fixed_clock.advance(11)
+        assert await db.acquire_lease('events', 0, 'b', 30) is not None
+        
+        await db.release_leases('b')
+        return await db.acquire_lease('events', 1, 'a', 30)
+    
+    assert run_db(scenario) is not None
+
+def test_cooldown_claims(run_db, fixed_clock):
+    async def scenario(db):
+        expires_at = START + timedelta(minutes=5)
+        assert await db.claim_cooldown('petition', GUILD, 7, expires_at) is None
+        assert await db.claim_cooldown('petition', GUILD, 7, expires_at) == expires_at
+        assert await db.get_cooldown('petition', GUILD, 7) == expires_at
+        
+        fixed_clock.advance(timedelta(minutes=5))
+        return await db.claim_cooldown('petition', GUILD, 7, expires_at + timedelta(minutes=5))
+    
+    assert run_db(scenario) is None
+
+def test_pass_petition_grants_its_effect_once(run_db):
+    async def scenario(db):
+        await db.initialize_guild(GUILD)
+        petition = await db.create_petition(GUILD, 'stimulus', 7, 3, START + timedelta(hours=1))
+        modifier = ('income', 1.25, START + timedelta(hours=6))
+        
+        first = await db.pass_petition(petition['id'], "Stimulus passed", 1000, modifier)
+        second = await db.pass_petition(petition['id'], "Stimulus passed", 1000, modifier)
+        return (first, second, await treasury(db), await db.get_active_modifiers(),
+                (await db.get_petition(petition['id']))['status'],
+                await db.get_admin_action_history(GUILD))
+    
+    first, second, final, modifiers, status, history = run_db(scenario)
+    assert (first, second) == (True, False)
+    assert final == STARTING_TREASURY + 1000
+    assert [(row['value'], row['source']) for row in modifiers] == [(1.25, 'petition:1')]
+    assert status == 'passed'
+    assert len(history) == 1
+
+def test_old_timestamps_are_normalized_once(run_db, tmp_path):
+    path = tmp_path / 'old.db'
+    
+    async def create(db):
+        await db.initialize_guild(GUILD)
+    
+    run_db(create, path)
+    
+    # Simulate a file written by a version that stored ISO 8601 strings
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE guild_economies SET last_update = '2024-01-01T11:30:00.123456'")
+    conn.execute("UPDATE event_schedule SET last_event_time = '2024-01-01T11:00:00'")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+    
+    async def reopen(db):
+        async with db._reader() as conn:
+            cursor = await conn.execute("SELECT last_update FROM guild_economies")
+            last_update = (await cursor.fetchone())[0]
+            cursor = await conn.execute("SELECT last_event_time FROM event_schedule")
+            last_event = (await cursor.fetchone())[0]
+            cursor = await conn.execute("PRAGMA user_version")
+            version = (await cursor.fetchone())[0]
+        return last_update, last_event, version
+    
+    assert run_db(reopen, path) == ('2024-01-01 11:30:00', '2024-01-01 11:00:00', 1)
@@ -0,0 +1,97 @@
+import asyncio
+
+import discord
+import pytest
+
+from utils.constants import DISPATCHER
+from utils.dispatcher import MessageDispatcher
+
+class FakeChannel:
+    def __init__(self, channel_id, sent, failures=()):
+        self.id = channel_id
+        self.sent = sent
+        self.failures = list(failures)
+    
+    async def send(self, content=None, embeds=None):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((self.id, content, embeds))
+
+@pytest.fixture
+def fast_dispatcher(monkeypatch):
+    monkeypatch.setitem(DISPATCHER, 'workers', 1)
+    monkeypatch.setitem(DISPATCHER, 'coalesce_window_seconds', 0)
+    monkeypatch.setitem(DISPATCHER, 'backoff_base_seconds', 0.01)
+    monkeypatch.setitem(DISPATCHER, 'drain_seconds', 2)
+
+async def drain(dispatcher):
+    dispatcher.start()
+    await dispatcher.close()
+
+def test_higher_priority_is_sent_first(fast_dispatcher):
+    sent = []
+    
+    async def scenario():
+        dispatcher = MessageDispatcher()
+        for priority, channel_id in ((3, 1), (1, 2), (2, 3)):
+            dispatcher.enqueue(FakeChannel(channel_id, sent), f"p{priority}", priority=priority)
+        await drain(dispatcher)
+    
+    asyncio.run(scenario())
+    assert [content for _, content, _ in sent] == ['p1', 'p2', 'p3']
+
+def test_queued_notifications_are_coalesced(fast_dispatcher):
+    sent = []
+    
+    async def scenario():
+        dispatcher = MessageDispatcher()
+        channel = FakeChannel(1, sent)
+        for title in ('a', 'b', 'c'):
+            dispatcher.enqueue(channel, embed=discord.Embed(title=title), coalesce_key=10)
+        await drain(dispatcher)
+    
+    asyncio.run(scenario())
+    assert len(sent) == 1
+    _, _, embeds = sent[0]
+    assert [field.name for field in embeds[0].fields] == ['a', 'b', 'c']
+
+def test_transient_failures_are_retried(fast_dispatcher):
+    sent = []
+    
+    async def scenario():
+        dispatcher = MessageDispatcher()
+        dispatcher.enqueue(FakeChannel(1, sent, failures=[OSError('reset'), OSError('reset')]), "hi")
+        await drain(dispatcher)
+    
+    asyncio.run(scenario())
+    assert sent == [(1, "hi", [])]
+
+def test_worker_survives_unexpected_errors(fast_dispatcher):
+    sent = []
+    
+    async def scenario():
+        dispatcher = MessageDispatcher()
+        dispatcher.enqueue(FakeChannel(1, sent, failures=[ValueError('bad payload')]), "lost")
+        dispatcher.enqueue(FakeChannel(2, sent), "delivered")
+        await drain(dispatcher)
+        return len(dispatcher)
+    
+    assert asyncio.run(scenario()) == 0
+    assert sent == [(2, "delivered", [])]
+
+def test_channel_burst_is_paced(fast_dispatcher, monkeypatch):
+    monkeypatch.setitem(DISPATCHER, 'channel_burst', 2)
+    monkeypatch.setitem(DISPATCHER, 'channel_period_seconds', 0.2)
+    sent = []
+    
+    async def scenario():
+        dispatcher = MessageDispatcher()
+        busy = FakeChannel(1, sent)
+        for index in range(4):
+            dispatcher.enqueue(busy, f"busy{index}")
+        dispatcher.enqueue(FakeChannel(2, sent), "other")
+        await drain(dispatcher)
+    
+    asyncio.run(scenario())
+    # The third message to the busy channel waits for a refill; the other channel doesn't
+    assert [content for _, content, _ in sent] == ['busy0', 'busy1', 'other', 'busy2', 'busy3']
@@ -0,0 +1,83 @@
+import sqlite3
+import time
+from datetime import timedelta
+
+import pytest
+
+from economic_engine import EconomicEngine
+from utils import clock, rng
+from utils.constants import PASSIVE_INCOME
+from utils.rng import RandomStreams
+
+from .conftest import START
+
+STEP = timedelta(minutes=PASSIVE_INCOME['interval_minutes'])
+
+def window(start, end, value):
+    return {'created_at': clock.db_timestamp(start), 'expires_at': clock.db_timestamp(end), 'value': value}
+
+def test_factor_without_modifiers_counts_ticks():
+    engine = EconomicEngine(None)
+    assert engine.missed_income_factor(START, 12, []) == 12
+
+def test_factor_applies_modifiers_in_force_at_each_tick():
+    engine = EconomicEngine(None)
+    modifiers = [
+        # Ticks 1-4 doubled, ticks 3-6 boosted by half
+        window(START, START + 4 * STEP + timedelta(seconds=1), 2.0),
+        window(START + 3 * STEP, START + 7 * STEP, 1.5),
+    ]
+    expected = 2 + 2 + 3 + 3 + 1.5 + 1.5 + 1 + 1
+    assert engine.missed_income_factor(START, 8, modifiers) == pytest.approx(expected)
+
+async def catch_up_treasury(db, fixed_clock, boosted):
+    """Treasury after a three hour outage, optionally with an income boost for its first hour."""
+    engine = EconomicEngine(db)
+    await db.initialize_guild(1)
+    await db.record_passive_income(1, 0, 20)
+    if boosted:
+        await db.add_modifier(1, 'income', 2.0, 'petition:1', START + timedelta(hours=1))
+    
+    fixed_clock.set(START + timedelta(hours=3))
+    assert await engine.catch_up_downtime() == 1
+    return (await db.get_guild_economy(1))['treasury']
+
+def test_catch_up_includes_expired_income_modifiers(run_db, fixed_clock, monkeypatch, tmp_path):
+    results = {}
+    for boosted in (False, True):
+        # Same accrual fluctuation in both runs
+        monkeypatch.setattr(rng, '_streams', RandomStreams(1))
+        fixed_clock.set(START)
+        results[boosted] = run_db(lambda db: catch_up_treasury(db, fixed_clock, boosted),
+                                  tmp_path / f"{boosted}.db")
+    
+    # The boost expired before the bot came back, but covered the first 11 missed ticks
+    income = 20 * PASSIVE_INCOME['base_rate'] * EconomicEngine(None).get_income_multiplier('Stable Growth')
+    assert results[True] - results[False] == int(income * 47) - int(income * 36)
+
+@pytest.fixture
+def utc_plus_nine(monkeypatch):
+    monkeypatch.setenv('TZ', 'Etc/GMT-9')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_catch_up_after_upgrade_ignores_utc_offset(run_db, fixed_clock, tmp_path, utc_plus_nine):
+    path = tmp_path / 'old.db'
+    run_db(lambda db: db.initialize_guild(1), path)
+    
+    # Older versions stamped last_update with SQLite's CURRENT_TIMESTAMP (UTC)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE guild_economies SET last_update = '2024-01-01 03:00:00', member_count = 20")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+    
+    async def restart(db):
+        # 12:00 local is 03:00 UTC, so the bot was not down at all
+        return await EconomicEngine(db).catch_up_downtime(), await db.get_accrual_snapshot()
+    
+    applied, (economy,) = run_db(restart, path)
+    assert applied == 0
+    assert economy['last_update'] == '2024-01-01 12:00:00'
@@ -0,0 +1,74 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from utils.event_catalog import DEFAULT_STATUS, AliasTable, EventCatalog
+from utils.rng import RandomStreams
+
+def test_alias_table_reproduces_weights():
+    weights = [1, 2, 3, 4, 0]
+    table = AliasTable(weights)
+    
+    # An even grid of uniforms hits each outcome in exact proportion to its weight
+    uniforms = (np.arange(100_000) + 0.5) / 100_000
+    counts = Counter(table.sample_uniforms(uniforms))
+    
+    total = sum(weights)
+    for index, weight in enumerate(weights):
+        assert counts[index] / len(uniforms) == pytest.approx(weight / total, abs=1e-4)
+
+def test_sample_matches_sample_uniforms():
+    table = AliasTable([0.2, 0.5, 0.1, 0.2])
+    scalar = RandomStreams(4).stream(1, 'events')
+    draws = RandomStreams(4).stream(1, 'events')
+    
+    uniforms = np.array([draws.random() for _ in range(200)])
+    assert [table.sample(scalar) for _ in range(200)] == table.sample_uniforms(uniforms)
+
+def test_protected_tables_have_no_negative_events():
+    catalog = EventCatalog()
+    for (status, protected), (entries, _) in catalog.tables.items():
+        if protected:
+            assert entries
+            assert all(event_type != 'negative' for event_type, _ in entries)
+
+def test_pick_is_deterministic_per_stream():
+    catalog = EventCatalog()
+    first = RandomStreams(2).stream(9, 'events')
+    second = RandomStreams(2).stream(9, 'events')
+    
+    assert ([catalog.pick(DEFAULT_STATUS, rng=first) for _ in range(20)]
+            == [catalog.pick(DEFAULT_STATUS, rng=second) for _ in range(20)])
+    
+    event_type, event = catalog.pick_type('positive', first)
+    assert event_type == 'positive'
+    low, high = event['impact_range']
+    assert low <= catalog.roll_impact(event, first) <= high
+
+def test_pick_requires_a_stream():
+    catalog = EventCatalog()
+    with pytest.raises(TypeError):
+        catalog.pick(DEFAULT_STATUS)
+
+def test_pick_many_matches_single_picks():
+    catalog = EventCatalog()
+    statuses = sorted({status for status, _ in catalog.tables})
+    keys = [(statuses[i % len(statuses)], i % 3 == 0) for i in range(30)]
+    keys.append(('Unknown Status', False))
+    guild_ids = list(range(len(keys)))
+    
+    streams = RandomStreams(6)
+    picks = catalog.pick_many(keys, streams.random(guild_ids, 'events'))
+    
+    scalar = RandomStreams(6)
+    expected = [
+        catalog.pick(status, protected, rng=scalar.stream(guild_id, 'events'))
+        for guild_id, (status, protected) in zip(guild_ids, keys)
+    ]
+    assert picks == expected
+
+def test_pick_many_rejects_mismatched_uniforms():
+    catalog = EventCatalog()
+    with pytest.raises(ValueError):
+        catalog.pick_many([(DEFAULT_STATUS, False)] * 3, np.array([0.1, 0.2]))
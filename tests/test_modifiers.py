@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+
+from economic_engine import EconomicEngine
+from utils.constants import ADMIN_ACTIONS_COSTS
+from utils.embeds import EconomicEmbeds
+from utils.modifiers import ModifierRegistry
+
+from .conftest import START
+
+def modifier(modifier_id, value, minutes, guild_id=1, modifier_type='income'):
+    return {
+        'id': modifier_id,
+        'guild_id': guild_id,
+        'modifier_type': modifier_type,
+        'value': value,
+        'expires_at': START + timedelta(minutes=minutes)
+    }
+
+def test_multiplier_is_product_of_active_modifiers(fixed_clock):
+    registry = ModifierRegistry()
+    assert registry.multiplier(1, 'income') == 1.0
+    
+    registry.add(modifier(1, 1.5, 10))
+    registry.add(modifier(2, 2.0, 20))
+    registry.add(modifier(3, 0.5, 20, guild_id=2))
+    
+    assert registry.multiplier(1, 'income') == pytest.approx(3.0)
+    assert registry.multiplier(2, 'income') == pytest.approx(0.5)
+    assert registry.multiplier(1, 'action_cost') == 1.0
+
+def test_add_is_idempotent(fixed_clock):
+    registry = ModifierRegistry()
+    registry.add(modifier(1, 1.5, 10))
+    registry.add(modifier(1, 1.5, 10))
+    
+    assert len(registry) == 1
+    assert registry.multiplier(1, 'income') == pytest.approx(1.5)
+
+def test_expired_modifiers_are_pruned(fixed_clock):
+    registry = ModifierRegistry()
+    registry.add(modifier(1, 1.5, 10))
+    registry.add(modifier(2, 2.0, 20))
+    registry.add(modifier(3, 1.0, 5, modifier_type='event_protection'))
+    assert registry.is_active(1, 'event_protection')
+    
+    fixed_clock.advance(timedelta(minutes=10))
+    assert registry.multiplier(1, 'income') == pytest.approx(2.0)
+    assert not registry.is_active(1, 'event_protection')
+    
+    assert registry.prune(START + timedelta(minutes=30)) == 1
+    assert len(registry) == 0
+    assert registry.multiplier(1, 'income') == 1.0
+
+def test_accepts_database_timestamps(fixed_clock):
+    registry = ModifierRegistry()
+    registry.add(dict(modifier(1, 1.5, 0), expires_at='2024-01-01 12:10:00'))
+    
+    assert registry.multiplier(1, 'income') == pytest.approx(1.5)
+    fixed_clock.advance(timedelta(minutes=10))
+    assert registry.multiplier(1, 'income') == 1.0
+
+def test_admin_costs_embed_includes_action_cost_modifiers(fixed_clock):
+    engine = EconomicEngine(None)
+    engine.modifiers.add(modifier(1, 0.5, 10, modifier_type='action_cost'))
+    economy = {'economic_status': 'Stable Growth', 'treasury': 10 ** 6}
+    
+    embed = EconomicEmbeds().create_admin_costs_embed(economy, engine, 1)
+    fields = {field.name: field.value for field in embed.fields}
+    
+    assert fields['Cost Multiplier'] == '0.5x'
+    _, base_cost = next(iter(ADMIN_ACTIONS_COSTS.items()))
+    assert f"${int(base_cost * 0.5):,}" in fields['Action Costs'].splitlines()[0]
@@ -0,0 +1,77 @@
+import pytest
+
+from utils import rate_limit
+from utils.constants import RATE_LIMITS
+from utils.rate_limit import RateLimiter, TokenBucket
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(10, 60, now=0)
+    bucket.tokens = 0
+    assert bucket.retry_after() == pytest.approx(6)
+    
+    bucket.refill(30)
+    assert bucket.tokens == pytest.approx(5)
+    assert bucket.retry_after() == 0
+    assert bucket.retry_after(cost=7) == pytest.approx(12)
+    
+    bucket.refill(1000)
+    assert bucket.tokens == 10
+
+def test_token_bucket_ignores_time_going_backwards():
+    bucket = TokenBucket(10, 60, now=100)
+    bucket.tokens = 1
+    bucket.refill(50)
+    assert bucket.tokens == 1
+    assert bucket.updated == 100
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_standard_limit_rejects_then_recovers(monotonic):
+    limiter = RateLimiter()
+    allowed = RATE_LIMITS['commands_per_user_per_minute']
+    
+    for _ in range(allowed):
+        assert limiter.acquire('standard', 1, 100) == 0
+    retry_after = limiter.acquire('standard', 1, 100)
+    assert retry_after == pytest.approx(60 / allowed)
+    
+    # Other users have their own buckets
+    assert limiter.acquire('standard', 2, 100) == 0
+    
+    monotonic[0] += retry_after
+    assert limiter.acquire('standard', 1, 100) == 0
+
+def test_rejected_call_takes_no_tokens(monotonic):
+    limiter = RateLimiter()
+    for _ in range(RATE_LIMITS['expensive_commands_per_user_per_hour']):
+        assert limiter.acquire('expensive', 1, 100) == 0
+    
+    standard = limiter.buckets[('user_standard', 1)].tokens
+    assert limiter.acquire('expensive', 1, 100) > 0
+    assert limiter.buckets[('user_standard', 1)].tokens == standard
+
+def test_guild_expensive_limit_is_shared(monotonic):
+    limiter = RateLimiter()
+    for user_id in range(RATE_LIMITS['expensive_commands_per_guild_per_minute']):
+        assert limiter.acquire('expensive', user_id, 100) == 0
+    
+    assert limiter.acquire('expensive', 999, 100) > 0
+    assert limiter.acquire('expensive', 999, 200) == 0
+
+def test_idle_buckets_are_evicted(monotonic):
+    limiter = RateLimiter()
+    limiter.acquire('standard', 1, 100)
+    limiter.acquire('admin', 2, 100)
+    assert len(limiter.buckets) == 3
+    
+    monotonic[0] += 60
+    limiter.evict_idle()
+    assert set(limiter.buckets) == {('user_admin', 2)}
+    
+    monotonic[0] += 3600
+    limiter.evict_idle()
+    assert not limiter.buckets
@@ -0,0 +1,69 @@
+import numpy as np
+
+from utils.rng import RandomStreams
+
+GUILDS = [1, 2, 3, 10 ** 18, 42]
+
+def test_same_seed_same_draws():
+    first = RandomStreams(7).stream(1, 'events')
+    second = RandomStreams(7).stream(1, 'events')
+    assert [first.random() for _ in range(5)] == [second.random() for _ in range(5)]
+    
+    other = RandomStreams(8).stream(1, 'events')
+    assert RandomStreams(7).stream(1, 'events').random() != other.random()
+
+def test_streams_are_independent_of_other_draws():
+    quiet = RandomStreams(3)
+    busy = RandomStreams(3)
+    
+    # Draws for other guilds and purposes don't shift a stream
+    for guild_id in GUILDS:
+        busy.stream(guild_id, 'accrual').random()
+        busy.stream(guild_id, 'forecast').random()
+    
+    assert quiet.stream(1, 'events').random() == busy.stream(1, 'events').random()
+
+def test_purposes_and_guilds_differ():
+    streams = RandomStreams(3)
+    assert streams.stream(1, 'events').random() != streams.stream(1, 'accrual').random()
+    assert streams.stream(1, 'forecast').random() != streams.stream(2, 'forecast').random()
+
+def test_draw_ranges():
+    stream = RandomStreams(11).stream(5, 'events')
+    for _ in range(1000):
+        assert 0.0 <= stream.random() < 1.0
+        assert 2.5 <= stream.uniform(2.5, 3.0) < 3.0
+        assert -3 <= stream.randint(-3, 3) <= 3
+        assert stream.choice('abc') in 'abc'
+
+def test_batch_random_matches_scalar():
+    batch = RandomStreams(99)
+    scalar = RandomStreams(99)
+    
+    for _ in range(3):
+        drawn = batch.random(GUILDS, 'accrual')
+        expected = [scalar.stream(guild_id, 'accrual').random() for guild_id in GUILDS]
+        assert isinstance(drawn, np.ndarray)
+        assert drawn.tolist() == expected
+    
+    # Both advanced every stream by the same number of draws
+    assert batch.stream(2, 'accrual').counter == scalar.stream(2, 'accrual').counter == 3
+
+def test_batch_uniform_and_randint_match_scalar():
+    batch = RandomStreams(5)
+    scalar = RandomStreams(5)
+    
+    assert batch.uniform(GUILDS, 'accrual', -0.1, 0.1).tolist() == [
+        scalar.stream(guild_id, 'accrual').uniform(-0.1, 0.1) for guild_id in GUILDS
+    ]
+    assert batch.randint(GUILDS, 'events', 100, 500).tolist() == [
+        scalar.stream(guild_id, 'events').randint(100, 500) for guild_id in GUILDS
+    ]
+
+def test_batch_then_scalar_continues_the_stream():
+    mixed = RandomStreams(1)
+    scalar = RandomStreams(1)
+    
+    mixed.random([4], 'events')
+    scalar.stream(4, 'events').random()
+    assert mixed.stream(4, 'events').random() == scalar.stream(4, 'events').random()
@@ -0,0 +1,65 @@
+from collections import Counter
+
+from utils.scheduler import PhasedSchedule
+
+def test_phase_slot_is_stable_and_in_range():
+    schedule = PhasedSchedule('events', 300)
+    again = PhasedSchedule('events', 300)
+    for guild_id in range(200):
+        slot = schedule.phase_slot(guild_id)
+        assert 0 <= slot < 300
+        assert slot == again.phase_slot(guild_id)
+
+def test_slots_spread_guilds():
+    schedule = PhasedSchedule('accrual', 60)
+    schedule.sync(range(6000))
+    loads = Counter(schedule.guild_slots.values())
+    assert len(loads) == 60
+    assert max(loads.values()) < 2 * 6000 / 60
+
+def test_every_guild_is_due_once_per_interval():
+    schedule = PhasedSchedule('accrual', 60)
+    schedule.sync(range(500))
+    
+    schedule.due(now=999)
+    seen = Counter()
+    for second in range(1000, 1060):
+        seen.update(schedule.due(now=second))
+    
+    assert seen == Counter(range(500))
+
+def test_late_tick_replays_skipped_slots():
+    schedule = PhasedSchedule('accrual', 60)
+    schedule.sync(range(500))
+    schedule.due(now=999)
+    
+    # A tick 10 seconds late covers all 10 slots it missed
+    late = schedule.due(now=1009)
+    expected = [guild_id for guild_id, slot in schedule.guild_slots.items()
+                if slot in {second % 60 for second in range(1000, 1010)}]
+    assert sorted(late) == sorted(expected)
+    
+    # At most one interval is replayed after a long stall
+    assert sorted(schedule.due(now=5000)) == list(range(500))
+
+def test_rewind_makes_everything_due():
+    schedule = PhasedSchedule('events', 60)
+    schedule.sync([1, 2, 3])
+    schedule.due(now=100)
+    
+    schedule.rewind(now=100)
+    assert sorted(schedule.due(now=100)) == [1, 2, 3]
+
+def test_add_and_remove():
+    schedule = PhasedSchedule('events', 60)
+    schedule.add(7)
+    schedule.add(7)
+    assert sum(len(bucket) for bucket in schedule.buckets.values()) == 1
+    
+    schedule.rewind(now=0)
+    assert schedule.due(now=0) == [7]
+    
+    schedule.remove(7)
+    schedule.remove(7)
+    schedule.rewind(now=0)
+    assert schedule.due(now=0) == []
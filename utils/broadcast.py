@@ -0,0 +1,270 @@
+"""
+Resumable, rate-limited mass-message DM broadcasts
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+import aiohttp
+import discord
+
+from .constants import BROADCAST
+from .metrics import metrics
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+class BroadcastProgress:
+    """Delivery counts and the resumable checkpoint of one broadcast.
+    
+    Members are streamed in ascending id order but finish out of order
+    across workers. The checkpoint only advances past a member once every
+    member before it has been handled, so resuming from it never skips
+    anyone (a few members past it may receive the message twice).
+    """
+    
+    def __init__(self, broadcast: Dict):
+        self.broadcast = broadcast
+        self.sent = broadcast['sent']
+        self.failed = broadcast['failed']
+        self.checkpoint = broadcast['last_member_id']
+        self._order = deque()
+        self._handled = set()
+    
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+    
+    def queued(self, member_id: int):
+        self._order.append(member_id)
+    
+    def handled(self, member_id: int, delivered: bool):
+        if delivered:
+            self.sent += 1
+        else:
+            self.failed += 1
+        
+        self._handled.add(member_id)
+        while self._order and self._order[0] in self._handled:
+            self.checkpoint = self._order.popleft()
+            self._handled.discard(self.checkpoint)
+
+def progress_embed(progress: BroadcastProgress, done: bool = False) -> discord.Embed:
+    """Progress (or final summary) of a broadcast for the requesting admin."""
+    broadcast = progress.broadcast
+    total = max(broadcast['total_recipients'] or 0, progress.processed)
+    
+    embed = discord.Embed(
+        title="📢 Mass Message Delivered" if done else "📢 Mass Message In Progress",
+        color=0x00FF00 if done else 0xFFA500
+    )
+    embed.add_field(name="Delivered", value=f"{progress.sent:,}", inline=True)
+    embed.add_field(name="Failed", value=f"{progress.failed:,}", inline=True)
+    embed.add_field(name="Processed", value=f"{progress.processed:,} / ~{total:,}", inline=True)
+    embed.add_field(name="Cost", value=f"${broadcast['cost']:,}", inline=True)
+    if done:
+        embed.add_field(name="Refund", value=f"${broadcast['refund']:,}", inline=True)
+        embed.set_footer(text="Undelivered messages (closed DMs, errors) are refunded proportionally")
+    return embed
+
+ProgressCallback = Callable[[BroadcastProgress, bool], Awaitable[None]]
+
+class BroadcastManager:
+    """Runs mass-message broadcasts as background tasks.
+    
+    Recipients are streamed from the guild member list page by page
+    (never materialised as one list) into a bounded queue drained by a
+    small worker pool. All DMs share one token bucket, and progress is
+    checkpointed to the database so a restarted bot resumes where it
+    stopped. When a broadcast finishes, the share of the cost matching
+    undelivered messages is refunded.
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.dm_bucket = TokenBucket(BROADCAST['dms_per_second'], 1, time.monotonic())
+    
+    async def start(self, guild: discord.Guild, token: str, requested_by: int, message: str,
+                    report: Optional[ProgressCallback] = None) -> str:
+        """Pay for and launch a broadcast to every human member of a guild.
+        
+        The confirmation token is claimed in the same transaction that
+        records the broadcast, so the treasury is never charged for a
+        broadcast that doesn't exist. Returns the claim result; the
+        broadcast only runs when it is 'claimed'.
+        """
+        result, broadcast = await self.bot.db.claim_broadcast_start(
+            token, guild.id, requested_by, message,
+            guild.member_count or 0, self.bot.instance_id
+        )
+        if broadcast is not None:
+            self._launch(guild, broadcast, report)
+        return result
+    
+    async def resume_all(self):
+        """Resume unfinished broadcasts for guilds this process can see.
+        
+        Runs periodically, so broadcasts of a process that died without
+        releasing them are taken over once they go stale.
+        """
+        for broadcast in await self.bot.db.get_resumable_broadcasts():
+            guild = self.bot.get_guild(broadcast['guild_id'])
+            if guild is None or broadcast['id'] in self.tasks:
+                continue
+            if await self.bot.db.claim_broadcast(broadcast['id'], self.bot.instance_id,
+                                                 BROADCAST['stale_seconds']):
+                logger.info(f"Resuming broadcast {broadcast['id']} for guild {guild.id} "
+                            f"after member {broadcast['last_member_id']}")
+                self._launch(guild, broadcast, None)
+    
+    def _launch(self, guild: discord.Guild, broadcast: Dict, report: Optional[ProgressCallback]):
+        task = asyncio.create_task(self._run(guild, broadcast, report))
+        self.tasks[broadcast['id']] = task
+        task.add_done_callback(lambda _: self.tasks.pop(broadcast['id'], None))
+    
+    async def _run(self, guild: discord.Guild, broadcast: Dict, report: Optional[ProgressCallback]):
+        progress = BroadcastProgress(broadcast)
+        embed = discord.Embed(
+            title=f"📢 Message from {guild.name}",
+            description=broadcast['message'],
+            color=0x5865F2
+        )
+        embed.set_footer(text="Sent by the server administration")
+        
+        queue = asyncio.Queue(maxsize=BROADCAST['concurrency'] * 4)
+        workers = [
+            asyncio.create_task(self._worker(queue, progress, embed, report))
+            for _ in range(BROADCAST['concurrency'])
+        ]
+        
+        try:
+            after = discord.Object(id=broadcast['last_member_id'])
+            async for member in guild.fetch_members(limit=None, after=after):
+                if member.bot:
+                    continue
+                progress.queued(member.id)
+                await queue.put(member)
+            await queue.join()
+        except asyncio.CancelledError:
+            # Shutdown: keep the checkpoint so the next start resumes here
+            await asyncio.shield(self._checkpoint(progress))
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast['id']} stopped: {e}")
+            await self._checkpoint(progress)
+            return
+        finally:
+            for worker in workers:
+                worker.cancel()
+        
+        await self._finish(guild, progress, report)
+    
+    async def _worker(self, queue: asyncio.Queue, progress: BroadcastProgress,
+                      embed: discord.Embed, report: Optional[ProgressCallback]):
+        last_report = time.monotonic()
+        while True:
+            member = await queue.get()
+            try:
+                delivered = await self._send(member, embed)
+                progress.handled(member.id, delivered)
+                metrics.inc('broadcast_dms_total', result='sent' if delivered else 'failed')
+                
+                if progress.processed % BROADCAST['checkpoint_every'] == 0:
+                    await self._checkpoint(progress)
+                
+                now = time.monotonic()
+                if report and now - last_report >= BROADCAST['progress_seconds']:
+                    last_report = now
+                    await report(progress, False)
+            except Exception as e:
+                logger.error(f"Broadcast {progress.broadcast['id']} worker error: {e}")
+            finally:
+                queue.task_done()
+    
+    async def _send(self, member: discord.Member, embed: discord.Embed) -> bool:
+        """DM one member, retrying transient errors. Returns True if delivered."""
+        for attempt in range(BROADCAST['max_attempts']):
+            await self._take_token()
+            try:
+                await member.send(embed=embed)
+                return True
+            except discord.Forbidden:
+                return False  # DMs closed or bot blocked
+            except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                await asyncio.sleep(BROADCAST['retry_backoff_seconds'] * 2 ** attempt)
+        return False
+    
+    async def _take_token(self):
+        """Wait for the shared DM bucket."""
+        while True:
+            now = time.monotonic()
+            self.dm_bucket.refill(now)
+            wait = self.dm_bucket.retry_after()
+            if not wait:
+                self.dm_bucket.tokens -= 1
+                return
+            await asyncio.sleep(wait)
+    
+    async def _checkpoint(self, progress: BroadcastProgress):
+        try:
+            await self.bot.db.save_broadcast_progress(
+                progress.broadcast['id'], progress.checkpoint, progress.sent, progress.failed
+            )
+        except Exception as e:
+            logger.error(f"Failed to checkpoint broadcast {progress.broadcast['id']}: {e}")
+    
+    async def _finish(self, guild: discord.Guild, progress: BroadcastProgress,
+                      report: Optional[ProgressCallback]):
+        """Record the outcome, refund undelivered messages and report to the admin."""
+        broadcast = progress.broadcast
+        if progress.processed:
+            refund = broadcast['cost'] * progress.failed // progress.processed
+        else:
+            refund = broadcast['cost']  # Nobody to message
+        broadcast['refund'] = refund
+        
+        finished = await self.bot.db.finish_broadcast(
+            broadcast['id'], progress.checkpoint, progress.sent, progress.failed, refund
+        )
+        if not finished:
+            return
+        
+        await self.bot.db.log_admin_action(
+            guild_id=guild.id,
+            user_id=broadcast['requested_by'],
+            action_type='mass_message',
+            cost=broadcast['cost'] - refund,
+            description=(f"Mass message delivered to {progress.sent} of {progress.processed} "
+                         f"members (refunded ${refund:,})"),
+            success=True
+        )
+        logger.info(f"Broadcast {broadcast['id']} finished: {progress.sent} sent, "
+                    f"{progress.failed} failed, refund {refund}")
+        
+        summary = progress_embed(progress, done=True)
+        if report:
+            await report(progress, True)
+        
+        requester = guild.get_member(broadcast['requested_by'])
+        if requester:
+            try:
+                await requester.send(embed=summary)
+            except discord.HTTPException:
+                pass
+    
+    async def close(self):
+        """Stop running broadcasts; their checkpoints let them resume on restart."""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # The next process has a new instance id, so hand the broadcasts over explicitly
+        try:
+            await self.bot.db.release_broadcasts(self.bot.instance_id)
+        except Exception as e:
+            logger.error(f"Failed to release broadcasts: {e}")
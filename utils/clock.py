@@ -0,0 +1,85 @@
+"""
+Injectable clock shared by the engine, database, scheduler and cogs
+"""
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional, Union
+
+# Same layout as SQLite's CURRENT_TIMESTAMP, so new rows sort with existing ones
+DB_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+class Clock(ABC):
+    """Source of the current time as naive local datetimes, like datetime.now()."""
+    
+    @abstractmethod
+    def now(self) -> datetime:
+        """Current time."""
+    
+    def timestamp(self) -> float:
+        """Current time as a Unix timestamp, like time.time()."""
+        return self.now().timestamp()
+
+class RealClock(Clock):
+    """Wall-clock time."""
+    
+    def now(self) -> datetime:
+        return datetime.now()
+    
+    def timestamp(self) -> float:
+        return time.time()
+
+class FixedClock(Clock):
+    """Time that stands still until advanced, for tests and stepped simulations."""
+    
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = start or datetime.now()
+    
+    def now(self) -> datetime:
+        return self._now
+    
+    def advance(self, delta: Union[timedelta, float]):
+        """Move forward by a timedelta or a number of seconds."""
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        self._now += delta
+    
+    def set(self, moment: datetime):
+        self._now = moment
+
+class AcceleratedClock(Clock):
+    """Time that runs `speed` times faster than the wall clock from a starting point."""
+    
+    def __init__(self, speed: float, start: Optional[datetime] = None):
+        self.speed = speed
+        self._start = start or datetime.now()
+        self._real_start = time.monotonic()
+    
+    def now(self) -> datetime:
+        elapsed = (time.monotonic() - self._real_start) * self.speed
+        return self._start + timedelta(seconds=elapsed)
+
+_clock: Clock = RealClock()
+
+def get_clock() -> Clock:
+    """The clock currently in use."""
+    return _clock
+
+def set_clock(clock: Clock) -> Clock:
+    """Replace the clock used everywhere. Returns the previous one so it can be restored."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+def now() -> datetime:
+    """Current time according to the active clock."""
+    return _clock.now()
+
+def timestamp() -> float:
+    """Current Unix timestamp according to the active clock."""
+    return _clock.timestamp()
+
+def db_timestamp(moment: Optional[datetime] = None) -> str:
+    """A time (default: now) formatted for the TIMESTAMP columns."""
+    return (moment or _clock.now()).strftime(DB_TIMESTAMP_FORMAT)
@@ -170,6 +170,13 @@ PASSIVE_INCOME = {
     "min_multiplier": 0.1   # Minimum multiplier from economic status
 }
 
+# Startup catch-up for accrual missed while the bot was offline
+CATCH_UP = {
+    "enabled": True,
+    "max_hours": 24,        # Never credit more than this much downtime
+    "min_gap_minutes": 30   # Shorter gaps are left to the regular updater
+}
+
 # Real-time update intervals
 UPDATE_INTERVALS = {
     "treasury_update_seconds": 30,     # How often treasury updates
@@ -178,6 +185,19 @@ UPDATE_INTERVALS = {
     "status_check_hours": 2            # How often to recalculate economic status
 }
 
+# Background job leases (coordinates multiple bot processes on one database)
+JOB_LEASES = {
+    "ttl_seconds": 90,                   # Lease expires if not renewed within this window
+    "heartbeat_seconds": 30,             # How often held leases are renewed
+    "partitions": 8,                     # Guild ranges per job (guild_id % partitions)
+    "max_partitions_per_instance": None  # Cap per process to spread work when scaling out
+}
+
+# Tick spreading: each guild gets a stable slot within its job's interval
+TICK_SPREAD = {
+    "slot_seconds": 1       # Loop granularity; guilds are spread over interval / slot_seconds slots
+}
+
 # Chart configuration
 CHART_CONFIG = {
     "default_history_hours": 24,
@@ -200,6 +220,61 @@ PERMISSIONS = {
     }
 }
 
+# Time-bounded effects of boosts and emergency actions (keyed like ADMIN_ACTIONS_COSTS)
+ACTION_MODIFIERS = {
+    "server_boost_economic": {"modifier": "income", "value": 1.15, "hours": 6},
+    "server_boost_stability": {"modifier": "event_protection", "value": 1.0, "hours": 12},
+    "emergency_stabilize": {"modifier": "status_protection", "value": 1.0, "hours": 24},
+    "emergency_stimulus": {"modifier": "income", "value": 1.25, "hours": 12}
+}
+
+# Active modifier maintenance
+MODIFIERS = {
+    "maintenance_seconds": 60   # Prune expired modifiers and load ones added by other processes
+}
+
+# Petition voting
+PETITIONS = {
+    "duration_hours": 48,           # Petitions close if the threshold isn't reached in time
+    "flush_seconds": 5,             # Buffered support votes are written in one batch this often
+    "embed_edit_seconds": 15,       # Minimum gap between supporter count edits of one petition
+    "stimulus_amount": 10000,
+    "lower_costs_multiplier": 0.75,
+    "lower_costs_hours": 168,
+    "increase_income_multiplier": 1.5,
+    "increase_income_hours": 72,
+    "trade_review_hours": 24        # Trade policy changes are free for this long
+}
+
+# Petition types members can start (required supporters are in PERMISSIONS)
+PETITION_TYPES = {
+    "lower_costs": {
+        "name": "Lower Administrative Costs",
+        "description": "Petition to reduce the cost of administrative actions by 25% for one week.",
+        "effect": "Reduced admin costs for 1 week"
+    },
+    "increase_income": {
+        "name": "Increase Passive Income",
+        "description": "Petition to temporarily increase passive income generation by 50% for 3 days.",
+        "effect": "+50% passive income for 3 days"
+    },
+    "stimulus": {
+        "name": "Economic Stimulus Request",
+        "description": "Petition for a one-time economic stimulus package.",
+        "effect": "One-time treasury injection of $10,000"
+    },
+    "trade_review": {
+        "name": "Trade Policy Review",
+        "description": "Petition for a review and potential adjustment of current trade policy.",
+        "effect": "Allows immediate trade policy change"
+    }
+}
+
+# Cooldown cache ("no cooldown" answers are re-checked against the DB after this)
+COOLDOWN_CACHE = {
+    "negative_ttl_seconds": 30
+}
+
 # Economic event probabilities by status
 EVENT_PROBABILITIES = {
     "Economic Crash": {
@@ -239,7 +314,11 @@ DATABASE_CONFIG = {
     "db_name": "economic_bot.db",
     "backup_interval_hours": 24,
     "cleanup_old_data_days": 30,
-    "max_history_entries": 10000
+    "max_history_entries": 10000,
+    "read_pool_size": 4,        # Read-only connections shared by all queries
+    "max_write_batch": 64,      # Queued mutations grouped into one writer commit
+    "busy_timeout_ms": 5000,    # Wait for locks held by other processes
+    "economy_cache_ttl_seconds": 60  # Re-read cached economies after this (None = never)
 }
 
 # Logging configuration
@@ -255,7 +334,86 @@ LOGGING_CONFIG = {
 RATE_LIMITS = {
     "commands_per_user_per_minute": 10,
     "expensive_commands_per_user_per_hour": 5,
-    "admin_commands_per_user_per_hour": 20
+    "admin_commands_per_user_per_hour": 20,
+    "expensive_commands_per_guild_per_minute": 20,
+    "sweep_interval_seconds": 60   # How often fully refilled (idle) buckets are dropped
+}
+
+# Outbound message dispatcher (paces bot-initiated channel messages)
+DISPATCHER = {
+    "workers": 4,                   # Concurrent senders
+    "global_per_second": 40,        # Stay under Discord's global limit of 50/s
+    "channel_burst": 5,             # Messages per channel per period
+    "channel_period_seconds": 5,
+    "coalesce_window_seconds": 2,   # Notifications for one guild within this window share a message
+    "max_attempts": 5,
+    "backoff_base_seconds": 1,
+    "backoff_max_seconds": 60,
+    "bucket_sweep_seconds": 60,
+    "drain_seconds": 5              # How long shutdown waits for queued messages
+}
+
+# Mass-message DM broadcasts
+BROADCAST = {
+    "concurrency": 4,               # DM workers per broadcast
+    "dms_per_second": 2,            # Shared by all broadcasts in this process
+    "checkpoint_every": 25,         # Persist progress after this many DMs
+    "progress_seconds": 10,         # How often the admin's progress message is refreshed
+    "max_attempts": 3,
+    "retry_backoff_seconds": 2,
+    "stale_seconds": 120            # A broadcast not checkpointed this long can be taken over
+}
+
+# Single-use confirmation tokens
+PENDING_ACTIONS = {
+    "ttl_seconds": 90,              # Slightly longer than the 60 second confirmation views
+    "retention_hours": 24           # Expired tokens are deleted after this long
+}
+
+# Prometheus metrics endpoint (METRICS_HOST / METRICS_PORT override these)
+METRICS = {
+    "enabled": True,
+    "host": "127.0.0.1",            # Local only; put a proxy in front to expose it
+    "port": 9108,
+    "path": "/metrics"
+}
+
+# Event loop lag monitoring
+LOOP_MONITOR = {
+    "enabled": True,
+    "interval_seconds": 0.25,       # How often lag is sampled (and the watchdog checks in)
+    "block_threshold_seconds": 0.5  # A loop stuck this long has its stack captured
+}
+
+# Opt-in memory diagnostics (MEMORY_DIAGNOSTICS=1 enables them); SIGUSR1 writes a snapshot on demand
+MEMORY_DIAGNOSTICS = {
+    "enabled": False,               # Tracing allocations costs CPU and memory; leave off normally
+    "snapshot_interval_minutes": 30,
+    "directory": "memory_snapshots",
+    "keep_snapshots": 48,           # Older snapshot files are deleted
+    "tracemalloc_frames": 5,        # Stack depth recorded per allocation
+    "top_allocators": 15,
+    "top_types": 20
+}
+
+# Master seed of the per-guild random streams (RNG_SEED overrides it; None draws a fresh seed per run)
+RNG = {
+    "seed": None
+}
+
+# Per-stage tracing of commands and background jobs
+TRACING = {
+    "sample_rate": 1.0,             # Fraction of commands and ticks traced (0 disables tracing)
+    "slow_command_seconds": 2.0     # Traced commands slower than this are logged with a stage breakdown
+}
+
+# Rate limit cost class per slash command; admin commands not listed here
+# default to "admin", everything else to "standard"
+COMMAND_COST_CLASSES = {
+    "treasury": "expensive",
+    "forecast": "expensive",
+    "economic-status": "expensive",
+    "trade-policy": "expensive"
 }
 
 # Feature flags
@@ -275,6 +433,8 @@ ERROR_MESSAGES = {
     "insufficient_funds": "❌ Insufficient treasury funds to complete this action.",
     "permission_denied": "❌ You don't have permission to use this command.",
     "cooldown_active": "⏰ This command is on cooldown. Try again later.",
+    "action_used": "❌ This action has already been confirmed or cancelled.",
+    "action_expired": "❌ This confirmation has expired. Run the command again.",
     "invalid_input": "❌ Invalid input provided. Please check your parameters.",
     "database_error": "❌ A database error occurred. Please try again later.",
     "general_error": "❌ An unexpected error occurred. Please contact an administrator."
@@ -0,0 +1,112 @@
+"""
+Persisted per-user cooldowns with an in-memory TTL cache
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from . import clock
+from .constants import COOLDOWN_CACHE
+from .metrics import metrics
+
+CooldownKey = Tuple[int, int]  # (guild_id, user_id)
+
+class CooldownStore:
+    """Cooldowns for one action, shared across restarts and processes.
+    
+    The database is the source of truth; starting a cooldown is an atomic
+    claim there, so two processes can't both let the same user through.
+    An in-memory cache answers repeat lookups without a query. Active
+    cooldowns are cached until they expire; "no cooldown" answers are
+    cached briefly so other processes' claims are noticed. Expired entries
+    are evicted in expiry order from a heap, so the cache only ever holds
+    users who used the action recently.
+    """
+    
+    def __init__(self, db, action: str, duration: timedelta):
+        self.db = db
+        self.action = action
+        self.duration = duration
+        self._expiries: Dict[CooldownKey, datetime] = {}
+        self._valid_until: Dict[CooldownKey, datetime] = {}
+        self._heap: List[Tuple[datetime, CooldownKey]] = []
+    
+    def _cache(self, key: CooldownKey, expires_at: Optional[datetime], now: datetime):
+        """Remember a lookup result until it can no longer be trusted."""
+        if expires_at and expires_at > now:
+            valid_until = expires_at
+        else:
+            valid_until = now + timedelta(seconds=COOLDOWN_CACHE['negative_ttl_seconds'])
+            expires_at = None
+        
+        self._expiries[key] = expires_at
+        self._valid_until[key] = valid_until
+        heapq.heappush(self._heap, (valid_until, key))
+    
+    def _evict(self, now: datetime):
+        """Drop cache entries whose validity has passed."""
+        while self._heap and self._heap[0][0] <= now:
+            valid_until, key = heapq.heappop(self._heap)
+            # A key re-cached later has a newer heap entry; only drop the current one
+            if self._valid_until.get(key) == valid_until:
+                del self._valid_until[key]
+                del self._expiries[key]
+    
+    async def remaining(self, guild_id: int, user_id: int) -> Optional[timedelta]:
+        """Time left on a user's cooldown, or None if the action is available."""
+        now = clock.now()
+        self._evict(now)
+        key = (guild_id, user_id)
+        
+        if key in self._valid_until:
+            metrics.inc('cooldown_cache_hits', action=self.action)
+            expires_at = self._expiries[key]
+        else:
+            metrics.inc('cooldown_cache_misses', action=self.action)
+            expires_at = await self.db.get_cooldown(self.action, guild_id, user_id)
+            self._cache(key, expires_at, now)
+        
+        if expires_at and expires_at > now:
+            return expires_at - now
+        return None
+    
+    async def try_start(self, guild_id: int, user_id: int) -> Optional[timedelta]:
+        """Start the cooldown if it isn't running.
+        
+        Returns None when the action may proceed, otherwise the time left.
+        """
+        remaining = await self.remaining(guild_id, user_id)
+        if remaining:
+            return remaining
+        
+        now = clock.now()
+        key = (guild_id, user_id)
+        existing = await self.db.claim_cooldown(
+            self.action, guild_id, user_id, now + self.duration
+        )
+        if existing:
+            # Another process started it since our cached lookup
+            self._cache(key, existing, now)
+            return max(existing - now, timedelta(seconds=1))
+        
+        self._cache(key, now + self.duration, now)
+        return None
+    
+    async def release(self, guild_id: int, user_id: int):
+        """Undo a cooldown this store just started, when the action it guarded failed.
+        
+        Only the claim made by try_start is removed; a cooldown started
+        since by another process stays.
+        """
+        key = (guild_id, user_id)
+        expires_at = self._expiries.get(key)
+        if expires_at is None:
+            return
+        
+        await self.db.release_cooldown(self.action, guild_id, user_id, expires_at)
+        del self._expiries[key]
+        del self._valid_until[key]
+    
+    def __len__(self) -> int:
+        return len(self._valid_until)
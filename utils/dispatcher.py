@@ -0,0 +1,244 @@
+"""
+Rate-limit-aware outbound message queue
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+from . import clock
+from .constants import DISPATCHER, EMBED_LIMITS
+from .metrics import metrics
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Lower values are sent first. Interaction replies never pass through here:
+# they go out on the interaction webhook, whose limits these buckets don't share.
+PRIORITY_EVENT = 2
+
+class OutboundMessage:
+    """One queued message (possibly several coalesced notifications)."""
+    
+    __slots__ = ('channel', 'content', 'embeds', 'priority', 'coalesce_key', 'attempts', 'enqueued_at')
+    
+    def __init__(self, channel, content: Optional[str], embeds: List[discord.Embed],
+                 priority: int, coalesce_key=None):
+        self.channel = channel
+        self.content = content
+        self.embeds = embeds
+        self.priority = priority
+        self.coalesce_key = coalesce_key
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+def coalesce_embeds(embeds: List[discord.Embed]) -> discord.Embed:
+    """Fold several notification embeds into one digest embed."""
+    digest = discord.Embed(
+        title=f"📰 {len(embeds)} Economic Updates",
+        color=embeds[0].color,
+        timestamp=clock.now()
+    )
+    
+    for embed in embeds[:EMBED_LIMITS['max_fields']]:
+        details = [embed.description or ""]
+        details.extend(f"**{field.name}:** {field.value}" for field in embed.fields)
+        value = "\n".join(detail for detail in details if detail) or "\u200b"
+        digest.add_field(
+            name=(embed.title or "Update")[:EMBED_LIMITS['field_name_max']],
+            value=value[:EMBED_LIMITS['field_value_max']],
+            inline=False
+        )
+    
+    digest.set_footer(text="Economic Event System")
+    return digest
+
+class MessageDispatcher:
+    """Sends channel messages from a priority queue, within Discord's rate limits.
+    
+    Producers call enqueue() and return immediately; a few worker tasks do
+    the sending. Every send takes a token from a global bucket and from its
+    channel's bucket, so a burst of announcements is paced instead of
+    stalling the caller on 429s. A message whose channel is out of tokens
+    is parked until the bucket refills and never blocks other channels.
+    Failed sends are retried with exponential backoff. Notifications with a
+    coalesce key (the guild id for event announcements) that are still
+    queued are merged, and sent as one digest embed.
+    """
+    
+    def __init__(self, on_undeliverable: Optional[Callable] = None):
+        self.on_undeliverable = on_undeliverable
+        self._ready: List[Tuple[int, int, OutboundMessage]] = []        # (priority, seq, message)
+        self._delayed: List[Tuple[float, int, OutboundMessage]] = []    # (not_before, seq, message)
+        self._coalescing: Dict[object, OutboundMessage] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._in_flight = 0
+        
+        now = time.monotonic()
+        self.global_bucket = TokenBucket(DISPATCHER['global_per_second'], 1, now)
+        self.channel_buckets: Dict[int, TokenBucket] = {}
+        self._last_sweep = now
+    
+    def start(self):
+        """Start the worker tasks (requires a running event loop)."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(DISPATCHER['workers'])
+            ]
+    
+    def __len__(self) -> int:
+        return len(self._ready) + len(self._delayed) + self._in_flight
+    
+    def enqueue(self, channel, content: Optional[str] = None, embed: Optional[discord.Embed] = None,
+                priority: int = PRIORITY_EVENT, coalesce_key=None):
+        """Queue a message for sending and return immediately."""
+        if coalesce_key is not None and embed is not None:
+            pending = self._coalescing.get(coalesce_key)
+            if pending is not None and pending.channel.id == channel.id and content is None:
+                pending.embeds.append(embed)
+                pending.priority = min(pending.priority, priority)
+                metrics.inc('dispatcher_coalesced_total')
+                return
+        
+        message = OutboundMessage(channel, content, [embed] if embed else [], priority, coalesce_key)
+        if coalesce_key is not None:
+            self._coalescing[coalesce_key] = message
+            # Hold briefly so notifications arriving together go out as one
+            self._defer(message, time.monotonic() + DISPATCHER['coalesce_window_seconds'])
+        else:
+            heapq.heappush(self._ready, (priority, next(self._sequence), message))
+            self._wakeup.set()
+        
+        metrics.set_gauge('dispatcher_queue_depth', len(self))
+    
+    def _defer(self, message: OutboundMessage, not_before: float):
+        heapq.heappush(self._delayed, (not_before, next(self._sequence), message))
+        self._wakeup.set()
+    
+    def _promote(self, now: float):
+        """Move parked messages whose time has come to the ready queue."""
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, message = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready, (message.priority, next(self._sequence), message))
+    
+    def _channel_bucket(self, channel_id: int, now: float) -> TokenBucket:
+        bucket = self.channel_buckets.get(channel_id)
+        if bucket is None:
+            bucket = self.channel_buckets[channel_id] = TokenBucket(
+                DISPATCHER['channel_burst'], DISPATCHER['channel_period_seconds'], now
+            )
+        else:
+            bucket.refill(now)
+        return bucket
+    
+    def _sweep_buckets(self, now: float):
+        """Drop channel buckets that have refilled completely."""
+        for channel_id, bucket in list(self.channel_buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self.channel_buckets[channel_id]
+        self._last_sweep = now
+    
+    async def _next_message(self) -> OutboundMessage:
+        """Wait for the highest-priority message that may be sent now."""
+        while True:
+            now = time.monotonic()
+            if now - self._last_sweep >= DISPATCHER['bucket_sweep_seconds']:
+                self._sweep_buckets(now)
+            self._promote(now)
+            
+            if self._ready:
+                _, _, message = heapq.heappop(self._ready)
+                
+                wait = self._channel_bucket(message.channel.id, now).retry_after()
+                if wait:
+                    # Park it; other channels keep flowing
+                    self._defer(message, now + wait)
+                    continue
+                
+                self.global_bucket.refill(now)
+                wait = self.global_bucket.retry_after()
+                if wait:
+                    heapq.heappush(self._ready, (message.priority, next(self._sequence), message))
+                    await asyncio.sleep(wait)
+                    continue
+                
+                self.global_bucket.tokens -= 1
+                self.channel_buckets[message.channel.id].tokens -= 1
+                if self._coalescing.get(message.coalesce_key) is message:
+                    del self._coalescing[message.coalesce_key]
+                return message
+            
+            timeout = self._delayed[0][0] - now if self._delayed else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _worker(self):
+        while True:
+            message = await self._next_message()
+            self._in_flight += 1
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                # A malformed message must not take a worker down with it
+                metrics.inc('dispatcher_errors_total')
+                logger.error(f"Error delivering message to channel {message.channel.id}: {e}")
+            finally:
+                self._in_flight -= 1
+                metrics.set_gauge('dispatcher_queue_depth', len(self))
+    
+    async def _deliver(self, message: OutboundMessage):
+        """Send one message, scheduling a retry on transient failures."""
+        if len(message.embeds) > 1:
+            embeds = [coalesce_embeds(message.embeds)]
+        else:
+            embeds = message.embeds
+        
+        try:
+            await message.channel.send(content=message.content, embeds=embeds)
+            metrics.inc('dispatcher_sent_total', priority=message.priority)
+            metrics.observe('dispatcher_delivery_seconds', time.monotonic() - message.enqueued_at)
+        except (discord.Forbidden, discord.NotFound) as e:
+            # Retrying can't help; let the owner re-resolve the channel
+            metrics.inc('dispatcher_dropped_total', reason='undeliverable')
+            logger.warning(f"Dropping message to channel {message.channel.id}: {e}")
+            if self.on_undeliverable:
+                self.on_undeliverable(message.channel)
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            message.attempts += 1
+            if message.attempts >= DISPATCHER['max_attempts']:
+                metrics.inc('dispatcher_dropped_total', reason='retries_exhausted')
+                logger.error(f"Giving up on message to channel {message.channel.id}: {e}")
+                return
+            
+            backoff = min(
+                DISPATCHER['backoff_base_seconds'] * 2 ** (message.attempts - 1),
+                DISPATCHER['backoff_max_seconds']
+            )
+            metrics.inc('dispatcher_retries_total')
+            self._defer(message, time.monotonic() + backoff)
+    
+    async def close(self):
+        """Give queued messages a short chance to go out, then stop the workers."""
+        deadline = time.monotonic() + DISPATCHER['drain_seconds']
+        while len(self) and self._workers and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        
+        if len(self):
+            logger.warning(f"Discarding {len(self)} unsent messages on shutdown")
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -6,9 +6,10 @@ import discord
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from . import clock
 from .constants import (
     BOT_COLOR, ECONOMIC_STATUS_COLORS, TRADE_POLICY_COLORS,
-    ECONOMIC_STATUS, TRADE_POLICIES, ADMIN_ACTIONS_COSTS
+    ECONOMIC_STATUS, TRADE_POLICIES, ADMIN_ACTIONS_COSTS, PETITION_TYPES
 )
 
 class EconomicEmbeds:
@@ -24,7 +25,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title=f"🏛️ {guild_name} - Treasury Status",
             color=status_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         # Main treasury info
@@ -63,7 +64,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title="🔮 24-Hour Economic Forecast",
             color=self.bot_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         # Current vs predicted
@@ -117,7 +118,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title="📊 Economic Status Report",
             color=status_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         # Main status info
@@ -178,7 +179,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title=f"📈 Treasury History - Last {hours} Hours",
             color=self.bot_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         if not history:
@@ -229,19 +230,21 @@ class EconomicEmbeds:
         
         return embed
     
-    def create_admin_costs_embed(self, economy: Dict[str, Any]) -> discord.Embed:
-        """Create an embed showing administrative action costs."""
+    def create_admin_costs_embed(self, economy: Dict[str, Any], engine, guild_id: int) -> discord.Embed:
+        """Create an embed showing administrative action costs.
+        
+        Costs come from the bot's economic engine, so they include the guild's
+        active action cost modifiers exactly as the admin commands charge them.
+        """
         embed = discord.Embed(
             title="💼 Administrative Action Costs",
             description="Cost of administrative actions based on current economic status",
             color=self.bot_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         # Get cost multiplier
-        from ..economic_engine import EconomicEngine
-        engine = EconomicEngine(None)  # We only need the method, not the database
-        cost_multiplier = engine.get_action_cost_multiplier(economy['economic_status'])
+        cost_multiplier = engine.get_action_cost_multiplier(economy['economic_status'], guild_id)
         
         embed.add_field(
             name="Current Economic Status",
@@ -276,7 +279,7 @@ class EconomicEmbeds:
             inline=False
         )
         
-        embed.set_footer(text="Costs vary based on economic status • ✅ = Affordable")
+        embed.set_footer(text="Costs vary with economic status and active modifiers • ✅ = Affordable")
         
         return embed
     
@@ -285,7 +288,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title=f"📋 {guild_name} - Administrative Action History",
             color=self.bot_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         if not actions:
@@ -344,7 +347,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title="🌐 Trade Policy Status",
             color=policy_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         embed.add_field(
@@ -402,7 +405,7 @@ class EconomicEmbeds:
         embed = discord.Embed(
             title=f"📰 {guild_name} - Recent Economic Events",
             color=self.bot_color,
-            timestamp=datetime.now()
+            timestamp=clock.now()
         )
         
         if not events:
@@ -464,6 +467,40 @@ class EconomicEmbeds:
         
         return embed
     
+    def create_petition_embed(self, petition: Dict[str, Any]) -> discord.Embed:
+        """Create an embed for a petition and its current support."""
+        info = PETITION_TYPES[petition['petition_type']]
+        status = petition['status']
+        
+        colors = {
+            'open': self.bot_color,
+            'passed': 0x32CD32,
+            'expired': 0x808080
+        }
+        
+        embed = discord.Embed(
+            title=f"📋 Economic Petition: {info['name']}",
+            description=info['description'],
+            color=colors.get(status, self.bot_color)
+        )
+        embed.add_field(name="Required Supporters", value=str(petition['required_supporters']), inline=True)
+        embed.add_field(name="Current Supporters", value=str(petition['supporters']), inline=True)
+        embed.add_field(name="Effect", value=info['effect'], inline=False)
+        embed.add_field(name="Started by", value=f"<@{petition['started_by']}>", inline=True)
+        
+        if status == 'passed':
+            embed.add_field(name="Status", value="✅ Passed - effect applied", inline=True)
+            embed.set_footer(text="This petition has passed")
+        elif status == 'expired':
+            embed.add_field(name="Status", value="⌛ Expired", inline=True)
+            embed.set_footer(text="This petition did not reach enough supporters in time")
+        else:
+            expires_at = datetime.fromisoformat(petition['expires_at'])
+            embed.add_field(name="Closes", value=f"<t:{int(expires_at.timestamp())}:R>", inline=True)
+            embed.set_footer(text="Click Support to back this petition")
+        
+        return embed
+    
     def get_status_emoji(self, status: str) -> str:
         """Get emoji representation for economic status."""
         status_emojis = {
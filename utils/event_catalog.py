@@ -0,0 +1,273 @@
+"""
+Compiled economic event catalog with alias-method sampling
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .constants import EVENT_PROBABILITIES
+
+# Random economic events by type. Treasury impacts are (min, max) ranges
+# sampled on every trigger; 'probability' weights events within their type.
+EVENT_DEFINITIONS = {
+    'positive': [
+        {
+            'name': 'Foreign Investment Surge',
+            'description': 'International investors have shown significant interest in the economy, bringing in substantial capital.',
+            'impact_range': (3000, 8000),
+            'probability': 0.15
+        },
+        {
+            'name': 'Technological Breakthrough',
+            'description': 'A major technological innovation has been developed, boosting productivity across sectors.',
+            'impact_range': (2000, 6000),
+            'status_impact': None,
+            'probability': 0.12
+        },
+        {
+            'name': 'Export Boom',
+            'description': 'International demand for domestic products has skyrocketed, boosting export revenues.',
+            'impact_range': (4000, 10000),
+            'probability': 0.13
+        },
+        {
+            'name': 'Resource Discovery',
+            'description': 'New valuable natural resources have been discovered, attracting mining investments.',
+            'impact_range': (5000, 12000),
+            'probability': 0.08
+        },
+        {
+            'name': 'Tourism Surge',
+            'description': 'A viral social media campaign has attracted millions of tourists, boosting the service sector.',
+            'impact_range': (2500, 7000),
+            'probability': 0.14
+        },
+        {
+            'name': 'Infrastructure Grant',
+            'description': 'International development organizations have approved major infrastructure funding.',
+            'impact_range': (6000, 15000),
+            'probability': 0.06
+        }
+    ],
+    
+    'negative': [
+        {
+            'name': 'Market Crash',
+            'description': 'Sudden market volatility has caused widespread panic selling and economic uncertainty.',
+            'impact_range': (-8000, -3000),
+            'status_impact': 'Economic Recession',
+            'probability': 0.12
+        },
+        {
+            'name': 'Natural Disaster',
+            'description': 'A severe natural disaster has damaged critical infrastructure and disrupted economic activity.',
+            'impact_range': (-10000, -5000),
+            'probability': 0.10
+        },
+        {
+            'name': 'Trade War',
+            'description': 'International trade disputes have resulted in tariffs and reduced export opportunities.',
+            'impact_range': (-6000, -2000),
+            'probability': 0.11
+        },
+        {
+            'name': 'Banking Crisis',
+            'description': 'Major financial institutions are facing liquidity problems, affecting business loans.',
+            'impact_range': (-7000, -3000),
+            'status_impact': 'Economic Stagnation',
+            'probability': 0.09
+        },
+        {
+            'name': 'Energy Crisis',
+            'description': 'Sudden spike in energy prices has increased operational costs across all sectors.',
+            'impact_range': (-5000, -1500),
+            'probability': 0.13
+        },
+        {
+            'name': 'Labor Strike',
+            'description': 'Widespread labor strikes have disrupted production and transportation networks.',
+            'impact_range': (-4000, -1000),
+            'probability': 0.14
+        },
+        {
+            'name': 'Cyber Attack',
+            'description': 'A major cyber attack has disrupted financial systems and e-commerce platforms.',
+            'impact_range': (-6000, -2500),
+            'probability': 0.08
+        }
+    ],
+    
+    'neutral': [
+        {
+            'name': 'Policy Announcement',
+            'description': 'Government has announced new economic policies that are receiving mixed reactions.',
+            'impact_range': (-1000, 1000),
+            'probability': 0.18
+        },
+        {
+            'name': 'Currency Fluctuation',
+            'description': 'The national currency has experienced moderate fluctuations against major currencies.',
+            'impact_range': (-2000, 2000),
+            'probability': 0.16
+        },
+        {
+            'name': 'Market Speculation',
+            'description': 'Investors are speculating about future market conditions, causing minor volatility.',
+            'impact_range': (-1500, 1500),
+            'probability': 0.15
+        }
+    ]
+}
+
+# Selection weights for statuses missing from EVENT_PROBABILITIES
+DEFAULT_STATUS = "Stable Growth"
+
+CatalogEntry = Tuple[str, Dict]  # (event_type, event definition)
+
+class AliasTable:
+    """Walker/Vose alias table for O(1) sampling from a fixed distribution.
+    
+    Built once in O(n); each draw then costs one uniform column pick and
+    one biased coin flip, both taken from a single uniform, however many
+    outcomes there are.
+    """
+    
+    __slots__ = ('size', 'prob', 'alias', '_arrays')
+    
+    def __init__(self, weights: Sequence[float]):
+        total = float(sum(weights))
+        self.size = len(weights)
+        scaled = [weight * self.size / total for weight in weights]
+        self.prob = [1.0] * self.size
+        self.alias = list(range(self.size))
+        self._arrays = None
+        
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Leftovers are 1.0 up to rounding error and keep prob 1.0
+    
+    def sample(self, rng) -> int:
+        """Draw one outcome index from a single uniform of a random stream (as sample_uniforms does)."""
+        scaled = rng.random() * self.size
+        column = min(int(scaled), self.size - 1)
+        return column if scaled - column < self.prob[column] else self.alias[column]
+    
+    def sample_uniforms(self, uniforms) -> List[int]:
+        """One outcome index per pre-drawn uniform in [0, 1) (a numpy array).
+        
+        The integer part of u * size picks the column and the fraction is
+        the coin flip, so each outcome costs a single draw.
+        """
+        import numpy as np
+        
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.prob), np.asarray(self.alias))
+        prob, alias = self._arrays
+        
+        scaled = np.asarray(uniforms) * self.size
+        columns = np.minimum(scaled.astype(np.int64), self.size - 1)
+        accepted = (scaled - columns) < prob[columns]
+        return np.where(accepted, columns, alias[columns]).tolist()
+
+class EventCatalog:
+    """Event definitions compiled into alias tables.
+    
+    There is one table per economic status, combining the status's
+    positive/negative/neutral odds from EVENT_PROBABILITIES with each
+    event's own probability, plus a variant without negative events for
+    guilds under a stability boost and one table per event type for
+    forced events.
+    """
+    
+    def __init__(self, definitions: Dict[str, List[Dict]] = None,
+                 probabilities: Dict[str, Dict[str, float]] = None):
+        self.definitions = definitions or EVENT_DEFINITIONS
+        probabilities = probabilities or EVENT_PROBABILITIES
+        
+        self.tables: Dict[Tuple[str, bool], Tuple[List[CatalogEntry], AliasTable]] = {}
+        for status, type_weights in probabilities.items():
+            self.tables[(status, False)] = self._compile(type_weights)
+            self.tables[(status, True)] = self._compile(
+                {event_type: weight for event_type, weight in type_weights.items()
+                 if event_type != 'negative'}
+            )
+        
+        self.type_tables = {
+            event_type: self._compile({event_type: 1.0})
+            for event_type in self.definitions
+        }
+    
+    def _compile(self, type_weights: Dict[str, float]) -> Tuple[List[CatalogEntry], AliasTable]:
+        entries: List[CatalogEntry] = []
+        weights: List[float] = []
+        for event_type, type_weight in type_weights.items():
+            events = self.definitions.get(event_type, [])
+            type_total = sum(event['probability'] for event in events)
+            if not type_weight or not type_total:
+                continue
+            for event in events:
+                entries.append((event_type, event))
+                weights.append(type_weight * event['probability'] / type_total)
+        return entries, AliasTable(weights)
+    
+    def _table(self, status: str, protected: bool) -> Tuple[List[CatalogEntry], AliasTable]:
+        return self.tables.get((status, protected)) or self.tables[(DEFAULT_STATUS, protected)]
+    
+    def pick(self, status: str, protected: bool = False, *, rng) -> CatalogEntry:
+        """Pick an event for a guild in the given status with the guild's stream."""
+        entries, table = self._table(status, protected)
+        return entries[table.sample(rng)]
+    
+    def pick_type(self, event_type: str, rng) -> CatalogEntry:
+        """Pick an event of one type (e.g. a forced positive event)."""
+        entries, table = self.type_tables[event_type]
+        return entries[table.sample(rng)]
+    
+    def pick_many(self, keys: Sequence[Tuple[str, bool]], uniforms) -> List[CatalogEntry]:
+        """Pick one event per (status, protected) key.
+        
+        `uniforms` holds one pre-drawn value per key (from RandomStreams.random),
+        so each pick depends only on its own guild's stream. Keys sharing a
+        table are sampled together in one vectorized step, so the cost is a
+        handful of numpy calls per tick rather than a Python-level draw per
+        guild.
+        """
+        import numpy as np
+        
+        uniforms = np.asarray(uniforms)
+        if len(uniforms) != len(keys):
+            raise ValueError(f"Expected {len(keys)} uniforms, got {len(uniforms)}")
+        
+        groups: Dict[Tuple[str, bool], List[int]] = {}
+        for position, (status, protected) in enumerate(keys):
+            if (status, protected) not in self.tables:
+                status = DEFAULT_STATUS
+            groups.setdefault((status, protected), []).append(position)
+        
+        picks: List[Optional[CatalogEntry]] = [None] * len(keys)
+        for key, positions in groups.items():
+            entries, table = self.tables[key]
+            indices = table.sample_uniforms(uniforms[positions])
+            for position, index in zip(positions, indices):
+                picks[position] = entries[index]
+        return picks
+    
+    def roll_impact(self, event: Dict, rng) -> int:
+        """Sample a fresh treasury impact from the event's range."""
+        low, high = event['impact_range']
+        return rng.randint(low, high)
+    
+    def event_data(self, event_type: str, event: Dict, rng) -> Dict:
+        """The event_data dict EconomicEngine.apply_economic_event expects, with a rolled impact."""
+        return {
+            'type': event_type,
+            'name': event['name'],
+            'description': event['description'],
+            'treasury_impact': self.roll_impact(event, rng),
+            'status_impact': event.get('status_impact')
+        }
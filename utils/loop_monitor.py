@@ -0,0 +1,115 @@
+"""
+Event loop lag monitor and blocking-call detector
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .constants import LOOP_MONITOR
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+def _blocking_site(stack: List[traceback.FrameSummary]) -> str:
+    """Innermost frame of our own code (falls back to the innermost frame)."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and 'site-packages' not in frame.filename:
+            relative = os.path.relpath(frame.filename, PROJECT_ROOT)
+            return f"{relative}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+class LoopMonitor:
+    """Measures event loop scheduling lag and catches whatever blocks it.
+    
+    A task on the loop sleeps for a fixed interval and records how late it
+    wakes up. A watchdog thread checks that task's heartbeat; when the loop
+    has been stuck longer than the threshold, it captures the loop thread's
+    current stack, which points at the blocking call while it is still
+    running. The stack is logged at once (so a hang that never ends is
+    still visible) and counted per blocking site once the loop recovers.
+    """
+    
+    def __init__(self):
+        self.interval = LOOP_MONITOR['interval_seconds']
+        self.threshold = LOOP_MONITOR['block_threshold_seconds']
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._captured: Optional[Tuple[str, List[str]]] = None  # (site, stack) of the current stall
+    
+    def start(self):
+        """Start the monitor task and watchdog thread (requires a running loop)."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._monitor())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+    
+    async def _monitor(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            
+            metrics.observe('event_loop_lag_seconds', lag)
+            metrics.set_gauge('event_loop_lag_last_seconds', lag)
+            
+            with self._lock:
+                captured, self._captured = self._captured, None
+            if captured is not None:
+                site, _ = captured
+                metrics.inc('event_loop_blocked_total', site=site)
+                metrics.observe('event_loop_blocked_seconds', lag, site=site)
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms at {site}")
+    
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack while it is stuck."""
+        while not self._stopping.wait(self.interval):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold:
+                continue
+            
+            with self._lock:
+                if self._captured is not None:
+                    continue  # Already captured this stall
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                site = _blocking_site(stack)
+                formatted = traceback.format_list(stack)
+                self._captured = (site, formatted)
+
+            logger.warning(
+                f"Event loop blocked for {stalled * 1000:.0f} ms so far at {site}; "
+                f"loop thread stack:\n{''.join(formatted)}"
+            )
+    
+    async def close(self):
+        """Stop the monitor task and the watchdog thread."""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
@@ -0,0 +1,203 @@
+"""
+Memory diagnostics: top allocators, object counts and cache sizes
+"""
+
+import asyncio
+import gc
+import json
+import logging
+import os
+import signal
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from . import clock
+from .constants import MEMORY_DIAGNOSTICS
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SizeSource = Callable[[], Union[int, Dict[str, int]]]
+
+# Allocations made by the profiler and these reports themselves
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<unknown>')
+)
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None where /proc isn't available)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def object_counts(top: int) -> List[Tuple[str, int]]:
+    """The most common object types among gc-tracked objects."""
+    counts = Counter()
+    for obj in gc.get_objects():
+        kind = type(obj)
+        module = kind.__module__
+        counts[kind.__qualname__ if module == 'builtins' else f"{module}.{kind.__qualname__}"] += 1
+    return counts.most_common(top)
+
+def _site(stat) -> str:
+    frame = stat.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+class MemoryDiagnostics:
+    """Reports where memory goes as guild counts and history grow.
+    
+    Components register a callable returning their entry counts, so one
+    report covers every bot-owned cache and queue next to the gc object
+    counts by type and, while tracing is on, tracemalloc's top allocation
+    sites and their growth since tracing started. Snapshots are written
+    periodically and on SIGUSR1 as JSON reports plus raw tracemalloc
+    dumps for offline diffing. Building a report walks every object, so
+    it briefly blocks the event loop; it is meant for diagnosis, not for
+    leaving on.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or MEMORY_DIAGNOSTICS['directory'])
+        self.sources: Dict[str, SizeSource] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._task: Optional[asyncio.Task] = None
+        self._signal_installed = False
+    
+    def register(self, name: str, source: SizeSource):
+        """Report a component's size: a count, or a dict of named counts."""
+        self.sources[name] = source
+    
+    def cache_sizes(self) -> Dict[str, int]:
+        """Current entry count of every registered cache and queue."""
+        sizes = {}
+        for name, source in self.sources.items():
+            try:
+                value = source()
+            except Exception as e:
+                logger.warning(f"Memory source {name} failed: {e}")
+                continue
+            if isinstance(value, dict):
+                sizes.update({f"{name}.{key}": count for key, count in value.items()})
+            else:
+                sizes[name] = value
+        return sizes
+    
+    def start(self):
+        """Start tracing allocations, periodic snapshots and the SIGUSR1 handler."""
+        if self._task is not None:
+            return
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_DIAGNOSTICS['tracemalloc_frames'])
+            self._started_tracing = True
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        
+        self._task = asyncio.create_task(self._snapshot_loop())
+        
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, lambda: asyncio.create_task(self.write_snapshot()))
+            self._signal_installed = True
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            logger.info("SIGUSR1 memory snapshots are not available on this platform")
+        
+        logger.info(f"Memory diagnostics enabled; snapshots go to {self.directory.resolve()}")
+    
+    def report(self) -> Tuple[Dict, Optional[tracemalloc.Snapshot]]:
+        """Build a report. Also returns the tracemalloc snapshot it used, if tracing."""
+        top = MEMORY_DIAGNOSTICS['top_allocators']
+        report = {
+            'time': clock.now().isoformat(),
+            'rss_bytes': rss_bytes(),
+            'caches': self.cache_sizes(),
+            'object_types': dict(object_counts(MEMORY_DIAGNOSTICS['top_types'])),
+            'gc_counts': list(gc.get_count())
+        }
+        
+        snapshot = None
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+            report['tracemalloc'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top_allocators': [
+                    {'site': _site(stat), 'size_bytes': stat.size, 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:top]
+                ]
+            }
+            if self._baseline is not None:
+                report['tracemalloc']['growth_since_start'] = [
+                    {'site': _site(stat), 'size_diff_bytes': stat.size_diff,
+                     'count_diff': stat.count_diff}
+                    for stat in snapshot.compare_to(self._baseline, 'lineno')[:top]
+                ]
+        
+        return report, snapshot
+    
+    async def write_snapshot(self) -> Tuple[Path, Dict]:
+        """Write a report (and the raw tracemalloc snapshot) to the snapshot directory.
+        
+        Returns the report's path and the report.
+        """
+        report, snapshot = self.report()
+        
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"memory-{clock.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        if snapshot is not None:
+            snapshot.dump(str(path.with_suffix('.tracemalloc')))
+        self._prune()
+        
+        if report['rss_bytes'] is not None:
+            metrics.set_gauge('memory_rss_bytes', report['rss_bytes'])
+        if 'tracemalloc' in report:
+            metrics.set_gauge('memory_traced_bytes', report['tracemalloc']['current_bytes'])
+        for cache, size in report['caches'].items():
+            metrics.set_gauge('memory_cache_entries', size, cache=cache)
+        
+        logger.info(f"Wrote memory snapshot {path}")
+        return path, report
+    
+    def _prune(self):
+        """Delete all but the newest keep_snapshots snapshots."""
+        reports = sorted(self.directory.glob('memory-*.json'))
+        for old in reports[:-MEMORY_DIAGNOSTICS['keep_snapshots']]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.tracemalloc').unlink(missing_ok=True)
+    
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(MEMORY_DIAGNOSTICS['snapshot_interval_minutes'] * 60)
+            try:
+                await self.write_snapshot()
+            except Exception as e:
+                logger.error(f"Memory snapshot failed: {e}")
+    
+    async def close(self):
+        """Stop snapshots and tracing."""
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+            self._signal_installed = False
+        
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._baseline = None
@@ -0,0 +1,198 @@
+"""
+In-process metrics registry for the economic bot
+"""
+
+import bisect
+import functools
+import inspect
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Any
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Default histogram buckets (seconds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+class Histogram:
+    """Bucketed distribution of observed values."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+    
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += value
+
+class MetricsRegistry:
+    """Collects counters, gauges and histograms keyed by metric name and labels."""
+    
+    def __init__(self):
+        self.counters: Dict[LabelKey, float] = defaultdict(float)
+        self.gauges: Dict[LabelKey, float] = {}
+        self.histograms: Dict[LabelKey, Histogram] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter."""
+        self.counters[_key(name, labels)] += value
+    
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to its current value."""
+        self.gauges[_key(name, labels)] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        """Record a value in a histogram."""
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+    
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe how long a block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def get(self, name: str, **labels) -> float:
+        """Read a counter or gauge (0 if it was never recorded)."""
+        key = _key(name, labels)
+        if key in self.gauges:
+            return self.gauges[key]
+        return self.counters.get(key, 0)
+    
+    def render(self) -> str:
+        """Everything recorded so far, in the Prometheus text exposition format."""
+        lines = []
+        
+        for kind, series in (('counter', self.counters), ('gauge', self.gauges)):
+            typed = set()
+            for (name, labels), value in sorted(series.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        
+        typed = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', str(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        
+        return "\n".join(lines) + "\n"
+
+def instrument_methods(metric: str):
+    """Class decorator timing every public coroutine method.
+    
+    Each call is observed in the histogram `metric` labelled with the
+    method name, and recorded as a span of the current trace; calls that
+    raise also count towards `<metric>_errors_total`.
+    """
+    def decorate(cls):
+        for attr, function in list(vars(cls).items()):
+            if attr.startswith('_') or not inspect.iscoroutinefunction(function):
+                continue
+            setattr(cls, attr, _timed_coroutine(function, metric, attr))
+        return cls
+    
+    return decorate
+
+def _timed_coroutine(function, metric: str, method: str):
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with span(method):
+                return await function(*args, **kwargs)
+        except Exception:
+            metrics.inc(f'{metric}_errors_total', method=method)
+            raise
+        finally:
+            metrics.observe(metric, time.perf_counter() - start, method=method)
+    
+    return wrapper
+
+class MetricsServer:
+    """Serves the registry over HTTP for Prometheus to scrape.
+    
+    Binds to localhost by default; the endpoint is read-only and cheap,
+    rendering the registry on each request.
+    """
+    
+    def __init__(self, registry: MetricsRegistry, host: str, port: int, path: str = '/metrics'):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self._runner = None
+    
+    async def start(self):
+        """Start listening. A busy port is logged rather than raised."""
+        # aiohttp.web is only needed when the endpoint is enabled
+        from aiohttp import web
+        
+        async def handle(request):
+            return web.Response(
+                text=self.registry.render(),
+                content_type='text/plain',
+                charset='utf-8',
+                headers={'X-Prometheus-Format': '0.0.4'}
+            )
+        
+        app = web.Application()
+        app.router.add_get(self.path, handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            logger.error(f"Metrics endpoint unavailable on {self.host}:{self.port}: {e}")
+            await runner.cleanup()
+            return
+        
+        self._runner = runner
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}{self.path}")
+    
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+# Shared registry used across the bot
+metrics = MetricsRegistry()
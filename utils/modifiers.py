@@ -0,0 +1,85 @@
+"""
+In-memory registry of active time-bounded economic modifiers
+"""
+
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from . import clock
+from .metrics import metrics
+
+ModifierKey = Tuple[int, str]  # (guild_id, modifier_type)
+
+class ModifierRegistry:
+    """Active modifiers per guild and type, ordered by expiry.
+    
+    Multiplicative modifiers ('income', 'action_cost', 'trade_policy_cost')
+    are combined into one cached product per guild and type, and flag
+    modifiers ('event_protection', 'status_protection') are answered by
+    presence, so lookups are O(1). Expiries sit in a min-heap; each lookup
+    pops whatever has expired, which costs nothing while the earliest
+    expiry is still in the future.
+    """
+    
+    def __init__(self):
+        self._modifiers: Dict[ModifierKey, Dict[int, Dict]] = {}
+        self._products: Dict[ModifierKey, float] = {}
+        self._heap: List[Tuple[datetime, int, ModifierKey]] = []
+    
+    def add(self, modifier: Dict):
+        """Register an active modifier (a guild_modifiers row)."""
+        expires_at = modifier['expires_at']
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        
+        key = (modifier['guild_id'], modifier['modifier_type'])
+        active = self._modifiers.setdefault(key, {})
+        if modifier['id'] in active:
+            return
+        active[modifier['id']] = dict(modifier, expires_at=expires_at)
+        heapq.heappush(self._heap, (expires_at, modifier['id'], key))
+        self._recompute(key)
+        metrics.set_gauge('active_modifiers', len(self._heap))
+    
+    def _recompute(self, key: ModifierKey):
+        active = self._modifiers.get(key)
+        if not active:
+            self._modifiers.pop(key, None)
+            self._products.pop(key, None)
+            return
+        
+        product = 1.0
+        for modifier in active.values():
+            product *= modifier['value']
+        self._products[key] = product
+    
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop expired modifiers. Returns how many were removed."""
+        if now is None:
+            now = clock.now()
+        
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, modifier_id, key = heapq.heappop(self._heap)
+            active = self._modifiers.get(key)
+            if active and active.pop(modifier_id, None) is not None:
+                removed += 1
+                self._recompute(key)
+        
+        if removed:
+            metrics.set_gauge('active_modifiers', len(self._heap))
+        return removed
+    
+    def multiplier(self, guild_id: int, modifier_type: str) -> float:
+        """Combined multiplier of a guild's active modifiers of one type."""
+        self.prune()
+        return self._products.get((guild_id, modifier_type), 1.0)
+    
+    def is_active(self, guild_id: int, modifier_type: str) -> bool:
+        """Whether a guild has any active modifier of one type."""
+        self.prune()
+        return (guild_id, modifier_type) in self._products
+    
+    def __len__(self) -> int:
+        return sum(len(active) for active in self._modifiers.values())
@@ -0,0 +1,84 @@
+"""
+Per-guild notification channel resolution
+"""
+
+from typing import Dict, Optional
+
+import discord
+
+from .metrics import metrics
+
+class NotificationChannelResolver:
+    """Finds the channel economic announcements go to, once per guild.
+    
+    An admin-configured channel (persisted with the guild's economy) wins
+    if the bot can post there; otherwise the first postable channel named
+    like 'economy', then 'general', then any postable text channel. The
+    answer, including "no usable channel", is cached until a channel or
+    role change in the guild invalidates it, so sending never scans
+    channels or discovers missing permissions at send time.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._channels: Dict[int, Optional[int]] = {}
+    
+    @staticmethod
+    def can_post(channel) -> bool:
+        """Whether the bot can send embeds in a channel."""
+        if not isinstance(channel, discord.TextChannel):
+            return False
+        permissions = channel.permissions_for(channel.guild.me)
+        return permissions.view_channel and permissions.send_messages and permissions.embed_links
+    
+    async def resolve(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """The channel to announce in, or None if the bot can't post anywhere."""
+        if guild.id in self._channels:
+            channel_id = self._channels[guild.id]
+            if channel_id is None:
+                metrics.inc('notification_channel_cache_hits')
+                return None
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                metrics.inc('notification_channel_cache_hits')
+                return channel
+        
+        metrics.inc('notification_channel_cache_misses')
+        channel = await self._find(guild)
+        self._channels[guild.id] = channel.id if channel else None
+        return channel
+    
+    async def _find(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        economy = await self.db.get_guild_economy(guild.id)
+        configured = economy.get('notification_channel_id')
+        if configured:
+            channel = guild.get_channel(configured)
+            if channel is not None and self.can_post(channel):
+                return channel
+        
+        economy_channel = general_channel = fallback = None
+        for channel in guild.text_channels:
+            if not self.can_post(channel):
+                continue
+            name = channel.name.lower()
+            if 'economy' in name:
+                economy_channel = channel
+                break
+            if 'general' in name and general_channel is None:
+                general_channel = channel
+            if fallback is None:
+                fallback = channel
+        
+        return economy_channel or general_channel or fallback
+    
+    async def set_channel(self, guild_id: int, channel_id: Optional[int]):
+        """Persist an admin's choice (None returns to automatic selection)."""
+        await self.db.set_notification_channel(guild_id, channel_id)
+        self.invalidate(guild_id)
+    
+    def invalidate(self, guild_id: int):
+        """Forget a guild's resolved channel so the next send re-resolves it."""
+        self._channels.pop(guild_id, None)
+    
+    def __len__(self) -> int:
+        return len(self._channels)
@@ -0,0 +1,143 @@
+"""
+Token-bucket rate limiting for slash commands
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from .constants import RATE_LIMITS, COMMAND_COST_CLASSES
+from .metrics import metrics
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` tokens, refilled continuously."""
+    
+    __slots__ = ('capacity', 'refill_rate', 'tokens', 'updated')
+    
+    def __init__(self, capacity: float, period_seconds: float, now: float):
+        self.capacity = capacity
+        self.refill_rate = capacity / period_seconds
+        self.tokens = capacity
+        self.updated = now
+    
+    def refill(self, now: float):
+        """Add the tokens earned since the last update."""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated = now
+    
+    def retry_after(self, cost: float = 1) -> float:
+        """Seconds until `cost` tokens are available (0 if they are now)."""
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.refill_rate
+
+class RateLimited(app_commands.CheckFailure):
+    """Raised by the rate limit check when a bucket is empty."""
+    
+    def __init__(self, retry_after: float, cost_class: str):
+        self.retry_after = retry_after
+        self.cost_class = cost_class
+        super().__init__(f"Rate limited ({cost_class}), retry in {retry_after:.1f}s")
+
+class RateLimiter:
+    """Per-user and per-guild token buckets keyed by cost class.
+
+    Every command draws from the user's general bucket; expensive and admin
+    commands also draw from their own per-user bucket, and expensive ones
+    from a per-guild bucket. Tokens are only taken if every bucket has one,
+    so a rejected call costs nothing. A bucket that has refilled completely
+    is indistinguishable from a new one, so idle buckets are dropped in a
+    periodic sweep and memory stays proportional to active users.
+    """
+    
+    def __init__(self):
+        # limit name -> (capacity, period in seconds)
+        self.limits: Dict[str, Tuple[float, float]] = {
+            'user_standard': (RATE_LIMITS['commands_per_user_per_minute'], 60),
+            'user_expensive': (RATE_LIMITS['expensive_commands_per_user_per_hour'], 3600),
+            'user_admin': (RATE_LIMITS['admin_commands_per_user_per_hour'], 3600),
+            'guild_expensive': (RATE_LIMITS['expensive_commands_per_guild_per_minute'], 60)
+        }
+        self.buckets: Dict[Tuple[str, int], TokenBucket] = {}
+        self._last_sweep = time.monotonic()
+    
+    def cost_class(self, command) -> str:
+        """Cost class for a command: configured, else admin/standard by its permissions."""
+        configured = COMMAND_COST_CLASSES.get(command.qualified_name)
+        if configured:
+            return configured
+        
+        permissions = command.default_permissions
+        if permissions is not None and permissions.administrator:
+            return 'admin'
+        return 'standard'
+    
+    def _bucket(self, limit: str, key: int, now: float) -> TokenBucket:
+        bucket = self.buckets.get((limit, key))
+        if bucket is None:
+            capacity, period = self.limits[limit]
+            bucket = self.buckets[(limit, key)] = TokenBucket(capacity, period, now)
+        else:
+            bucket.refill(now)
+        return bucket
+    
+    def acquire(self, cost_class: str, user_id: int, guild_id: Optional[int]) -> float:
+        """Take a token from every bucket that applies.
+
+        Returns 0 on success, otherwise the seconds until the call would be allowed.
+        """
+        now = time.monotonic()
+        if now - self._last_sweep >= RATE_LIMITS['sweep_interval_seconds']:
+            self.evict_idle(now)
+        
+        checks = [('user_standard', user_id)]
+        if cost_class in ('expensive', 'admin'):
+            checks.append((f'user_{cost_class}', user_id))
+        if cost_class == 'expensive' and guild_id is not None:
+            checks.append(('guild_expensive', guild_id))
+        
+        buckets = [(limit, self._bucket(limit, key, now)) for limit, key in checks]
+        
+        retry_after = 0.0
+        for limit, bucket in buckets:
+            wait = bucket.retry_after()
+            if wait > 0:
+                metrics.inc('rate_limit_rejections_total', limit=limit, cost_class=cost_class)
+                retry_after = max(retry_after, wait)
+        
+        if retry_after:
+            return retry_after
+        
+        for _, bucket in buckets:
+            bucket.tokens -= 1
+        return 0.0
+    
+    def evict_idle(self, now: Optional[float] = None):
+        """Drop buckets that have refilled completely."""
+        if now is None:
+            now = time.monotonic()
+        
+        idle = []
+        for key, bucket in self.buckets.items():
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                idle.append(key)
+        for key in idle:
+            del self.buckets[key]
+        
+        self._last_sweep = now
+        metrics.set_gauge('rate_limit_active_buckets', len(self.buckets))
+
+async def rate_limit_check(interaction: discord.Interaction) -> bool:
+    """App command check enforcing the bot's rate limits."""
+    limiter = interaction.client.rate_limiter
+    cost_class = limiter.cost_class(interaction.command)
+    
+    retry_after = limiter.acquire(cost_class, interaction.user.id, interaction.guild_id)
+    if retry_after:
+        raise RateLimited(retry_after, cost_class)
+    return True
@@ -0,0 +1,131 @@
+"""
+Seeded, per-guild random streams
+"""
+
+import os
+import zlib
+from typing import Dict, Optional, Sequence, Tuple
+
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+def _mix(value: int) -> int:
+    """SplitMix64 finalizer: a well-distributed 64-bit hash of a 64-bit value."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+class GuildStream:
+    """One guild's random stream for one purpose.
+    
+    Draw n is a hash of the stream key and n, so a stream depends only on
+    the master seed, the guild and how many draws it has made, never on
+    what other guilds or purposes drew in between. Offers the subset of
+    the random module's interface the bot uses.
+    """
+    
+    __slots__ = ('key', 'counter')
+    
+    def __init__(self, key: int):
+        self.key = key
+        self.counter = 0
+    
+    def _next(self) -> int:
+        self.counter += 1
+        return _mix((self.key + self.counter * _GOLDEN) & _MASK)
+    
+    def random(self) -> float:
+        """Uniform float in [0, 1)."""
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+    
+    def uniform(self, low: float, high: float) -> float:
+        return low + (high - low) * self.random()
+    
+    def randint(self, low: int, high: int) -> int:
+        """Uniform integer in [low, high], both inclusive."""
+        return low + int(self.random() * (high - low + 1))
+    
+    def choice(self, seq: Sequence):
+        return seq[int(self.random() * len(seq))]
+
+class RandomStreams:
+    """Independent streams per (guild, purpose), derived from one master seed.
+    
+    Purposes ('accrual', 'events', ...) keep streams apart, so e.g. running
+    a forecast doesn't shift the draws a guild's accrual will see next. The
+    batch methods draw once from each of many guilds' streams in a few
+    vectorized numpy operations, producing exactly what the same scalar
+    calls would have.
+    """
+    
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'little')
+        self.seed = seed & _MASK
+        # purpose -> (purpose key, guild_id -> stream)
+        self._purposes: Dict[str, Tuple[int, Dict[int, GuildStream]]] = {}
+    
+    def _purpose(self, purpose: str) -> Tuple[int, Dict[int, GuildStream]]:
+        entry = self._purposes.get(purpose)
+        if entry is None:
+            key = _mix(self.seed ^ _mix(zlib.crc32(purpose.encode())))
+            entry = self._purposes[purpose] = (key, {})
+        return entry
+    
+    def stream(self, guild_id: int, purpose: str) -> GuildStream:
+        """The stream for one guild and purpose."""
+        purpose_key, streams = self._purpose(purpose)
+        stream = streams.get(guild_id)
+        if stream is None:
+            stream = streams[guild_id] = GuildStream(_mix(purpose_key ^ (guild_id & _MASK)))
+        return stream
+    
+    def random(self, guild_ids: Sequence[int], purpose: str):
+        """One uniform float in [0, 1) from each guild's stream, as a numpy array."""
+        import numpy as np
+        
+        _, streams = self._purpose(purpose)
+        keys = []
+        counters = []
+        for guild_id in guild_ids:
+            stream = streams.get(guild_id) or self.stream(guild_id, purpose)
+            stream.counter += 1
+            keys.append(stream.key)
+            counters.append(stream.counter)
+        
+        # The same SplitMix64 steps as GuildStream, wrapping in uint64
+        value = np.array(keys, np.uint64) + np.array(counters, np.uint64) * np.uint64(_GOLDEN)
+        value = (value ^ (value >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        value = (value ^ (value >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        value ^= value >> np.uint64(31)
+        return (value >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+    
+    def uniform(self, guild_ids: Sequence[int], purpose: str, low: float, high: float):
+        """One uniform float in [low, high) per guild."""
+        return low + (high - low) * self.random(guild_ids, purpose)
+    
+    def randint(self, guild_ids: Sequence[int], purpose: str, low: int, high: int):
+        """One integer in [low, high] (inclusive) per guild."""
+        import numpy as np
+        
+        draws = self.random(guild_ids, purpose) * (high - low + 1)
+        return low + draws.astype(np.int64)
+    
+    def __len__(self) -> int:
+        return sum(len(streams) for _, streams in self._purposes.values())
+
+_streams = RandomStreams()
+
+def get_streams() -> RandomStreams:
+    """The streams currently in use."""
+    return _streams
+
+def seed(master_seed: Optional[int] = None) -> RandomStreams:
+    """Restart every stream from a master seed (None: a random one)."""
+    global _streams
+    _streams = RandomStreams(master_seed)
+    return _streams
+
+def for_guild(guild_id: int, purpose: str) -> GuildStream:
+    """The active stream for one guild and purpose."""
+    return _streams.stream(guild_id, purpose)
@@ -0,0 +1,106 @@
+"""
+Phase-spread scheduling for per-guild background work
+"""
+
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import clock
+from .metrics import metrics
+from .tracing import trace
+
+class PhasedSchedule:
+    """Spreads one job's per-guild work evenly across its interval.
+    
+    Each guild gets a stable, hash-based slot within the interval. The job
+    loop ticks once per slot and only processes the guilds whose slot has
+    come up, so every guild is still handled once per interval but the
+    work no longer lands on the same instant.
+    """
+    
+    def __init__(self, job_name: str, interval_seconds: int, slot_seconds: int = 1):
+        self.job_name = job_name
+        self.slot_seconds = slot_seconds
+        self.slot_count = max(1, int(interval_seconds // slot_seconds))
+        self.buckets: Dict[int, Set[int]] = {}
+        self.guild_slots: Dict[int, int] = {}
+        self._last_tick: Optional[int] = None
+    
+    def phase_slot(self, guild_id: int) -> int:
+        """Stable slot for a guild (identical across processes and restarts)."""
+        return zlib.crc32(f"{self.job_name}:{guild_id}".encode()) % self.slot_count
+    
+    def add(self, guild_id: int):
+        """Start scheduling a guild."""
+        if guild_id in self.guild_slots:
+            return
+        slot = self.phase_slot(guild_id)
+        self.guild_slots[guild_id] = slot
+        self.buckets.setdefault(slot, set()).add(guild_id)
+    
+    def remove(self, guild_id: int):
+        """Stop scheduling a guild."""
+        slot = self.guild_slots.pop(guild_id, None)
+        if slot is not None:
+            self.buckets[slot].discard(guild_id)
+    
+    def sync(self, guild_ids: Iterable[int]):
+        """Replace the scheduled guilds (e.g. after a reconnect)."""
+        self.buckets = {}
+        self.guild_slots = {}
+        for guild_id in guild_ids:
+            self.add(guild_id)
+        
+        loads = [len(self.buckets.get(slot, ())) for slot in range(self.slot_count)]
+        metrics.set_gauge('tick_slot_load_max', max(loads), job=self.job_name)
+        metrics.set_gauge('tick_slot_load_mean', sum(loads) / len(loads), job=self.job_name)
+    
+    def rewind(self, now: Optional[float] = None):
+        """Make every scheduled guild due on the next due() call."""
+        if now is None:
+            now = clock.timestamp()
+        self._last_tick = int(now // self.slot_seconds) - self.slot_count
+    
+    def due(self, now: Optional[float] = None) -> List[int]:
+        """Return the guild ids whose slots have come up since the last call.
+        
+        Slots skipped by a late or overrunning tick are included, so no guild
+        misses its turn; at most one full interval is replayed.
+        """
+        if now is None:
+            now = clock.timestamp()
+        
+        tick = int(now // self.slot_seconds)
+        if self._last_tick is None:
+            self._last_tick = tick - 1
+        
+        elapsed = min(tick - self._last_tick, self.slot_count)
+        self._last_tick = tick
+        
+        due_ids = []
+        for offset in range(elapsed):
+            due_ids.extend(self.buckets.get((tick - offset) % self.slot_count, ()))
+        
+        per_second = len(due_ids) / (max(elapsed, 1) * self.slot_seconds)
+        metrics.set_gauge('tick_guilds_per_second', per_second, job=self.job_name)
+        metrics.inc('tick_guilds_total', len(due_ids), job=self.job_name)
+        
+        return due_ids
+    
+    @contextmanager
+    def timed_tick(self):
+        """Record how long one tick of the job takes and whether it overran its slot.
+        
+        Sampled ticks are also traced; one that overruns is logged with its stages.
+        """
+        start = time.perf_counter()
+        try:
+            with trace(self.job_name, self.slot_seconds):
+                yield
+        finally:
+            duration = time.perf_counter() - start
+            metrics.observe('tick_duration_seconds', duration, job=self.job_name)
+            if duration > self.slot_seconds:
+                metrics.inc('tick_overruns_total', job=self.job_name)
@@ -0,0 +1,44 @@
+"""
+Startup timing profile for the economic bot
+"""
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+class StageTiming:
+    """Duration of one profiled stage (filled in when the stage ends)."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+
+class StartupProfile:
+    """Records how long each startup stage (imports, cog loads, warm-up) takes."""
+    
+    def __init__(self):
+        self.process_start = time.perf_counter()
+        self.timings: List[Tuple[str, float]] = []
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block and record it under the given name."""
+        timing = StageTiming(name)
+        start = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.seconds = time.perf_counter() - start
+            self.timings.append((name, timing.seconds))
+    
+    def elapsed(self) -> float:
+        """Seconds since the profile was created (process start)."""
+        return time.perf_counter() - self.process_start
+    
+    def summary(self) -> str:
+        """One-line summary, slowest stages first."""
+        stages = sorted(self.timings, key=lambda timing: timing[1], reverse=True)
+        return " | ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in stages)
+
+# Shared profile; main.py imports this before anything heavy
+startup_profile = StartupProfile()
@@ -0,0 +1,148 @@
+"""
+Lightweight tracing of slash commands and background jobs
+"""
+
+import functools
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from .constants import TRACING
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """One timed stage; a span without a parent is the root of a trace."""
+    
+    __slots__ = ('name', 'start', 'duration', 'children', 'attributes')
+    
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List['Span'] = []
+        self.attributes = attributes
+    
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+    
+    def stages(self) -> List[Dict]:
+        """Every nested span, depth first, with offsets from this span's start."""
+        flattened = []
+        
+        def walk(span: 'Span', depth: int):
+            for child in span.children:
+                flattened.append({
+                    'stage': child.name,
+                    'depth': depth,
+                    'offset_ms': round((child.start - self.start) * 1000, 1),
+                    'duration_ms': round((child.duration or 0) * 1000, 1)
+                })
+                walk(child, depth + 1)
+        
+        walk(self, 0)
+        return flattened
+
+# Innermost open span of the running task; None when the task isn't traced
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+class span:
+    """Time a stage of the current trace: `with span('render chart'):`.
+    
+    Costs one context variable lookup when the task isn't being traced.
+    Tasks started inside a span inherit it, so concurrent work shows up as
+    sibling stages.
+    """
+    
+    __slots__ = ('name', '_span', '_token')
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._span = None
+    
+    def __enter__(self) -> Optional[Span]:
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        self._span = Span(self.name)
+        parent.children.append(self._span)
+        self._token = _current_span.set(self._span)
+        return self._span
+    
+    def __exit__(self, *exc_info):
+        if self._span is not None:
+            self._span.finish()
+            _current_span.reset(self._token)
+            self._span = None
+
+def traced(name: Optional[str] = None):
+    """Decorator recording each call of a coroutine function as a span."""
+    def decorate(function):
+        stage = name or function.__qualname__
+        
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await function(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorate
+
+def start_trace(name: str, **attributes) -> Optional[Span]:
+    """Begin a sampled trace for the rest of the running task.
+    
+    Returns the root span, or None when this one isn't sampled.
+    """
+    if random.random() >= TRACING['sample_rate']:
+        return None
+    root = Span(name, **attributes)
+    _current_span.set(root)
+    return root
+
+def finish_trace(root: Optional[Span], slow_seconds: float, kind: str = 'command', **attributes):
+    """Close a trace and log it as a structured record if it was slow."""
+    if root is None:
+        return
+    root.finish()
+    root.attributes.update(attributes)
+    
+    if root.duration >= slow_seconds:
+        record = {
+            'event': f'slow_{kind}',
+            'name': root.name,
+            'duration_ms': round(root.duration * 1000, 1),
+            **root.attributes,
+            'stages': root.stages()
+        }
+        logger.warning(json.dumps(record, default=str))
+
+class trace:
+    """Trace a block as its own root, e.g. one background job tick."""
+    
+    __slots__ = ('name', 'slow_seconds', 'kind', '_root', '_token')
+    
+    def __init__(self, name: str, slow_seconds: float, kind: str = 'job'):
+        self.name = name
+        self.slow_seconds = slow_seconds
+        self.kind = kind
+        self._root = None
+    
+    def __enter__(self) -> Optional[Span]:
+        if random.random() >= TRACING['sample_rate']:
+            return None
+        self._root = Span(self.name)
+        self._token = _current_span.set(self._root)
+        return self._root
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._root is None:
+            return
+        _current_span.reset(self._token)
+        attributes = {'error': exc_type.__name__} if exc_type else {}
+        finish_trace(self._root, self.slow_seconds, self.kind, **attributes)
+        self._root = None